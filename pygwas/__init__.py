@@ -1,4 +1,24 @@
-from .pygwas import MapGWASSNPs
+# Public names are resolved lazily so that `import pygwas` (and the CLI) does not pull in
+# pandas/numpy/plotly until a pipeline is actually built.
+_LAZY = {
+    "MapGWASSNPs": ".pygwas",
+    "Pipeline": ".pipeline",
+    "PipelineResult": ".pipeline",
+    "CatalogIndex": ".lookup",
+}
 
-__all__ = ["MapGWASSNPs"]
-__version__ = "0.1.0"
\ No newline at end of file
+__all__ = ["MapGWASSNPs", "Pipeline", "PipelineResult", "CatalogIndex"]
+__version__ = "0.1.0"
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
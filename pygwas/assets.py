@@ -0,0 +1,98 @@
+import gzip
+import importlib.util
+import os
+import threading
+
+PLOTLY_CDN = "https://cdn.plot.ly/plotly-latest.min.js"
+
+# Precompressed sidecar files written next to each output, by content encoding
+ENCODINGS = {"gzip": ".gz", "br": ".br"}
+
+CSS_NAME = "mapgwas-report.css"
+JS_NAME = "mapgwas-report.js"
+PLOTLY_NAME = "plotly.min.js"
+
+# Assets already written by this process (a service or batch run writes them once)
+_written = set()
+_lock = threading.Lock()
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError as exc:
+        raise ImportError("Brotli output requires the brotli package. Please install: pip install mapgwas[compress]") from exc
+    return brotli
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        # mtime=0 keeps the output identical for identical input
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "br":
+        return _brotli().compress(data)
+    raise ValueError(f"Unknown encoding {encoding!r}; choose from {list(ENCODINGS)}")
+
+
+def _write_bytes(path: str, data: bytes):
+    # Write then rename so concurrent jobs never serve a half-written shared file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_precompressed(path: str, data: bytes, encodings=()) -> dict:
+    """Write `data` to `path` plus one `path.gz`/`path.br` per encoding; returns {encoding: bytes written}."""
+    _write_bytes(path, data)
+    sizes = {"identity": len(data)}
+    for encoding in encodings or ():
+        packed = compress(data, encoding)
+        _write_bytes(path + ENCODINGS[encoding], packed)
+        sizes[encoding] = len(packed)
+    return sizes
+
+
+def vendored_plotly_path() -> str:
+    """plotly.min.js shipped inside the installed plotly package (located without importing plotly)."""
+    spec = importlib.util.find_spec("plotly")
+    if spec is None or not spec.submodule_search_locations:
+        raise ImportError("Vendoring Plotly requires the plotly package. Please install: pip install plotly")
+    path = os.path.join(list(spec.submodule_search_locations)[0], "package_data", PLOTLY_NAME)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"plotly.min.js not found in the plotly package: {path}")
+    return path
+
+
+def write_shared_assets(assets_dir: str, css: str, js: str, vendor_plotly: bool = False, encodings=()) -> dict:
+    """Write the report stylesheet and script (and optionally Plotly) once into `assets_dir`.
+
+    Files whose content is already on disk are left alone, so every report of a batch can call
+    this cheaply. Returns {file name: path}.
+    """
+    os.makedirs(assets_dir, exist_ok=True)
+    files = {CSS_NAME: css.encode("utf-8"), JS_NAME: js.encode("utf-8")}
+    if vendor_plotly:
+        with open(vendored_plotly_path(), "rb") as f:
+            files[PLOTLY_NAME] = f.read()
+
+    paths = {}
+    for name, data in files.items():
+        path = os.path.join(assets_dir, name)
+        paths[name] = path
+        key = (os.path.abspath(path), len(data), tuple(encodings or ()))
+        with _lock:
+            if key in _written:
+                continue
+            current = os.path.exists(path) and os.path.getsize(path) == len(data)
+            if current:
+                with open(path, "rb") as f:
+                    current = f.read() == data
+            missing = [e for e in encodings or () if not os.path.exists(path + ENCODINGS[e])]
+            if not current:
+                write_precompressed(path, data, encodings)
+            elif missing:
+                for e in missing:
+                    _write_bytes(path + ENCODINGS[e], compress(data, e))
+            _written.add(key)
+    return paths
@@ -0,0 +1,172 @@
+import bisect
+import io
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Uncompressed bytes per block; htslib's choice, so a block always compresses to under 64 KiB
+BLOCK_SIZE = 0xff00
+
+# Empty block every BGZF file ends with
+EOF_BLOCK = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+_HEADER = struct.Struct("<4BI2BH2BHH")
+_TRAILER = struct.Struct("<II")
+
+
+def compress_block(data: bytes, level: int = 6) -> bytes:
+    """One BGZF block: a gzip member whose 'BC' extra field records the block size."""
+    packer = zlib.compressobj(level, zlib.DEFLATED, -15)
+    cdata = packer.compress(data) + packer.flush()
+    size = _HEADER.size + len(cdata) + _TRAILER.size
+    if size > 0x10000:
+        raise ValueError(f"BGZF block of {len(data)} bytes does not fit in 64 KiB")
+    header = _HEADER.pack(31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, size - 1)
+    return header + cdata + _TRAILER.pack(zlib.crc32(data), len(data))
+
+
+def index_path(path: str) -> str:
+    return path + ".gzi"
+
+
+def write_index(path: str, offsets):
+    """Write a `.gzi` index (as `bgzip -i`): (compressed, uncompressed) offsets of every block but the first."""
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(offsets)))
+        for coffset, uoffset in offsets:
+            f.write(struct.pack("<QQ", coffset, uoffset))
+
+
+def read_index(path: str) -> list:
+    with open(path, "rb") as f:
+        n, = struct.unpack("<Q", f.read(8))
+        flat = struct.unpack(f"<{2 * n}Q", f.read(16 * n))
+    return [(0, 0)] + list(zip(flat[::2], flat[1::2]))
+
+
+class BgzfWriter(io.BufferedIOBase):
+    """Binary file object writing BGZF, readable by any gzip reader.
+
+    Data is cut into BLOCK_SIZE blocks that are deflated on a thread pool (zlib releases the
+    GIL) and written in order; at most a few blocks per thread are in flight. With `index`, a
+    `.gzi` block index is written next to the file on close, for `read_range`.
+    """
+
+    def __init__(self, path: str, threads: int = None, level: int = 6, index: bool = True):
+        super().__init__()
+        self.path = path
+        self.level = level
+        self.index = index
+        self.threads = max(1, threads or os.cpu_count() or 1)
+        self._pool = ThreadPoolExecutor(self.threads) if self.threads > 1 else None
+        self._pending = deque()
+        self._buffer = bytearray()
+        self._file = open(path, "wb")
+        self._coffset = self._uoffset = 0
+        self._offsets = []
+
+    def writable(self):
+        return True
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write to closed BGZF file")
+        self._buffer += data
+        while len(self._buffer) >= BLOCK_SIZE:
+            self._submit(bytes(self._buffer[:BLOCK_SIZE]))
+            del self._buffer[:BLOCK_SIZE]
+        return len(data)
+
+    def _submit(self, block: bytes):
+        if self._pool is None:
+            self._write_block(compress_block(block, self.level), len(block))
+            return
+        self._pending.append((self._pool.submit(compress_block, block, self.level), len(block)))
+        while len(self._pending) > 4 * self.threads:
+            self._drain_one()
+
+    def _drain_one(self):
+        future, size = self._pending.popleft()
+        self._write_block(future.result(), size)
+
+    def _write_block(self, packed: bytes, size: int):
+        self._file.write(packed)
+        self._coffset += len(packed)
+        self._uoffset += size
+        self._offsets.append((self._coffset, self._uoffset))
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._drain_one()
+            self._file.write(EOF_BLOCK)
+        finally:
+            self._file.close()
+            if self._pool is not None:
+                self._pool.shutdown()
+            super().close()
+        if self.index:
+            # The last entry is the end of the data, where the EOF block starts; bgzip keeps it too
+            write_index(index_path(self.path), self._offsets)
+
+
+def open_bgzf(path: str, mode: str = "wt", threads: int = None, level: int = 6, index: bool = True,
+              encoding: str = "utf-8"):
+    """Open `path` for BGZF writing, in text ("wt") or binary ("wb") mode."""
+    if mode not in ("wt", "wb"):
+        raise ValueError(f"Unsupported mode {mode!r}; BGZF files are opened with 'wt' or 'wb'")
+    writer = BgzfWriter(path, threads=threads, level=level, index=index)
+    if mode == "wb":
+        return writer
+    return io.TextIOWrapper(writer, encoding=encoding, newline="")
+
+
+def write_csv(df, path: str, threads: int = None, index: bool = True, **to_csv_kwargs):
+    """`df.to_csv(path)`, written as BGZF (with a `.gzi` index when `index`) if `path` ends in `.gz`."""
+    to_csv_kwargs.setdefault("index", False)
+    if not path.endswith(".gz"):
+        df.to_csv(path, **to_csv_kwargs)
+        return path
+    # Written under a temporary name so readers never see a half-written file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open_bgzf(tmp, threads=threads, index=index) as f:
+        df.to_csv(f, **to_csv_kwargs)
+    if index:
+        os.replace(index_path(tmp), index_path(path))
+    os.replace(tmp, path)
+    return path
+
+
+def _block_size(header: bytes, path: str, coffset: int) -> int:
+    if len(header) < _HEADER.size or header[:4] != b"\x1f\x8b\x08\x04" or header[12:14] != b"BC":
+        raise ValueError(f"{path} is not BGZF (bad block header at byte {coffset})")
+    return _HEADER.unpack(header)[-1] + 1
+
+
+def read_range(path: str, offset: int, size: int, index=None) -> bytes:
+    """`size` uncompressed bytes starting at uncompressed `offset`, decompressing only the blocks needed."""
+    if index is None:
+        index = read_index(index_path(path))
+    starts = [u for _, u in index]
+    coffset, uoffset = index[max(bisect.bisect_right(starts, offset) - 1, 0)]
+    out = bytearray()
+    with open(path, "rb") as f:
+        f.seek(coffset)
+        while uoffset + len(out) < offset + size:
+            header = f.read(_HEADER.size)
+            if not header:
+                break
+            block = f.read(_block_size(header, path, f.tell() - len(header)) - _HEADER.size)
+            data = zlib.decompress(block[:-_TRAILER.size], -15)
+            if not data:
+                break
+            out += data
+    start = offset - uoffset
+    return bytes(out[start:start + size])
@@ -0,0 +1,68 @@
+import importlib.util
+
+import pandas as pd
+
+# Columns read by the mapping and report stages; everything else in the catalog is skipped
+REQUIRED_COLUMNS = [
+    "CHR_ID", "CHR_POS", "DISEASE/TRAIT", "P-VALUE", "RISK ALLELE FREQUENCY",
+    "REGION", "SNPS", "MAPPED_GENE",
+    "Groups of Disease/Trait", "MAPPED_TRAIT_URI", "MAPPED_TRAIT_DESCRIPTION",
+]
+
+# Join keys stay plain strings so they compare equal to the VCF CHROM/POS columns
+KEY_COLUMNS = ["CHR_ID", "CHR_POS"]
+
+# Low-cardinality labels repeated across many rows
+CATEGORICAL_COLUMNS = ["Groups of Disease/Trait", "REGION", "DISEASE/TRAIT"]
+
+
+def have_pyarrow() -> bool:
+    """Whether pyarrow is installed (checked without importing it)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def text_dtype():
+    """Arrow-backed string dtype when pyarrow is installed, pandas' own string dtype otherwise."""
+    return "string[pyarrow]" if have_pyarrow() else "string"
+
+
+def catalog_header(path: str) -> list:
+    compression = 'gzip' if path.endswith('.gz') else None
+    return list(pd.read_csv(path, nrows=0, compression=compression).columns)
+
+
+def catalog_dtypes(columns) -> dict:
+    dtypes = {}
+    for col in columns:
+        if col in KEY_COLUMNS:
+            dtypes[col] = str
+        elif col in CATEGORICAL_COLUMNS:
+            dtypes[col] = "category"
+        else:
+            dtypes[col] = text_dtype()
+    return dtypes
+
+
+def load_gwas_catalog(path: str, extra_columns=None, engine: str = None) -> pd.DataFrame:
+    """Read only the catalog columns the pipeline needs (plus `extra_columns`) with compact dtypes.
+
+    Columns are projected at parse time, labels are read as categoricals and free text as
+    Arrow-backed strings. The multithreaded pyarrow CSV engine is used when available.
+    """
+    header = catalog_header(path)
+    wanted = list(REQUIRED_COLUMNS) + [c for c in (extra_columns or []) if c not in REQUIRED_COLUMNS]
+    missing_extra = [c for c in (extra_columns or []) if c not in header]
+    if missing_extra:
+        raise KeyError(f"Columns not found in GWAS file: {missing_extra}")
+    usecols = [c for c in header if c in wanted]
+
+    if engine is None:
+        engine = "pyarrow" if have_pyarrow() else "c"
+    compression = 'gzip' if path.endswith('.gz') else None
+    kwargs = dict(usecols=usecols, dtype=catalog_dtypes(usecols), compression=compression, engine=engine)
+    if engine == "c":
+        kwargs["low_memory"] = False
+    gwas_df = pd.read_csv(path, **kwargs)
+
+    # Keep the original column order of the file
+    return gwas_df[usecols]
@@ -1,28 +1,151 @@
 import argparse
 import sys
-from .pygwas import MapGWASSNPs
+
+# Sub-commands dispatched from main(); a bare `mapgwas --vcf ...` keeps running the mapper
+COMMANDS = {
+    "serve": "pygwas.server",
+    "cohort": "pygwas.cohort",
+    "results": "pygwas.results",
+    "query": "pygwas.lookup",
+    "watch": "pygwas.watch",
+    "af-index": "pygwas.popaf",
+}
+
+def add_mapping_arguments(p):
+    """Options controlling how a VCF is filtered, mapped and reported (shared by all commands)."""
+    p.add_argument("--qual-cutoff", type=float, default=20.0, help="QUAL cutoff (default=20)")
+    p.add_argument("--keep-nr", action="store_true", help="Keep rows with DISEASE/TRAIT == NR")
+    p.add_argument("--gwas-columns", nargs="+", default=None, metavar="COL",
+                   help="Extra GWAS catalog columns to load and keep in the annotated output")
+    p.add_argument("--info-fields", nargs="+", default=None, metavar="KEY",
+                   help="INFO keys to extract into numeric INFO_<KEY> columns (e.g. DP AF MQ SR)")
+    p.add_argument("--min-dp", type=float, default=None, help="Drop variants with INFO DP below this value")
+    p.add_argument("--info-min", action="append", default=[], metavar="KEY=VALUE",
+                   help="Drop variants whose INFO KEY is below VALUE (repeatable)")
+    p.add_argument("--keep-info", action="store_true", help="Keep the raw INFO string in the annotated output")
+    p.add_argument("--keep-non-carriers", action="store_true",
+                   help="Keep 0/0, no-call (./.) and other-alt genotypes instead of dropping them before the merge")
+    p.add_argument("--min-gq", type=float, default=None, help="Drop variants with FORMAT GQ below this value")
+    p.add_argument("--format-fields", nargs="+", default=None, metavar="KEY",
+                   help="FORMAT keys to extract into numeric FMT_<KEY> columns (e.g. GQ DP)")
+    p.add_argument("--regions", default=None, metavar="BED",
+                   help="Restrict the VCF, catalog and variant statistics to these target regions")
+    p.add_argument("--reference", default=None, metavar="FASTA",
+                   help="Left-align and trim indels against this reference FASTA (.fai is created if missing)")
+    p.add_argument("--ld-proxies", default=None, metavar="TABLE",
+                   help="LD table (plink --r2 output or CHROM/LEAD_POS/PROXY_POS/R2 columns) used to match "
+                        "uncalled catalog SNPs through called proxies; indexed into TABLE.proxyidx on first use")
+    p.add_argument("--proxy-min-r2", type=float, default=0.8, help="Minimum r2 for an LD proxy (default=0.8)")
+    p.add_argument("--pop-af", default=None, metavar="INDEX",
+                   help="Annotate hits with population allele frequencies from this index (see: mapgwas af-index) "
+                        "or sites file, as POP_<population> columns")
+    p.add_argument("--no-prefilter", action="store_true",
+                   help="Fully parse every VCF line instead of only those on a catalog position")
+    p.add_argument("--join-workers", type=int, default=1,
+                   help="Join the VCF and catalog per chromosome on this many processes (default=1)")
+    p.add_argument("--bgzf-csv", action="store_true",
+                   help="Write the annotated CSV as in-house_report.csv.gz (BGZF, multi-threaded, with a .gzi index)")
+    p.add_argument("--results-db", default=None, metavar="DB",
+                   help="Also load the annotated rows into this SQLite results database (see: mapgwas results)")
+    p.add_argument("--top-k", type=int, default=1, help="Hits per trait kept in the report (default=1)")
+    p.add_argument("--sunburst-depth", type=int, default=None,
+                   help="Rings drawn in the report sunburst (default: all six levels)")
+    p.add_argument("--sunburst-max-children", type=int, default=25,
+                   help="Children kept per sunburst node; the rest are merged into 'Other' (default=25, 0=all)")
+    p.add_argument("--assets-dir", default=None, metavar="DIR",
+                   help="Write the report CSS/JS once into DIR and reference it instead of inlining it")
+    p.add_argument("--vendor-plotly", action="store_true",
+                   help="Copy plotly.min.js into --assets-dir and load it from there instead of the CDN")
+    p.add_argument("--precompress", nargs="+", default=None, choices=["gzip", "br"],
+                   help="Also write .gz/.br copies of each report and shared asset for static serving")
+    p.add_argument("--quiet", action="store_true", help="Suppress progress messages")
+    return p
 
 def build_parser():
     p = argparse.ArgumentParser(
         prog="mapgwas",
-        description="Map VCF variants to GWAS catalog and generate an HTML report"
+        description="Map VCF variants to GWAS catalog and generate an HTML report",
+        epilog="Other commands: " + ", ".join(f"mapgwas {c} --help" for c in COMMANDS)
     )
     p.add_argument("--vcf", required=True, help="VCF path (.vcf or .vcf.gz)")
     p.add_argument("--gwas", required=True, help="GWAS CSV file (CSV or CSV.GZ)")
     p.add_argument("--out", required=True, help="Output root directory")
-    p.add_argument("--qual-cutoff", type=float, default=20.0, help="QUAL cutoff (default=20)")
-    p.add_argument("--keep-nr", action="store_true", help="Keep rows with DISEASE/TRAIT == NR")
+    add_mapping_arguments(p)
+    p.add_argument("--sample", default=None, help="Sample name for metrics (default: basename of --out)")
+    p.add_argument("--metrics-json", default=None,
+                   help="Append one JSON record of per-stage timings/rows/memory to this file ('-' for stdout)")
+    p.add_argument("--profile", default=None, help="Write a cProfile dump of the run to this file")
     return p
 
-def main(argv=None):
-    args = build_parser().parse_args(argv or sys.argv[1:])
+def _info_filters(args):
+    filters = {}
+    for item in args.info_min:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"--info-min expects KEY=VALUE, got {item!r}")
+        filters[key] = float(value)
+    if args.min_dp is not None:
+        filters["DP"] = args.min_dp
+    return filters
+
+def mapper_options(args) -> dict:
+    """MapGWASSNPs keyword arguments from the options added by add_mapping_arguments()."""
+    return dict(
+        cut_off_qual=args.qual_cutoff,
+        filt_nr_disease=not args.keep_nr,
+        quiet=args.quiet,
+        gwas_columns=args.gwas_columns,
+        info_fields=args.info_fields,
+        info_filters=_info_filters(args),
+        keep_info=args.keep_info,
+        carriers_only=not args.keep_non_carriers,
+        min_gq=args.min_gq,
+        format_fields=args.format_fields,
+        regions=args.regions,
+        reference=args.reference,
+        join_workers=args.join_workers,
+        prefilter=not args.no_prefilter,
+        results_db=args.results_db,
+        csv_bgzf=args.bgzf_csv,
+        ld_proxies=args.ld_proxies,
+        proxy_min_r2=args.proxy_min_r2,
+        pop_af=args.pop_af,
+        top_k=args.top_k,
+        sunburst_depth=args.sunburst_depth,
+        sunburst_max_children=args.sunburst_max_children,
+        assets_dir=args.assets_dir,
+        vendor_plotly=args.vendor_plotly,
+        precompress=args.precompress
+    )
+
+def run(args):
+    from .pygwas import MapGWASSNPs
+
     mapper = MapGWASSNPs(
         vcf_file_path=args.vcf,
         gwas_file_path=args.gwas,
         output_file_path=args.out,
-        cut_off_qual=args.qual_cutoff,
-        filt_nr_disease=not args.keep_nr
+        sample=args.sample,
+        **mapper_options(args)
     )
     mapper.map_snps()
     mapper.generate_report()
+    return mapper
+
+def main(argv=None):
+    argv = list(argv or sys.argv[1:])
+    if argv and argv[0] in COMMANDS:
+        import importlib
+        return importlib.import_module(COMMANDS[argv[0]]).main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        mapper = profiler.runcall(run, args)
+        profiler.dump_stats(args.profile)
+    else:
+        mapper = run(args)
+    if args.metrics_json:
+        mapper.metrics.write_json(args.metrics_json)
     return 0
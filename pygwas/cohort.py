@@ -0,0 +1,269 @@
+import argparse
+import glob
+import os
+
+# Columns read from each sample's in-house_report.csv
+COHORT_COLUMNS = ["CHR_ID", "CHR_POS", "SNPS", "MAPPED_GENE", "DISEASE/TRAIT",
+                  "Groups of Disease/Trait", "ZYGOSITY"]
+
+REPORT_CSV = os.path.join("report", "data", "in-house_report.csv")
+REPORT_CSVS = [REPORT_CSV, REPORT_CSV + ".gz"]
+
+# Zygosity calls counted as carrying the ALT allele; rows without a call count as unknown
+CARRIER_CALLS = ["het", "hom-alt", "unknown"]
+
+
+def _sparse():
+    try:
+        from scipy import sparse
+    except ImportError as exc:
+        raise ImportError("Cohort aggregation requires scipy. Please install: pip install mapgwas[cohort]") from exc
+    return sparse
+
+
+def find_sample_reports(paths) -> list:
+    """(sample, csv) pairs for sample output roots, directories containing them, or CSV files.
+
+    The sample name is the output root, i.e. the directory that holds report/data/in-house_report.csv
+    (or its block-gzipped in-house_report.csv.gz).
+    """
+    found = []
+    for path in paths:
+        direct = [os.path.join(path, name) for name in REPORT_CSVS if os.path.isfile(os.path.join(path, name))]
+        if os.path.isfile(path):
+            csvs = [path]
+        elif direct:
+            csvs = direct[:1]
+        else:
+            csvs = sorted(csv for name in REPORT_CSVS
+                          for csv in glob.glob(os.path.join(path, "**", name), recursive=True))
+        for csv in csvs:
+            root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(csv))))
+            found.append((os.path.basename(root), csv))
+    samples = [s for s, _ in found]
+    duplicated = sorted({s for s in samples if samples.count(s) > 1})
+    if duplicated:
+        raise ValueError(f"Duplicate sample names in cohort: {duplicated}")
+    return found
+
+
+class Cohort:
+    """Sparse sample x catalog-variant carrier matrix built from per-sample annotated outputs.
+
+    `matrix[i, j]` is the allele dosage (1 = het or unknown genotype, 2 = hom-alt) of variant j in
+    sample i; `variant_traits[j, t]` links variant j to trait t.
+    """
+
+    def __init__(self, samples, variants, traits, matrix, variant_traits):
+        self.samples = list(samples)
+        self.variants = variants
+        self.traits = traits
+        self.matrix = matrix.tocsr()
+        self.variant_traits = variant_traits.tocsr()
+
+    @classmethod
+    def from_reports(cls, paths, quiet: bool = False) -> "Cohort":
+        import numpy as np
+        import pandas as pd
+
+        sparse = _sparse()
+        reports = find_sample_reports(paths)
+        if not reports:
+            raise FileNotFoundError(f"No {REPORT_CSV} found under {list(paths)}")
+
+        frames = []
+        for i, (sample, csv) in enumerate(reports):
+            df = pd.read_csv(csv, usecols=lambda c: c in COHORT_COLUMNS, dtype=str)
+            df["SAMPLE_IDX"] = np.int32(i)
+            frames.append(df)
+        rows = pd.concat(frames, ignore_index=True)
+        if not quiet:
+            print(f"Loaded {len(rows):,} annotated rows from {len(reports):,} samples")
+        for col in COHORT_COLUMNS:
+            if col not in rows.columns:
+                rows[col] = np.nan
+        # Only carriers enter the matrix: hom-ref, no-call and other-alt rows are dropped
+        rows = rows.loc[rows["ZYGOSITY"].isna() | rows["ZYGOSITY"].isin(CARRIER_CALLS)].reset_index(drop=True)
+
+        # Catalog variants are identified by position and rsID; traits by name
+        rows[["CHR_ID", "CHR_POS", "SNPS"]] = rows[["CHR_ID", "CHR_POS", "SNPS"]].fillna("")
+        variant_idx, variant_keys = pd.factorize(pd.MultiIndex.from_frame(rows[["CHR_ID", "CHR_POS", "SNPS"]]))
+        trait_idx, trait_names = pd.factorize(rows["DISEASE/TRAIT"])
+        rows["VARIANT_IDX"] = variant_idx
+        rows["TRAIT_IDX"] = trait_idx
+        rows["DOSAGE"] = np.where(rows["ZYGOSITY"].eq("hom-alt"), 2, 1).astype(np.int8)
+
+        carried = rows.drop_duplicates(["SAMPLE_IDX", "VARIANT_IDX"])
+        matrix = sparse.csr_matrix(
+            (carried["DOSAGE"].to_numpy(), (carried["SAMPLE_IDX"].to_numpy(), carried["VARIANT_IDX"].to_numpy())),
+            shape=(len(reports), len(variant_keys))
+        )
+        links = rows.loc[rows["TRAIT_IDX"] >= 0].drop_duplicates(["VARIANT_IDX", "TRAIT_IDX"])
+        variant_traits = sparse.csr_matrix(
+            (np.ones(len(links), dtype=np.int8), (links["VARIANT_IDX"].to_numpy(), links["TRAIT_IDX"].to_numpy())),
+            shape=(len(variant_keys), len(trait_names))
+        )
+
+        variants = pd.DataFrame(list(variant_keys), columns=["CHR_ID", "CHR_POS", "SNPS"])
+        first = rows.drop_duplicates("VARIANT_IDX").set_index("VARIANT_IDX").sort_index()
+        variants["MAPPED_GENE"] = first["MAPPED_GENE"].to_numpy()
+        traits = pd.DataFrame({"DISEASE/TRAIT": np.asarray(trait_names, dtype=object)})
+        groups = rows.loc[rows["TRAIT_IDX"] >= 0].drop_duplicates("TRAIT_IDX").set_index("TRAIT_IDX").sort_index()
+        traits["Groups of Disease/Trait"] = groups["Groups of Disease/Trait"].to_numpy()
+        return cls([s for s, _ in reports], variants, traits, matrix, variant_traits)
+
+    # ---------- aggregates ----------
+    def sample_traits(self):
+        """Sparse sample x trait matrix counting the trait's variants each sample carries."""
+        import numpy as np
+
+        carriers = (self.matrix > 0).astype(np.int32)
+        return (carriers @ self.variant_traits.astype(np.int32)).tocsr()
+
+    def carrier_counts(self):
+        import numpy as np
+
+        n = len(self.samples)
+        carriers = np.asarray((self.matrix > 0).sum(axis=0)).ravel()
+        hom_alt = np.asarray((self.matrix == 2).sum(axis=0)).ravel()
+        alleles = np.asarray(self.matrix.sum(axis=0)).ravel()
+        out = self.variants.copy()
+        out["carriers"] = carriers
+        out["hom_alt"] = hom_alt
+        out["carrier_freq"] = carriers / max(n, 1)
+        out["allele_freq"] = alleles / max(2 * n, 1)
+        out["n_traits"] = np.diff(self.variant_traits.indptr)
+        return out.sort_values("carriers", ascending=False, kind="mergesort").reset_index(drop=True)
+
+    def trait_summary(self):
+        import numpy as np
+
+        n = len(self.samples)
+        st = self.sample_traits()
+        carriers = np.asarray((st > 0).sum(axis=0)).ravel()
+        hits = np.asarray(st.sum(axis=0)).ravel()
+        out = self.traits.copy()
+        out["n_variants"] = np.asarray(self.variant_traits.sum(axis=0)).ravel()
+        out["carriers"] = carriers
+        out["carrier_freq"] = carriers / max(n, 1)
+        out["mean_hits_per_carrier"] = np.divide(hits, carriers, out=np.zeros(len(hits)), where=carriers > 0)
+        return out.sort_values("carriers", ascending=False, kind="mergesort").reset_index(drop=True)
+
+    def enrichment(self, in_group):
+        """Per-trait carrier frequency in a sample subgroup vs the rest, with a one-sided hypergeometric p-value.
+
+        `in_group` is a boolean array aligned with `self.samples`.
+        """
+        import numpy as np
+        from scipy.stats import hypergeom
+
+        in_group = np.asarray(in_group, dtype=bool)
+        n, k = len(self.samples), int(in_group.sum())
+        carrier = (self.sample_traits() > 0).astype(np.int32)
+        total = np.asarray(carrier.sum(axis=0)).ravel()
+        group = np.asarray(carrier[np.flatnonzero(in_group)].sum(axis=0)).ravel()
+        rest = total - group
+        out = self.traits.copy()
+        out["carriers_in_group"] = group
+        out["carriers_in_rest"] = rest
+        out["freq_in_group"] = group / max(k, 1)
+        out["freq_in_rest"] = rest / max(n - k, 1)
+        # Haldane-corrected odds ratio so empty cells stay finite
+        out["odds_ratio"] = ((group + 0.5) * (n - k - rest + 0.5)) / ((k - group + 0.5) * (rest + 0.5))
+        out["p_value"] = hypergeom.sf(group - 1, n, total, k)
+        return out.sort_values("p_value", kind="mergesort").reset_index(drop=True)
+
+    # ---------- report ----------
+    def write_report(self, out_dir: str, in_group=None, group_label: str = None, top: int = 50) -> dict:
+        os.makedirs(out_dir, exist_ok=True)
+        variants = self.carrier_counts()
+        traits = self.trait_summary()
+        paths = {
+            "variant_carriers": os.path.join(out_dir, "variant_carriers.csv"),
+            "trait_summary": os.path.join(out_dir, "trait_summary.csv"),
+            "html": os.path.join(out_dir, "cohort_report.html"),
+        }
+        variants.to_csv(paths["variant_carriers"], index=False)
+        traits.to_csv(paths["trait_summary"], index=False)
+        enriched = None
+        if in_group is not None:
+            enriched = self.enrichment(in_group)
+            paths["enrichment"] = os.path.join(out_dir, "enrichment.csv")
+            enriched.to_csv(paths["enrichment"], index=False)
+
+        from jinja2 import Template
+        html = Template(COHORT_TEMPLATE).render(
+            n_samples=len(self.samples),
+            n_variants=len(self.variants),
+            n_traits=len(self.traits),
+            traits=traits.head(top).to_html(index=False, float_format="{:.4g}".format, classes="table"),
+            variants=variants.head(top).to_html(index=False, float_format="{:.4g}".format, classes="table"),
+            enrichment=None if enriched is None else enriched.head(top).to_html(
+                index=False, float_format="{:.4g}".format, classes="table"),
+            group_label=group_label,
+        )
+        with open(paths["html"], "w", encoding="utf-8") as f:
+            f.write(html)
+        return paths
+
+
+COHORT_TEMPLATE = r"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>GWAS Cohort Report</title>
+    <style>
+        body { font-family: 'Poppins', sans-serif; background: #f7f9fc; color: #333; margin: 40px; }
+        h1 { background: linear-gradient(to right, #3c79aa, #FF6B6B); color: white; padding: 20px; border-radius: 8px; }
+        h2 { color: #2D3B71; border-bottom: 3px solid #2D3B71; display: inline-block; }
+        .table { border-collapse: collapse; background: white; font-size: 0.9rem; }
+        .table th, .table td { padding: 4px 10px; border-bottom: 1px solid #ddd; text-align: left; }
+        .table th { background: #2D3B71; color: white; }
+    </style>
+</head>
+<body>
+    <h1>GWAS Cohort Report</h1>
+    <p><b>{{ n_samples }}</b> samples, <b>{{ n_variants }}</b> catalog variants carried, <b>{{ n_traits }}</b> traits.</p>
+    <h2>Traits by carrier count</h2>
+    {{ traits | safe }}
+    {% if enrichment %}
+    <h2>Traits enriched in {{ group_label }}</h2>
+    {{ enrichment | safe }}
+    {% endif %}
+    <h2>Most carried catalog variants</h2>
+    {{ variants | safe }}
+</body>
+</html>
+"""
+
+
+def build_parser():
+    p = argparse.ArgumentParser(
+        prog="mapgwas cohort",
+        description="Aggregate per-sample in-house_report.csv outputs into cohort carrier statistics"
+    )
+    p.add_argument("paths", nargs="+", help="Sample output roots, directories containing them, or CSV files")
+    p.add_argument("--out", required=True, help="Directory for the cohort CSVs and cohort_report.html")
+    p.add_argument("--groups", default=None, help="CSV with a 'sample' column and a grouping column")
+    p.add_argument("--group-column", default="group", help="Grouping column in --groups (default=group)")
+    p.add_argument("--group", default=None, help="Group value tested for enrichment against all other samples")
+    p.add_argument("--top", type=int, default=50, help="Rows shown per table in the HTML report (default=50)")
+    p.add_argument("--quiet", action="store_true", help="Suppress progress messages")
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    import pandas as pd
+
+    cohort = Cohort.from_reports(args.paths, quiet=args.quiet)
+    in_group = None
+    if args.groups:
+        if args.group is None:
+            raise SystemExit("--group is required with --groups")
+        groups = pd.read_csv(args.groups, dtype=str).set_index("sample")[args.group_column]
+        in_group = groups.reindex(cohort.samples).eq(args.group).to_numpy()
+    paths = cohort.write_report(args.out, in_group=in_group, group_label=args.group, top=args.top)
+    if not args.quiet:
+        print(f"Cohort of {len(cohort.samples):,} samples written to {paths['html']}")
+    return 0
@@ -36,9 +36,15 @@ class ExpandReplicateChr:
         return self.df
     
 if __name__ == '__main__':
+    try:
+        from .bgzf import write_csv
+    except ImportError:  # run as a script: the package directory is on sys.path
+        from bgzf import write_csv
+
     # Load and process the dataset
     df = pd.read_csv('data/gwas_database_with_description.csv.gz', compression='gzip', low_memory=False)
     expand_replicate_chr = ExpandReplicateChr(df)
     df2 = expand_replicate_chr.preprocess_gwas_data()
-    df2.to_csv('data/gwas_database_with_description_expanded.csv.gz', compression='gzip', index=False)
+    # Block-gzipped on all cores; still a plain .csv.gz for pandas and zcat
+    write_csv(df2, 'data/gwas_database_with_description_expanded.csv.gz')
 
@@ -8,6 +8,11 @@ import time
 import random
 import os
 
+try:
+    from .bgzf import write_csv
+except ImportError:  # run as a script: the package directory is on sys.path
+    from bgzf import write_csv
+
 
 output_file = 'data/gwas_database_with_description_expanded.csv.gz'
 # Define ontology groups
@@ -114,12 +119,12 @@ for index, link in enumerate(tqdm(unique_links)):
     # Save progress every 30 links
     if (index + 1) % 30 == 0:
         df['MAPPED_TRAIT_DESCRIPTION'] = df['MAPPED_TRAIT_URI'].map(trait_descriptions).fillna(df['MAPPED_TRAIT_DESCRIPTION'])
-        df.to_csv(output_file, index=False, compression='gzip')
+        write_csv(df, output_file)
         print(f"Saved progress at {index + 1} links.")
 
 # Save final data
 df['MAPPED_TRAIT_DESCRIPTION'] = df['MAPPED_TRAIT_URI'].map(trait_descriptions).fillna(df['MAPPED_TRAIT_DESCRIPTION'])
-df.to_csv(output_file, index=False, compression='gzip')
+write_csv(df, output_file)
 print("Completed processing and saved data.")
 
 # Quit WebDriver
@@ -0,0 +1,248 @@
+import argparse
+import csv
+import os
+import re
+import sqlite3
+import sys
+
+# Catalog fields holding several rsIDs or genes ("rs1 x rs2", "GENE1 - GENE2", "GENE6, GENE7")
+_TERM_SPLIT = re.compile(r'\s*[,;]\s*|\s+-\s+|\s+x\s+')
+_WORD = re.compile(r'\w+')
+
+# Bump when the index layout changes; older index files are rebuilt on open
+INDEX_VERSION = 1
+
+# Catalog column -> index kind; traits are indexed by word, the others by whole term
+INDEXED_COLUMNS = {"SNPS": "snp", "MAPPED_GENE": "gene", "DISEASE/TRAIT": "trait"}
+
+# Columns printed by `mapgwas query` unless --all-columns is given
+DISPLAY_COLUMNS = ["SNPS", "MAPPED_GENE", "DISEASE/TRAIT", "P-VALUE", "RISK ALLELE FREQUENCY",
+                   "CHR_ID", "CHR_POS"]
+
+# Rows written per executemany batch while building
+_BATCH = 50_000
+
+
+def _missing(value) -> bool:
+    """None, NaN or pd.NA (Arrow-backed string columns hold pd.NA for empty cells)."""
+    import pandas as pd
+
+    return pd.isna(value)
+
+
+def split_terms(value) -> list:
+    if _missing(value):
+        return []
+    return [t for t in _TERM_SPLIT.split(str(value).strip()) if t]
+
+
+def trait_words(value) -> list:
+    if _missing(value):
+        return []
+    return sorted(set(_WORD.findall(str(value).lower())))
+
+
+def index_path(catalog_path: str) -> str:
+    """Default index location: next to the catalog."""
+    return catalog_path + ".index.sqlite"
+
+
+def _source_stamp(catalog_path: str, extra_columns=None) -> str:
+    """Index freshness key: the catalog file's size and mtime, and the extra columns copied from it."""
+    st = os.stat(catalog_path)
+    extra = "|".join(sorted(set(extra_columns or [])))
+    return f"{INDEX_VERSION}:{st.st_size}:{st.st_mtime_ns}:{extra}"
+
+
+def _quote(col: str) -> str:
+    return '"' + col.replace('"', '""') + '"'
+
+
+def build_index(catalog_path: str, path: str = None, extra_columns=None) -> str:
+    """Build the lookup index for a catalog and return its path.
+
+    The catalog columns used by the pipeline (plus `extra_columns`) are copied into one SQLite
+    table, with inverted indexes from rsIDs, mapped genes and trait words to row numbers. The
+    file is written beside the final path and renamed into place.
+    """
+    from .catalog import load_gwas_catalog
+
+    path = path or index_path(catalog_path)
+    gwas_df = load_gwas_catalog(catalog_path, extra_columns=extra_columns)
+    columns = list(gwas_df.columns)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute(f"CREATE TABLE entries (row INTEGER PRIMARY KEY, "
+                     f"{', '.join(_quote(c) + ' TEXT' for c in columns)})")
+        conn.execute("CREATE TABLE terms (kind TEXT NOT NULL, term TEXT NOT NULL COLLATE NOCASE, "
+                     "row INTEGER NOT NULL)")
+        with conn:
+            conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                             [("source", os.path.abspath(catalog_path)), ("stamp", _source_stamp(catalog_path, extra_columns))])
+            text = gwas_df.astype(object).where(gwas_df.notna(), None)
+            insert = f"INSERT INTO entries VALUES (?, {', '.join('?' * len(columns))})"
+            for start in range(0, len(text), _BATCH):
+                part = text.iloc[start:start + _BATCH]
+                conn.executemany(insert, ((start + i,) + row for i, row in
+                                          enumerate(part.itertuples(index=False, name=None))))
+
+            for col, kind in INDEXED_COLUMNS.items():
+                if col not in gwas_df.columns:
+                    continue
+                # Split each distinct value once; repeated genes and traits are common
+                values = gwas_df[col].astype(object)
+                codes, uniques = values.factorize()
+                split = trait_words if kind == "trait" else split_terms
+                terms = [split(u) for u in uniques]
+                conn.executemany("INSERT INTO terms VALUES (?, ?, ?)",
+                                 ((kind, term, row) for row, code in enumerate(codes.tolist()) if code >= 0
+                                  for term in terms[code]))
+        conn.execute("CREATE INDEX terms_term ON terms(kind, term, row)")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+    return path
+
+
+class CatalogIndex:
+    """Lookups into a GWAS catalog by rsID, gene and trait through its persisted inverted index.
+
+    Opening reads only the SQLite index, so a lookup costs a few index seeks rather than a
+    catalog load. Use `CatalogIndex.open(catalog)` to build the index on first use and
+    rebuild it when the catalog file or the requested `extra_columns` have changed.
+    """
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Catalog index not found: {path}")
+        self.path = path
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self.columns = [r[1] for r in self.conn.execute("PRAGMA table_info(entries)")][1:]
+
+    @classmethod
+    def open(cls, catalog_path: str, path: str = None, rebuild: bool = False,
+             extra_columns=None) -> "CatalogIndex":
+        path = path or index_path(catalog_path)
+        if rebuild or _stamp(path) != _source_stamp(catalog_path, extra_columns):
+            build_index(catalog_path, path, extra_columns=extra_columns)
+        return cls(path)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _where(self, snp=None, gene=None, trait=None):
+        where, params = [], []
+        terms = [("snp", snp), ("gene", gene)] + [("trait", w) for w in trait_words(trait) if trait]
+        for kind, term in terms:
+            if term:
+                where.append("row IN (SELECT row FROM terms WHERE kind = ? AND term = ?)")
+                params += [kind, term]
+        return (" WHERE " + " AND ".join(where) if where else ""), params
+
+    def lookup(self, snp: str = None, gene: str = None, trait: str = None, limit: int = None) -> list:
+        """Catalog rows matching every given filter, as dicts keyed by catalog column.
+
+        `snp` and `gene` match any of an entry's listed rsIDs or genes; `trait` matches entries
+        whose DISEASE/TRAIT contains all of its words. All comparisons ignore case.
+        """
+        where, params = self._where(snp, gene, trait)
+        sql = f"SELECT * FROM entries{where} ORDER BY row"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [dict(zip(self.columns, row[1:])) for row in self.conn.execute(sql, params)]
+
+    def traits(self, snp: str = None, gene: str = None, trait: str = None) -> list:
+        """(DISEASE/TRAIT, number of catalog entries) for the matching rows, most frequent first."""
+        where, params = self._where(snp, gene, trait)
+        col = _quote("DISEASE/TRAIT")
+        sql = f"SELECT {col}, COUNT(*) AS n FROM entries{where} GROUP BY {col} ORDER BY n DESC, {col}"
+        return self.conn.execute(sql, params).fetchall()
+
+
+def _stamp(path: str):
+    if not os.path.exists(path):
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'stamp'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return None
+    return row[0] if row else None
+
+
+def lookup(catalog_path: str, snp: str = None, gene: str = None, trait: str = None, limit: int = None) -> list:
+    """One-off lookup; builds the index next to the catalog on first use."""
+    with CatalogIndex.open(catalog_path) as index:
+        return index.lookup(snp=snp, gene=gene, trait=trait, limit=limit)
+
+
+def _print_table(header, rows, out=sys.stdout):
+    rows = [["" if v is None else str(v) for v in row] for row in rows]
+    widths = [max([len(h)] + [len(r[i]) for r in rows]) for i, h in enumerate(header)]
+    out.write("  ".join(h.ljust(w) for h, w in zip(header, widths)).rstrip() + "\n")
+    for row in rows:
+        out.write("  ".join(v.ljust(w) for v, w in zip(row, widths)).rstrip() + "\n")
+
+
+def build_parser():
+    p = argparse.ArgumentParser(
+        prog="mapgwas query",
+        description="Look up GWAS catalog entries by rsID, gene or trait through an index kept next to the catalog"
+    )
+    p.add_argument("gwas", help="GWAS catalog (CSV or CSV.GZ)")
+    p.add_argument("--snp", default=None, help="rsID, e.g. rs429358")
+    p.add_argument("--gene", default=None, help="Mapped gene symbol, e.g. APOE")
+    p.add_argument("--trait", default=None, help="Words of DISEASE/TRAIT, e.g. \"type 2 diabetes\"")
+    p.add_argument("--traits", action="store_true", help="Print the linked traits with entry counts instead of rows")
+    p.add_argument("--all-columns", action="store_true", help="Print every indexed catalog column")
+    p.add_argument("--limit", type=int, default=None, help="Maximum rows printed")
+    p.add_argument("--csv", action="store_true", help="Print CSV instead of a table")
+    p.add_argument("--index", default=None, help="Index file (default: <gwas>.index.sqlite)")
+    p.add_argument("--rebuild", action="store_true", help="Rebuild the index even if it is up to date")
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not (args.snp or args.gene or args.trait or args.rebuild):
+        raise SystemExit("Give at least one of --snp, --gene or --trait")
+    if not os.path.exists(args.gwas):
+        raise SystemExit(f"GWAS catalog not found: {args.gwas}")
+
+    with CatalogIndex.open(args.gwas, path=args.index, rebuild=args.rebuild) as index:
+        if not (args.snp or args.gene or args.trait):
+            print(f"Index written to {index.path}")
+            return 0
+        if args.traits:
+            header = ["DISEASE/TRAIT", "ENTRIES"]
+            rows = index.traits(snp=args.snp, gene=args.gene, trait=args.trait)[:args.limit]
+        else:
+            found = index.lookup(snp=args.snp, gene=args.gene, trait=args.trait, limit=args.limit)
+            header = index.columns if args.all_columns else [c for c in DISPLAY_COLUMNS if c in index.columns]
+            rows = [[r[c] for c in header] for r in found]
+
+    if args.csv:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(header)
+        writer.writerows(rows)
+    elif rows:
+        _print_table(header, rows)
+    else:
+        print("No matching entries")
+    return 0
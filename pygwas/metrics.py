@@ -0,0 +1,117 @@
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in KiB on Linux and in bytes on macOS
+    if sys.platform == "darwin":
+        peak /= 1024.0
+    return round(peak / 1024.0, 2)
+
+
+class StageTimer:
+    """Context manager recording wall/CPU time, row counts and peak RSS of one stage.
+
+    CPU time is the process's on the main thread, so it includes work the stage hands to
+    worker threads or processes, but also any background thread running at the same time.
+    Stages entered on another thread (the background catalog load, service jobs) record
+    that thread's own CPU time instead; `cpu_clock` says which one was used.
+    """
+
+    def __init__(self, name: str, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.wall_s = None
+        self.cpu_s = None
+        self.peak_rss_mb = None
+        self.cpu_clock = None
+        self.extra = {}
+
+    def rows(self, rows_in=None, rows_out=None):
+        if rows_in is not None:
+            self.rows_in = int(rows_in)
+        if rows_out is not None:
+            self.rows_out = int(rows_out)
+        return self
+
+    def __enter__(self):
+        self._wall0 = time.perf_counter()
+        main = threading.current_thread() is threading.main_thread()
+        self.cpu_clock = "process" if main else "thread"
+        self._cpu = time.process_time if main else time.thread_time
+        self._cpu0 = self._cpu()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall_s = round(time.perf_counter() - self._wall0, 6)
+        self.cpu_s = round(self._cpu() - self._cpu0, 6)
+        self.peak_rss_mb = peak_rss_mb()
+        return False
+
+    def to_dict(self):
+        d = {
+            "stage": self.name,
+            "wall_s": self.wall_s,
+            "cpu_s": self.cpu_s,
+            "cpu_clock": self.cpu_clock,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "peak_rss_mb": self.peak_rss_mb,
+        }
+        d.update(self.extra)
+        return d
+
+
+class RunMetrics:
+    """Collects stage records for one sample run and serialises them as a single JSON record."""
+
+    def __init__(self, sample: str = None, **context):
+        self.sample = sample
+        self.context = context
+        self.stages = []
+        self.started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+
+    def stage(self, name: str, rows_in=None) -> StageTimer:
+        timer = StageTimer(name, rows_in=rows_in)
+        self.stages.append(timer)
+        return timer
+
+    def to_dict(self):
+        return {
+            "sample": self.sample,
+            **self.context,
+            "started": self.started,
+            "wall_s": round(time.perf_counter() - self._wall0, 6),
+            "cpu_s": round(time.process_time() - self._cpu0, 6),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": [s.to_dict() for s in self.stages],
+        }
+
+    def write_json(self, path: str):
+        """Append the run as one JSON line to `path` ('-' writes to stdout)."""
+        line = json.dumps(self.to_dict(), default=str)
+        if path == "-":
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+            return
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
@@ -0,0 +1,78 @@
+import os
+from dataclasses import dataclass, field
+
+from .pygwas import MapGWASSNPs
+
+# Outputs a pipeline can be asked for, and the stages each one needs (in run order)
+OUTPUTS = {
+    "annotated": ["map"],
+    "report_data": ["map", "prepare"],
+    "html": ["map", "prepare", "render"],
+}
+
+
+@dataclass
+class PipelineResult:
+    """In-memory results of a Pipeline run; only the requested outputs are filled."""
+    annotated: object = None
+    report_data: object = None
+    html: str = None
+    paths: dict = field(default_factory=dict)
+    metrics: dict = None
+
+
+class Pipeline:
+    """Declare the wanted outputs up front; only the stages (and writes) they need are run.
+
+    >>> Pipeline("s.vcf", "gwas.csv.gz", outputs=["report_data"], write=False).run().report_data
+
+    `outputs` is any of "annotated", "report_data" and "html". With `write=True` each requested
+    output is also written under `output_file_path` (in-house_report.csv, report_data.csv,
+    GWAS_report.html); intermediate outputs that were not requested are never written.
+    Remaining keyword arguments are passed to MapGWASSNPs.
+    """
+
+    def __init__(self, vcf_file_path: str, gwas_file_path: str = None, output_file_path: str = None,
+                 outputs=("annotated",), write: bool = True, **options):
+        outputs = [outputs] if isinstance(outputs, str) else list(outputs)
+        unknown = [o for o in outputs if o not in OUTPUTS]
+        if unknown or not outputs:
+            raise ValueError(f"Unknown outputs {unknown}; choose from {list(OUTPUTS)}")
+        if write and output_file_path is None:
+            raise ValueError("output_file_path is required when write=True")
+        self.outputs = outputs
+        self.write = write
+        self.mapper = MapGWASSNPs(vcf_file_path, gwas_file_path, output_file_path if write else None,
+                                  **options)
+
+    def plan(self) -> list:
+        """Stages that run() will execute for the requested outputs."""
+        stages = []
+        for out in self.outputs:
+            stages += [s for s in OUTPUTS[out] if s not in stages]
+        return stages
+
+    def run(self) -> PipelineResult:
+        mapper = self.mapper
+        plan = self.plan()
+        result = PipelineResult()
+        write = {out: self.write and out in self.outputs for out in OUTPUTS}
+
+        if "map" in plan:
+            mapper.map_snps(write_csv=write["annotated"])
+        if "prepare" in plan:
+            mapper.prepare_report_data(write_csv=write["report_data"])
+        if "render" in plan:
+            result.html = mapper.generate_html_report(write_html=write["html"])
+
+        if "annotated" in self.outputs:
+            result.annotated = mapper.annotated_df
+        if "report_data" in self.outputs:
+            result.report_data = mapper.report_data
+        if self.write:
+            files = {"annotated": os.path.join("data", "in-house_report.csv" + (".gz" if mapper.csv_bgzf else "")),
+                     "report_data": os.path.join("data", "report_data.csv"),
+                     "html": "GWAS_report.html"}
+            result.paths = {out: os.path.join(mapper.report_path, files[out]) for out in self.outputs}
+        result.metrics = mapper.metrics.to_dict()
+        return result
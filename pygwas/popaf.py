@@ -0,0 +1,257 @@
+import argparse
+import json
+import os
+import re
+import shutil
+
+# INFO keys read from a sites VCF when no populations are given
+DEFAULT_POPULATIONS = ["AF"]
+
+# Accepted names of the site columns of a frequency table; every other column is a population
+TABLE_COLUMNS = {
+    "CHROM": ["CHROM", "#CHROM", "CHR", "CHR_ID"],
+    "POS": ["POS", "BP", "POSITION", "CHR_POS"],
+    "REF": ["REF"],
+    "ALT": ["ALT"],
+}
+
+# Annotated output columns are POP_<population>
+COLUMN_PREFIX = "POP_"
+
+META_NAME = "meta.json"
+
+# Bump when the index layout changes; older indexes are rebuilt on open
+INDEX_VERSION = 1
+
+# Sites parsed per chunk while building
+CHUNK_SITES = 500_000
+
+_VCF = re.compile(r'\.vcf(\.gz|\.bgz)?$')
+
+
+def index_path(source: str) -> str:
+    """Default index location: a directory next to the sites file."""
+    return source + ".afidx"
+
+
+def _source_stamp(source: str) -> str:
+    st = os.stat(source)
+    return f"{INDEX_VERSION}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def _meta(path: str) -> dict:
+    try:
+        with open(os.path.join(path, META_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def allele_hash(ref, alt):
+    """Stable uint64 hash of each REF>ALT pair (case-insensitive), compared instead of allele strings."""
+    import pandas as pd
+
+    ref = pd.Series(ref).astype(str).str.upper().reset_index(drop=True)
+    alt = pd.Series(alt).astype(str).str.upper().reset_index(drop=True)
+    return pd.util.hash_array((ref + ">" + alt).to_numpy(dtype=object))
+
+
+# ---------- reading ----------
+def _vcf_chunks(path: str, populations, chunk_sites: int):
+    """Frames of CHROM, POS, REF, ALT and one float column per population, one row per ALT allele."""
+    import numpy as np
+    import pandas as pd
+
+    compression = 'gzip' if path.endswith(('.gz', '.bgz')) else None
+    patterns = {pop: rf'(?:^|;){re.escape(pop)}=([^;]*)' for pop in populations}
+    reader = pd.read_csv(path, compression=compression, sep='\t', comment='#', header=None,
+                         usecols=[0, 1, 3, 4, 7], names=["CHROM", "POS", "REF", "ALT", "INFO"],
+                         dtype={"CHROM": str, "REF": str, "ALT": str, "INFO": str}, chunksize=chunk_sites)
+    with reader:
+        for chunk in reader:
+            alts = chunk["ALT"].str.split(",")
+            n_alt = alts.str.len().to_numpy()
+            rows = np.repeat(np.arange(len(chunk)), n_alt)
+            allele = np.arange(len(rows)) - np.repeat(np.cumsum(n_alt) - n_alt, n_alt)
+            out = {
+                "CHROM": chunk["CHROM"].to_numpy()[rows],
+                "POS": chunk["POS"].to_numpy()[rows],
+                "REF": chunk["REF"].to_numpy()[rows],
+                "ALT": alts.explode().to_numpy(),
+            }
+            for pop, pattern in patterns.items():
+                # Number=A fields hold one value per ALT allele; a record whose value count differs
+                # from its ALT count has no per-allele frequencies, so its alleles stay missing
+                split = chunk["INFO"].str.extract(pattern)[0].str.split(",")
+                n_val = split.str.len().fillna(0).to_numpy(dtype=np.int64)
+                values = pd.to_numeric(split.explode(), errors="coerce").to_numpy(dtype=float)
+                width = np.maximum(n_val, 1)  # a record without the key still explodes to one NaN
+                start = np.cumsum(width) - width
+                per_allele = n_val[rows] == n_alt[rows]
+                picked = values[start[rows] + np.where(per_allele, allele, 0)]
+                out[pop] = np.where(per_allele, picked, np.nan)
+            yield pd.DataFrame(out)
+
+
+def _table_chunks(path: str, populations, chunk_sites: int):
+    import pandas as pd
+
+    sep = "," if re.search(r'\.csv(\.gz)?$', path) else "\t"
+    header = pd.read_csv(path, sep=sep, nrows=0).columns
+    upper = {str(c).upper(): c for c in header}
+    rename = {}
+    for field, names in TABLE_COLUMNS.items():
+        found = next((upper[n] for n in names if n in upper), None)
+        if found is None:
+            raise KeyError(f"No {field} column in frequency table {path}; expected one of {names}")
+        rename[found] = field
+    pops = list(populations or [c for c in header if c not in rename])
+    missing = [p for p in pops if p not in header]
+    if missing:
+        raise KeyError(f"Populations not found in {path}: {missing}")
+    reader = pd.read_csv(path, sep=sep, usecols=list(rename) + pops, chunksize=chunk_sites,
+                         dtype={c: str for c in rename})
+    with reader:
+        for chunk in reader:
+            chunk = chunk.rename(columns=rename)
+            for pop in pops:
+                chunk[pop] = pd.to_numeric(chunk[pop], errors="coerce")
+            yield chunk[list(TABLE_COLUMNS) + pops]
+
+
+def _populations(source: str, populations):
+    if _VCF.search(source):
+        return list(populations or DEFAULT_POPULATIONS)
+    return list(next(_table_chunks(source, populations, 1)).columns[len(TABLE_COLUMNS):])
+
+
+# ---------- building ----------
+def build_af_index(source: str, path: str = None, populations=None, chunk_sites: int = CHUNK_SITES) -> str:
+    """Compile a sites VCF or frequency table into sorted, memory-mappable arrays; returns the index directory.
+
+    Each ALT allele becomes one entry: an int64 position key, a uint64 REF>ALT hash and one
+    float32 frequency per population, sorted by key and then hash. The source is streamed in
+    chunks, so only these compact arrays are ever held.
+    """
+    import numpy as np
+
+    from .positions import assign_codes, encode_positions
+
+    path = path or index_path(source)
+    populations = _populations(source, populations)
+    chunks = _vcf_chunks if _VCF.search(source) else _table_chunks
+    codes, keys, alleles, freqs = {}, [], [], []
+    for chunk in chunks(source, populations, chunk_sites):
+        assign_codes(chunk["CHROM"], codes)
+        key = encode_positions(codes, chunk["CHROM"], chunk["POS"])
+        ok = key >= 0
+        keys.append(key[ok])
+        alleles.append(allele_hash(chunk["REF"], chunk["ALT"])[ok])
+        freqs.append(chunk[populations].to_numpy(dtype=np.float32)[ok])
+
+    key = np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+    allele = np.concatenate(alleles) if alleles else np.empty(0, dtype=np.uint64)
+    af = np.concatenate(freqs) if freqs else np.empty((0, len(populations)), dtype=np.float32)
+    order = np.lexsort((allele, key))
+    key, allele, af = key[order], allele[order], af[order]
+    # The first entry of a repeated site and allele wins
+    first = np.ones(len(key), dtype=bool)
+    first[1:] = (key[1:] != key[:-1]) | (allele[1:] != allele[:-1])
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "key.npy"), key[first])
+    np.save(os.path.join(tmp, "allele.npy"), allele[first])
+    np.save(os.path.join(tmp, "af.npy"), af[first])
+    with open(os.path.join(tmp, META_NAME), "w") as f:
+        json.dump({"source": os.path.abspath(source), "stamp": _source_stamp(source),
+                   "contigs": codes, "populations": populations, "sites": int(first.sum())}, f)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    return path
+
+
+class AlleleFrequencyIndex:
+    """Population allele frequencies looked up by binary search in memory-mapped sorted arrays.
+
+    Only the pages around each queried position are read, so annotating a sample's hits does
+    not depend on loading the (possibly genome-wide) sites file.
+    """
+
+    def __init__(self, path: str):
+        import numpy as np
+
+        with open(os.path.join(path, META_NAME)) as f:
+            meta = json.load(f)
+        self.path = path
+        self.codes = meta["contigs"]
+        self.populations = meta["populations"]
+        self.keys = np.load(os.path.join(path, "key.npy"), mmap_mode="r")
+        self.alleles = np.load(os.path.join(path, "allele.npy"), mmap_mode="r")
+        self.af = np.load(os.path.join(path, "af.npy"), mmap_mode="r")
+
+    @classmethod
+    def open(cls, source: str, populations=None, rebuild: bool = False) -> "AlleleFrequencyIndex":
+        """Open an index directory, or the index of a sites file (built or refreshed as needed).
+
+        An existing index is reused unless the sites file changed or other `populations` are asked for.
+        """
+        if os.path.isdir(source):
+            return cls(source)
+        path = index_path(source)
+        meta = _meta(path)
+        stale = meta.get("stamp") != _source_stamp(source)
+        if rebuild or stale or (populations and list(populations) != meta.get("populations")):
+            build_af_index(source, path, populations)
+        return cls(path)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def columns(self) -> list:
+        return [COLUMN_PREFIX + pop for pop in self.populations]
+
+    def lookup(self, chrom, pos, ref, alt):
+        """POP_<population> frequencies for each (chrom, pos, ref, alt), NaN where the allele is not in the index."""
+        import numpy as np
+        import pandas as pd
+
+        from .positions import encode_positions
+
+        keys = encode_positions(self.codes, chrom, pos)
+        wanted = allele_hash(ref, alt)
+        lo = np.searchsorted(self.keys, keys, side="left")
+        hi = np.searchsorted(self.keys, keys, side="right")
+        counts = np.where(keys >= 0, hi - lo, 0)
+        query = np.repeat(np.arange(len(keys)), counts)
+        idx = np.repeat(lo, counts) + (np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts))
+        hit = np.asarray(self.alleles[idx]) == wanted[query]
+
+        af = np.full((len(keys), len(self.populations)), np.nan)
+        af[query[hit]] = self.af[idx[hit]]
+        return pd.DataFrame(af, columns=self.columns)
+
+
+def build_parser():
+    p = argparse.ArgumentParser(
+        prog="mapgwas af-index",
+        description="Compile population allele frequencies (a sites VCF, or a CHROM/POS/REF/ALT table with one "
+                    "column per population) into an index for --pop-af"
+    )
+    p.add_argument("source", help="Sites VCF (.vcf/.vcf.gz) or frequency table (CSV, or TSV for other names)")
+    p.add_argument("--out", default=None, help="Index directory (default: <source>.afidx)")
+    p.add_argument("--populations", nargs="+", default=None, metavar="NAME",
+                   help="INFO keys of a sites VCF (default: AF), or the table columns to keep (default: all)")
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not os.path.exists(args.source):
+        raise SystemExit(f"Sites file not found: {args.source}")
+    path = build_af_index(args.source, args.out, args.populations)
+    index = AlleleFrequencyIndex(path)
+    print(f"Indexed {len(index):,} alleles for {', '.join(index.populations)} into {path}")
+    return 0
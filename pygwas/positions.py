@@ -0,0 +1,42 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Packed position keys: contig code in the high 32 bits, 1-based position in the low 32 bits
+POS_BITS = 32
+POS_MASK = (1 << POS_BITS) - 1
+
+_CHR_PREFIX = re.compile(r'^chr', re.IGNORECASE)
+
+
+def contig_name(chrom) -> str:
+    """Contig name without a 'chr' prefix ('chr1' and '1' are the same contig; chrM is MT)."""
+    name = _CHR_PREFIX.sub('', str(chrom)).upper()
+    return "MT" if name == "M" else name
+
+
+def assign_codes(chroms, codes: dict = None) -> dict:
+    """Contig name -> small integer code, in order of first appearance; extends `codes` in place if given."""
+    codes = {} if codes is None else codes
+    for chrom in pd.unique(pd.Series(chroms).astype(str)):
+        codes.setdefault(contig_name(chrom), len(codes))
+    return codes
+
+
+def encode_positions(codes: dict, chrom, pos) -> np.ndarray:
+    """int64 keys for (chrom, pos) pairs; -1 where the contig is not in `codes` or pos is not a number."""
+    chrom = pd.Series(chrom).astype(str).reset_index(drop=True)
+    # Map each distinct name once instead of normalising every row
+    distinct = chrom.unique()
+    code_of = {c: codes.get(contig_name(c), -1) for c in distinct}
+    contig = chrom.map(code_of).to_numpy(dtype=np.int64)
+    pos = pd.to_numeric(pd.Series(pos).reset_index(drop=True), errors='coerce').to_numpy(dtype=float)
+    valid = (contig >= 0) & ~np.isnan(pos) & (pos >= 0) & (pos <= POS_MASK)
+    keys = np.full(len(chrom), -1, dtype=np.int64)
+    keys[valid] = (contig[valid] << POS_BITS) | pos[valid].astype(np.int64)
+    return keys
+
+
+def key_positions(keys: np.ndarray) -> np.ndarray:
+    return np.asarray(keys, dtype=np.int64) & POS_MASK
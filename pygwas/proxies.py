@@ -0,0 +1,150 @@
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from .positions import assign_codes, encode_positions, key_positions
+
+# Accepted column names per field (plink --r2 output, or a plain lead/proxy table); case-insensitive
+COLUMN_ALIASES = {
+    "lead_chrom": ["CHR_A", "LEAD_CHROM", "CHROM", "CHR"],
+    "lead_pos": ["BP_A", "LEAD_POS"],
+    "proxy_chrom": ["CHR_B", "PROXY_CHROM"],
+    "proxy_pos": ["BP_B", "PROXY_POS"],
+    "r2": ["R2", "RSQ", "R^2"],
+}
+
+META_NAME = "meta.json"
+
+# Bump when the index layout changes; older indexes are rebuilt on open
+INDEX_VERSION = 1
+
+
+def index_path(table_path: str) -> str:
+    """Default index location: a directory next to the LD table."""
+    return table_path + ".proxyidx"
+
+
+def _source_stamp(path: str) -> str:
+    st = os.stat(path)
+    return f"{INDEX_VERSION}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def _stamp(path: str):
+    try:
+        with open(os.path.join(path, META_NAME)) as f:
+            return json.load(f).get("stamp")
+    except (OSError, ValueError):
+        return None
+
+
+def read_ld_table(path: str) -> pd.DataFrame:
+    """LD pairs as lead_chrom, lead_pos, proxy_pos, r2 (pairs across contigs are dropped).
+
+    `.csv`/`.csv.gz` tables are comma-separated; anything else (plink `.ld`, TSV) is split on whitespace.
+    """
+    sep = "," if re.search(r'\.csv(\.gz)?$', path) else r"\s+"
+    header = pd.read_csv(path, sep=sep, nrows=0).columns
+    upper = {str(c).upper(): c for c in header}
+    pick = {}
+    for field, names in COLUMN_ALIASES.items():
+        found = next((upper[n] for n in names if n in upper), None)
+        if found is None and field != "proxy_chrom":
+            raise KeyError(f"No {field} column in LD table {path}; expected one of {names}")
+        if found is not None:
+            pick[field] = found
+    dtypes = {pick[f]: str for f in ("lead_chrom", "proxy_chrom") if f in pick}
+    table = pd.read_csv(path, sep=sep, usecols=list(pick.values()), dtype=dtypes)
+    table = table.rename(columns={col: field for field, col in pick.items()})
+    if "proxy_chrom" in table.columns:
+        table = table.loc[table["proxy_chrom"] == table["lead_chrom"]].drop(columns="proxy_chrom")
+    return table
+
+
+def build_proxy_index(table_path: str, path: str = None) -> str:
+    """Preprocess an LD table into sorted, memory-mappable arrays and return the index directory.
+
+    Pairs are stored in both directions (LD is symmetric) as int64 lead and proxy position keys
+    plus float32 r², sorted by lead and then by decreasing r².
+    """
+    path = path or index_path(table_path)
+    table = read_ld_table(table_path)
+    codes = assign_codes(table["lead_chrom"])
+    lead = encode_positions(codes, table["lead_chrom"], table["lead_pos"])
+    proxy = encode_positions(codes, table["lead_chrom"], table["proxy_pos"])
+    r2 = pd.to_numeric(table["r2"], errors="coerce").to_numpy(dtype=np.float32)
+    ok = (lead >= 0) & (proxy >= 0) & (lead != proxy) & ~np.isnan(r2)
+
+    pairs = pd.DataFrame({
+        "lead": np.concatenate([lead[ok], proxy[ok]]),
+        "proxy": np.concatenate([proxy[ok], lead[ok]]),
+        "r2": np.concatenate([r2[ok], r2[ok]]),
+    })
+    pairs = (pairs.sort_values(["lead", "r2"], ascending=[True, False], kind="mergesort")
+             .drop_duplicates(["lead", "proxy"]))
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name in ("lead", "proxy", "r2"):
+        np.save(os.path.join(tmp, f"{name}.npy"), pairs[name].to_numpy())
+    with open(os.path.join(tmp, META_NAME), "w") as f:
+        json.dump({"source": os.path.abspath(table_path), "stamp": _source_stamp(table_path),
+                   "contigs": codes, "pairs": int(len(pairs))}, f)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    return path
+
+
+class ProxyIndex:
+    """LD proxies of catalog positions, looked up by binary search in memory-mapped sorted arrays.
+
+    A lookup touches only the index pages around each queried lead, so its cost follows the
+    number of queries and proxies found rather than the size of the LD table.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, META_NAME)) as f:
+            meta = json.load(f)
+        self.path = path
+        self.codes = meta["contigs"]
+        self.leads = np.load(os.path.join(path, "lead.npy"), mmap_mode="r")
+        self.proxies = np.load(os.path.join(path, "proxy.npy"), mmap_mode="r")
+        self.r2 = np.load(os.path.join(path, "r2.npy"), mmap_mode="r")
+
+    @classmethod
+    def open(cls, table_path: str, rebuild: bool = False) -> "ProxyIndex":
+        """Open an index directory, or the index of an LD table (built or refreshed as needed)."""
+        if os.path.isdir(table_path):
+            return cls(table_path)
+        path = index_path(table_path)
+        if rebuild or _stamp(path) != _source_stamp(table_path):
+            build_proxy_index(table_path, path)
+        return cls(path)
+
+    def __len__(self):
+        return len(self.leads)
+
+    def lookup(self, chrom, pos, min_r2: float = 0.0) -> pd.DataFrame:
+        """Proxies with r² >= `min_r2` of each (chrom, pos) lead.
+
+        Returns QUERY (row number of the lead in the inputs), PROXY_POS and PROXY_R2, ordered by
+        query and then by decreasing r².
+        """
+        keys = encode_positions(self.codes, chrom, pos)
+        lo = np.searchsorted(self.leads, keys, side="left")
+        hi = np.searchsorted(self.leads, keys, side="right")
+        counts = np.where(keys >= 0, hi - lo, 0)
+        total = int(counts.sum())
+        query = np.repeat(np.arange(len(keys)), counts)
+        idx = np.repeat(lo, counts) + (np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts))
+        r2 = np.asarray(self.r2[idx])
+        keep = r2 >= min_r2
+        return pd.DataFrame({
+            "QUERY": query[keep],
+            "PROXY_POS": key_positions(self.proxies[idx[keep]]),
+            "PROXY_R2": r2[keep].astype(float),
+        })
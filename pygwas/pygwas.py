@@ -1,11 +1,25 @@
 import os
 import re
 import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from jinja2 import Template
+
+# plotly and jinja2 are imported by the render steps that use them, keeping mapping-only runs light
+
+from . import bgzf
+from .assets import ENCODINGS, PLOTLY_CDN, PLOTLY_NAME, compress, write_precompressed, write_shared_assets
+from .catalog import load_gwas_catalog
+from .metrics import RunMetrics
+from .popaf import COLUMN_PREFIX as POP_PREFIX, AlleleFrequencyIndex
+from .proxies import ProxyIndex
+from .qc import VARIANT_TYPES, VariantQC
+from .reference import FastaReference
+from .regions import RegionIndex
+from .traits import summary_label, trait_summary
+from .vcf import (CHUNK_LINES, STATS_COLUMNS, VCF_COLUMNS, CatalogPositions, declared_format_keys, prefilter_vcf,
+                  read_vcf)
 
 class MapGWASSNPs:
 
@@ -13,38 +27,155 @@ class MapGWASSNPs:
     
     '''
     def __init__(self, vcf_file_path: str, gwas_file_path: str, output_file_path: str,
-                 cut_off_qual: int = 20, filt_nr_disease: bool = True):
+                 cut_off_qual: int = 20, filt_nr_disease: bool = True,
+                 sample: str = None, quiet: bool = False, gwas_columns=None,
+                 info_fields=None, info_filters=None, keep_info: bool = False,
+                 carriers_only: bool = True, min_gq: float = None, format_fields=None,
+                 regions=None, top_k: int = 1, gwas_df: pd.DataFrame = None,
+                 sunburst_depth: int = None, sunburst_max_children: int = 25,
+                 assets_dir: str = None, vendor_plotly: bool = False, precompress=None,
+                 reference=None, join_workers: int = 1, join_executor: str = "process",
+                 prefilter: bool = True, results_db: str = None, csv_bgzf: bool = False,
+                 ld_proxies=None, proxy_min_r2: float = 0.8, pop_af=None, catalog_positions=None):
         self.vcf_file = vcf_file_path
         self.gwas_file = gwas_file_path
-        self.output_root = output_file_path.replace('\\', '/').rstrip('/')
 
-        # Output folders
-        self.report_path = os.path.join(self.output_root, "report")
-        self.report_data_path = os.path.join(self.report_path, "data")
-        os.makedirs(self.report_data_path, exist_ok=True)
+        # Output folders (output_file_path=None keeps every result in memory)
+        if output_file_path is not None:
+            self.output_root = output_file_path.replace('\\', '/').rstrip('/')
+            self.report_path = os.path.join(self.output_root, "report")
+            self.report_data_path = os.path.join(self.report_path, "data")
+            os.makedirs(self.report_data_path, exist_ok=True)
+        else:
+            self.output_root = self.report_path = self.report_data_path = None
 
         self.cut_off_qual = cut_off_qual
         self.filt_nr_disease = filt_nr_disease
+        # Extra catalog columns to carry into the annotated output
+        self.gwas_columns = list(gwas_columns or [])
+        # Pre-loaded catalog (see load_gwas_catalog) shared by long-running callers; never modified
+        self.gwas_df = gwas_df
+        # Its CatalogPositions (after the regions filter) for the prefilter, shared the same way
+        self.catalog_positions = catalog_positions
+
+        # INFO keys extracted into numeric INFO_<KEY> columns, and per-key minimums applied before the join
+        self.info_filters = dict(info_filters or {})
+        self.info_fields = list(dict.fromkeys(list(info_fields or []) + list(self.info_filters)))
+        self.keep_info = keep_info
+
+        # Genotype handling: GT is always parsed; GQ/DP etc. become FMT_<KEY> columns on request
+        self.carriers_only = carriers_only
+        self.min_gq = min_gq
+        self.format_fields = list(dict.fromkeys(list(format_fields or []) + (["GQ"] if min_gq is not None else [])))
+
+        # Optional BED target regions (path or RegionIndex) restricting both the VCF and the catalog
+        self.regions = RegionIndex.from_bed(regions) if isinstance(regions, str) else regions
+
+        # Optional reference FASTA (path or FastaReference) used to left-align and trim indels before the join
+        self.reference = FastaReference(reference) if isinstance(reference, str) else reference
+
+        # Optional LD table (path, index directory or ProxyIndex): catalog positions without a call
+        # are matched through their best called proxy with r2 >= proxy_min_r2
+        self.proxies = ProxyIndex.open(ld_proxies) if isinstance(ld_proxies, str) else ld_proxies
+        self.proxy_min_r2 = float(proxy_min_r2)
+        # Population allele frequencies (an AlleleFrequencyIndex, its directory or a sites file) added
+        # to the annotated rows as POP_<population> columns
+        self.pop_af = AlleleFrequencyIndex.open(pop_af) if isinstance(pop_af, str) else pop_af
+
+        # Fully parse only VCF lines on a catalog position; the rest take a statistics-only path
+        self.prefilter = prefilter
+
+        # SQLite results database the annotated rows are also loaded into (see pygwas.results)
+        self.results_db = results_db
+
+        # Write the annotated CSV as block-gzipped in-house_report.csv.gz (+ .gzi index)
+        self.csv_bgzf = csv_bgzf
+        self.annotated_csv = None
+
+        # Step 4 join split per chromosome over this many worker processes (or threads)
+        if join_executor not in ("process", "thread"):
+            raise ValueError(f"join_executor must be 'process' or 'thread', got {join_executor!r}")
+        self.join_workers = max(int(join_workers or 1), 1)
+        self.join_executor = join_executor
+
+        # Number of hits per trait kept in the report data (best p-value, then highest RAF)
+        self.top_k = top_k
+        # Sunburst rings drawn and children kept per node before the rest are merged into "Other"
+        self.sunburst_depth = sunburst_depth
+        self.sunburst_max_children = sunburst_max_children
+        # Shared CSS/JS (and optionally Plotly) written once into assets_dir instead of inlined per report
+        if vendor_plotly and not assets_dir:
+            raise ValueError("vendor_plotly requires assets_dir")
+        self.assets_dir = assets_dir
+        self.vendor_plotly = vendor_plotly
+        # Content encodings ("gzip", "br") written next to each HTML output
+        self.precompress = list(precompress or [])
+        for encoding in self.precompress:
+            if encoding not in ENCODINGS:
+                raise ValueError(f"Unknown encoding {encoding!r}; choose from {list(ENCODINGS)}")
+            compress(b"", encoding)  # fail before mapping if the codec is not installed
+        self.sample = sample or os.path.basename(self.output_root or "") or "sample"
+        self.quiet = quiet
+
+        # Per-stage wall/CPU time, row counts and peak RSS
+        self.metrics = RunMetrics(sample=self.sample, vcf=self.vcf_file, gwas=self.gwas_file)
 
         # Will be filled later
-        self.vcf_report = None
+        self.qc = None
         self.annotated_df = None
         self.report_data = None
+        self.trait_summary = None
 
     # ---------- helpers ----------
+    def _log(self, *args):
+        if not self.quiet:
+            print(*args)
+
+    def _output_file(self, *parts) -> str:
+        if self.output_root is None:
+            raise RuntimeError("No output_file_path was given; results can only be kept in memory.")
+        path = os.path.join(self.report_path, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
     @staticmethod
-    def _classify_variant(ref: str, alt: str) -> str:
-        # ALT can be comma-separated (multi-allelic) – choose first for type check
-        alt_first = str(alt).split(',')[0]
-        rl, al = len(str(ref)), len(alt_first)
-        if rl == 1 and al == 1:
-            return "SNPs"
-        elif rl < al:
-            return "INS"
-        elif rl > al:
-            return "DEL"
-        else:
-            return "COMPLEX"
+    def _classify_variants(ref: pd.Series, alt: pd.Series) -> pd.Series:
+        """SNPs / INS / DEL / COMPLEX from REF and (single-allele) ALT lengths, for the whole column at once."""
+        types = np.array(VARIANT_TYPES, dtype=object)[MapGWASSNPs._type_codes(ref, alt)]
+        return pd.Series(types, index=ref.index)
+
+    @staticmethod
+    def _lengths(s: pd.Series) -> np.ndarray:
+        """Length of each value as a string; a categorical is measured once per category."""
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            lengths = s.cat.categories.astype(str).str.len().to_numpy()
+            # Code -1 (missing) picks the trailing 3, the length of 'nan' as astype(str) spells it
+            return np.append(lengths, 3)[s.cat.codes.to_numpy()]
+        return s.astype(str).str.len().to_numpy()
+
+    @staticmethod
+    def _type_codes(ref: pd.Series, alt: pd.Series) -> np.ndarray:
+        """Index into VARIANT_TYPES (SNPs, INS, DEL, COMPLEX) from REF and ALT lengths."""
+        rl, al = MapGWASSNPs._lengths(ref), MapGWASSNPs._lengths(alt)
+        return np.select([(rl == 1) & (al == 1), rl < al, rl > al], [0, 1, 2], default=3)
+
+    @staticmethod
+    def _split_alleles(vcf_df: pd.DataFrame) -> pd.DataFrame:
+        """One row per ALT allele, with ALT_INDEX holding the allele's number in GT (1 = first ALT).
+
+        Spanning-deletion ('*') and missing ('.') alleles are dropped.
+        """
+        if not vcf_df["ALT"].astype(str).str.contains(',', regex=False).any():
+            out = vcf_df.assign(ALT_INDEX=1)
+            return out.loc[~out["ALT"].isin(["*", "."])].reset_index(drop=True)
+        alts = vcf_df["ALT"].astype(str).str.split(',')
+        counts = alts.str.len().to_numpy()
+        out = vcf_df.loc[vcf_df.index.repeat(counts)].copy()
+        # Allele number = position within each record's run of the flattened allele array
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        out["ALT"] = np.concatenate(alts.to_numpy()) if len(alts) else np.array([], dtype=object)
+        out["ALT_INDEX"] = np.arange(counts.sum()) - starts + 1
+        return out.loc[~out["ALT"].isin(["*", "."])].reset_index(drop=True)
 
     @staticmethod
     def _to_numeric_safe(s: pd.Series) -> pd.Series:
@@ -63,119 +194,609 @@ class MapGWASSNPs:
         )
         return pd.to_numeric(cleaned, errors='coerce')
 
-    # ---------- pipeline ----------
-    def map_snps(self):
-        print("Step 1: Reading VCF file...")
-        vcf_columns = ["CHROM", "POS", "ID", "REF", "ALT", "QUAL", "FILTER", "INFO", "FORMAT", "SAMPLE"]
-        if self.vcf_file.endswith('.gz'):
-            vcf_df = pd.read_csv(self.vcf_file, compression='gzip', sep='\t', comment="#", names=vcf_columns)
-        else:
-            vcf_df = pd.read_csv(self.vcf_file, comment="#", sep='\t', names=vcf_columns)
+    @staticmethod
+    def _extract_info_fields(info: pd.Series, keys) -> pd.DataFrame:
+        """Extract numeric INFO values for `keys` with a single regex pass over the whole column.
 
-        # Normalize basic types
-        vcf_df["CHROM"] = vcf_df["CHROM"].astype(str)
-        vcf_df["POS"] = vcf_df["POS"].astype(str)
-        vcf_df["QUAL"] = self._to_numeric_safe(vcf_df["QUAL"])
+        Multi-valued entries (e.g. SR=1,2,3,4) keep their first value; absent keys become NaN.
+        """
+        columns = [f"INFO_{k}" for k in keys]
+        if not keys or info.empty:
+            return pd.DataFrame({c: pd.Series(np.nan, index=info.index, dtype=float) for c in columns})
+        pattern = r'(?:^|;)(' + '|'.join(re.escape(k) for k in keys) + r')=([^;,]*)'
+        found = info.astype(str).str.extractall(pattern).droplevel('match')
+        found.columns = ["KEY", "VALUE"]
+        found["VALUE"] = pd.to_numeric(found["VALUE"], errors='coerce')
+        wide = (found.set_index("KEY", append=True)["VALUE"]
+                .groupby(level=[0, 1]).first()
+                .unstack("KEY"))
+        wide = wide.reindex(index=info.index, columns=list(keys))
+        wide.columns = columns
+        return wide.astype(float)
+
+    @staticmethod
+    def _extract_format_fields(fmt: pd.Series, sample: pd.Series, keys) -> pd.DataFrame:
+        """Pull FORMAT `keys` out of the SAMPLE column.
 
-        # Filter QUAL >= cutoff ONLY ONCE (affects both merge and stats)
-        vcf_df = vcf_df.loc[vcf_df["QUAL"] >= float(self.cut_off_qual)].copy()
-        print(f'Number of variants PASS at Quality ≥ {self.cut_off_qual}: {vcf_df.shape[0]:,}')
+        The position of each key is resolved once per distinct FORMAT layout rather than per row,
+        and each key is cut out of the SAMPLE strings with one vectorised regex.
+        """
+        out = pd.DataFrame({k: pd.Series(np.nan, index=fmt.index, dtype=object) for k in keys})
+        if fmt.empty:
+            return out
+        layouts = fmt.dropna().astype(str)
+        for layout, idx in layouts.groupby(layouts).groups.items():
+            fields = layout.split(':')
+            sub = sample.loc[idx].astype(str)
+            n_fields = sub.str.count(':').to_numpy() + 1
+            for key in keys:
+                if key in fields:
+                    i = fields.index(key)
+                    value = sub.str.replace(rf'^(?:[^:]*:){{{i}}}([^:]*).*$', r'\1', regex=True)
+                    out.loc[idx, key] = value.astype(object).where(n_fields > i)
+        return out
 
-        # Variant type
-        vcf_df["TYPE"] = vcf_df.apply(lambda r: self._classify_variant(r["REF"], r["ALT"]), axis=1)
+    @staticmethod
+    def _zygosity(gt: pd.Series, allele=None) -> pd.Series:
+        """Classify GT strings as het / hom-alt / hom-ref / no-call ('unknown' when GT is absent).
 
-        self.vcf_report = vcf_df.copy()
-        print("VCF file FILTER=='PASS' count (after QUAL filter):", vcf_df[vcf_df["FILTER"] == "PASS"].shape[0])
+        With `allele` (the ALT_INDEX of each row) zygosity is for that allele only, and genotypes
+        carrying only other ALT alleles are 'other-alt'. Each distinct (GT, allele) pair is
+        classified once.
+        """
+        if gt.empty:
+            return pd.Series([], index=gt.index, dtype=object)
+        gt_codes, gt_values = pd.factorize(gt, use_na_sentinel=False)
+        alleles = np.zeros(len(gt), dtype=np.int64) if allele is None else np.asarray(allele, dtype=np.int64)
+        width = int(alleles.max()) + 1
+        pairs, inverse = np.unique(gt_codes.astype(np.int64) * width + alleles, return_inverse=True)
+        unique_gt = pd.Series(np.asarray(gt_values, dtype=object)[pairs // width])
+        unique_allele = None if allele is None else pairs % width
+        zyg = MapGWASSNPs._zygosity_distinct(unique_gt, unique_allele)
+        return pd.Series(zyg[inverse.ravel()], index=gt.index)
 
-        print("Step 2: Reading GWAS catalog...")
-        if self.gwas_file.endswith('.gz'):
-            gwas_df = pd.read_csv(self.gwas_file, low_memory=False, compression='gzip')
+    @staticmethod
+    def _zygosity_distinct(gt: pd.Series, allele=None) -> np.ndarray:
+        alleles = gt.astype(str).str.replace('|', '/', regex=False).str.split('/', expand=True)
+        ploidy = alleles.notna().sum(axis=1).to_numpy()
+        codes = alleles.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        called = ~np.isnan(codes)
+        n_called = called.sum(axis=1)
+        any_alt = (np.where(called, codes, 0) > 0).any(axis=1)
+        if allele is None:
+            copies = np.where(called, codes > 0, False).sum(axis=1)
         else:
-            gwas_df = pd.read_csv(self.gwas_file, low_memory=False)
-        print("GWAS catalog shape:", gwas_df.shape)
-
-        print("Step 3: Normalizing identifiers...")
-        gwas_df["CHR_ID"] = gwas_df["CHR_ID"].astype(str)
-        gwas_df["CHR_POS"] = gwas_df["CHR_POS"].astype(str)
-        print("Identifier normalization PASS")
+            copies = (codes == np.asarray(allele, dtype=float)[:, None]).sum(axis=1)
+        return np.select(
+            [gt.isna().to_numpy(), n_called == 0, ~any_alt, copies == 0,
+             (copies == ploidy) & (n_called == ploidy)],
+            ["unknown", "no-call", "hom-ref", "other-alt", "hom-alt"],
+            default="het"
+        )
 
-        print("Step 4: Merge on chromosome/position...")
+    @staticmethod
+    def _join_partition(vcf_df: pd.DataFrame, gwas_df: pd.DataFrame, filt_nr_disease: bool = True) -> pd.DataFrame:
+        """Inner-join VCF rows to catalog rows on chromosome/position, then drop and clean as Step 4 does."""
         annotated_df = pd.merge(
             vcf_df, gwas_df,
             left_on=["CHROM", "POS"],
             right_on=["CHR_ID", "CHR_POS"],
             how="inner"
         )
-        print("Merge PASS; rows:", annotated_df.shape[0])
-
         # Keep essential + clean numerics before filters/agg
-        if "DISEASE/TRAIT" in annotated_df.columns:
-            annotated_df.dropna(subset=['DISEASE/TRAIT'], inplace=True)
-        else:
-            raise KeyError("Column 'DISEASE/TRAIT' not found in GWAS file.")
+        annotated_df = annotated_df.dropna(subset=['DISEASE/TRAIT'])
 
         # Optional: filter out "NR" traits
-        if self.filt_nr_disease:
+        if filt_nr_disease:
             annotated_df = annotated_df[annotated_df["DISEASE/TRAIT"].astype(str) != "NR"]
 
         # Clean numeric GWAS columns used later
         for col in ["RISK ALLELE FREQUENCY", "P-VALUE"]:
             if col in annotated_df.columns:
-                annotated_df[col] = self._to_numeric_safe(annotated_df[col])
+                annotated_df[col] = MapGWASSNPs._to_numeric_safe(annotated_df[col])
+        return annotated_df
+
+    def _partitioned_join(self, vcf_df: pd.DataFrame, gwas_df: pd.DataFrame) -> pd.DataFrame:
+        """Run _join_partition per chromosome on a worker pool; rows come back in single-join order."""
+        from concurrent.futures import ProcessPoolExecutor
+
+        vcf_df = vcf_df.assign(_ROW=np.arange(len(vcf_df)))
+        catalog_parts = dict(tuple(gwas_df.groupby("CHR_ID", sort=False, observed=True)))
+        parts = [(part, catalog_parts[chrom]) for chrom, part in vcf_df.groupby("CHROM", sort=False)
+                 if chrom in catalog_parts]
+        if not parts:
+            return self._join_partition(vcf_df, gwas_df.iloc[:0], self.filt_nr_disease).drop(columns="_ROW")
+        # Largest partitions first so the big chromosomes do not finish last
+        parts.sort(key=lambda p: len(p[0]) * len(p[1]), reverse=True)
+
+        pool = ProcessPoolExecutor if self.join_executor == "process" else ThreadPoolExecutor
+        with pool(max_workers=min(self.join_workers, len(parts))) as executor:
+            joined = list(executor.map(self._join_partition, [v for v, _ in parts], [g for _, g in parts],
+                                       [self.filt_nr_disease] * len(parts)))
+        annotated_df = pd.concat(joined, ignore_index=True)
+        # pd.merge keeps the VCF row order, so restoring it makes the output independent of partitioning
+        order = np.argsort(annotated_df["_ROW"].to_numpy(), kind="mergesort")
+        return annotated_df.iloc[order].drop(columns="_ROW").reset_index(drop=True)
+
+    def _catalog_proxies(self, gwas_df: pd.DataFrame) -> pd.DataFrame:
+        """CHR_ID, CHR_POS, PROXY_POS, PROXY_R2 for every catalog position, best proxy first."""
+        leads = gwas_df[["CHR_ID", "CHR_POS"]].dropna().astype(str).drop_duplicates()
+        found = self.proxies.lookup(leads["CHR_ID"], leads["CHR_POS"], self.proxy_min_r2)
+        pairs = leads.iloc[found["QUERY"].to_numpy()].reset_index(drop=True)
+        pairs["PROXY_POS"] = found["PROXY_POS"].astype(str).to_numpy()
+        pairs["PROXY_R2"] = found["PROXY_R2"].to_numpy()
+        return pairs
+
+    def _proxy_join(self, vcf_df: pd.DataFrame, gwas_df: pd.DataFrame, pairs: pd.DataFrame) -> pd.DataFrame:
+        """Join catalog rows whose own position was not called to the VCF through their best called proxy.
+
+        The result has the direct join's columns with CHR_POS still the catalog position, while
+        POS/REF/ALT/ZYGOSITY describe the proxy call; PROXY_POS and PROXY_R2 record the proxy.
+        """
+        called = set((vcf_df["CHROM"] + ":" + vcf_df["POS"]).tolist())
+        lead_key = pairs["CHR_ID"] + ":" + pairs["CHR_POS"]
+        proxy_key = pairs["CHR_ID"] + ":" + pairs["PROXY_POS"]
+        usable = ~lead_key.isin(called) & proxy_key.isin(called)
+        # pairs are ordered by decreasing r2 within each lead, so the first usable one is the best
+        best = pairs.loc[usable.to_numpy()].drop_duplicates(["CHR_ID", "CHR_POS"])
+        unmatched = gwas_df.merge(best, on=["CHR_ID", "CHR_POS"], how="inner")
+        unmatched = unmatched.rename(columns={"CHR_POS": "LEAD_POS", "PROXY_POS": "CHR_POS"})
+        joined = self._join_partition(vcf_df, unmatched, self.filt_nr_disease)
+        joined["PROXY_POS"] = joined["CHR_POS"]
+        joined["CHR_POS"] = joined["LEAD_POS"]
+        return joined.drop(columns="LEAD_POS")
+
+    # ---------- pipeline ----------
+    def _filter_variants(self, vcf_df: pd.DataFrame) -> pd.DataFrame:
+        """Region, QUAL, INFO and genotype filters, allele split, normalisation and classification.
+
+        Applied to the records that go on to the join; the QC statistics take the light path in
+        _update_qc instead.
+        """
+        stage = self.metrics.stage
+        log = self._log
+
+        if self.regions is not None:
+            with stage("region_filter", rows_in=len(vcf_df)) as st:
+                vcf_df = vcf_df.loc[self.regions.contains(vcf_df["CHROM"], vcf_df["POS"])]
+                st.rows(rows_out=len(vcf_df))
+            log(f'Number of variants inside target regions: {vcf_df.shape[0]:,}')
+
+        with stage("qual_filter", rows_in=len(vcf_df)) as st:
+            # Normalize basic types
+            vcf_df["CHROM"] = vcf_df["CHROM"].astype(str)
+            vcf_df["POS"] = vcf_df["POS"].astype(str)
+            # VCF QUAL is a plain number or '.', so the catalog-style cleaning is not needed here
+            vcf_df["QUAL"] = pd.to_numeric(vcf_df["QUAL"], errors='coerce')
+
+            # Filter QUAL >= cutoff ONLY ONCE (affects both merge and stats)
+            vcf_df = vcf_df.loc[vcf_df["QUAL"] >= float(self.cut_off_qual)].copy()
+            st.rows(rows_out=len(vcf_df))
+        log(f'Number of variants PASS at Quality ≥ {self.cut_off_qual}: {vcf_df.shape[0]:,}')
+
+        info_keys = self.info_fields
+        if info_keys:
+            with stage("info_filter", rows_in=len(vcf_df)) as st:
+                info_df = self._extract_info_fields(vcf_df["INFO"], info_keys)
+                vcf_df = pd.concat([vcf_df, info_df], axis=1)
+                for key, minimum in self.info_filters.items():
+                    vcf_df = vcf_df.loc[vcf_df[f"INFO_{key}"] >= float(minimum)]
+                st.rows(rows_out=len(vcf_df))
+            log(f'Number of variants PASS INFO filters {self.info_filters}: {vcf_df.shape[0]:,}')
+        if not self.keep_info and "INFO" in vcf_df.columns:
+            vcf_df = vcf_df.drop(columns=["INFO"])
+
+        with stage("allele_split", rows_in=len(vcf_df)) as st:
+            vcf_df = self._split_alleles(vcf_df)
+            st.rows(rows_out=len(vcf_df))
+        log(f'Number of ALT alleles after splitting multi-allelic records: {vcf_df.shape[0]:,}')
+
+        format_fields = self.format_fields
+        with stage("genotype_filter", rows_in=len(vcf_df)) as st:
+            fmt_df = self._extract_format_fields(vcf_df["FORMAT"], vcf_df["SAMPLE"], ["GT"] + format_fields)
+            vcf_df["GT"] = fmt_df["GT"]
+            vcf_df["ZYGOSITY"] = self._zygosity(vcf_df["GT"], allele=vcf_df["ALT_INDEX"])
+            for key in format_fields:
+                vcf_df[f"FMT_{key}"] = pd.to_numeric(fmt_df[key], errors='coerce')
+            if self.carriers_only:
+                vcf_df = vcf_df.loc[vcf_df["ZYGOSITY"].isin(["het", "hom-alt", "unknown"])]
+            if self.min_gq is not None:
+                vcf_df = vcf_df.loc[vcf_df["FMT_GQ"] >= float(self.min_gq)]
+            st.rows(rows_out=len(vcf_df))
+        log(f'Number of carried variants (het/hom-alt): {vcf_df.shape[0]:,}')
+
+        if self.reference is not None:
+            with stage("normalize", rows_in=len(vcf_df)) as st:
+                pos, ref, alt, changed, mismatched = self.reference.normalize(
+                    vcf_df["CHROM"], vcf_df["POS"], vcf_df["REF"], vcf_df["ALT"])
+                rows = vcf_df.index[changed]
+                vcf_df.loc[rows, "POS"] = pos[changed].astype(np.int64).astype(str)
+                vcf_df.loc[rows, "REF"] = ref[changed]
+                vcf_df.loc[rows, "ALT"] = alt[changed]
+                st.extra.update(normalized=int(changed.sum()), ref_mismatch=int(mismatched.sum()))
+                st.rows(rows_out=len(vcf_df))
+            log(f'Variants left-aligned/trimmed against the reference: {int(changed.sum()):,} '
+                f'(REF mismatches left as is: {int(mismatched.sum()):,})')
+
+        with stage("classify", rows_in=len(vcf_df)) as st:
+            # Variant type, per ALT allele
+            vcf_df["TYPE"] = self._classify_variants(vcf_df["REF"], vcf_df["ALT"])
+            st.rows(rows_out=len(vcf_df))
+        return vcf_df
+
+    def _format_values(self, fmt: pd.Series, sample: pd.Series, keys):
+        """(codes, distinct): _extract_format_fields run once per distinct (FORMAT, SAMPLE) pair.
+
+        `distinct.iloc[codes]` lines up with the input rows.
+        """
+        fmt_codes, fmts = pd.factorize(fmt, use_na_sentinel=False)
+        sample_codes, samples = pd.factorize(sample, use_na_sentinel=False)
+        width = max(len(samples), 1)
+        codes, pairs = pd.factorize(fmt_codes.astype(np.int64) * width + sample_codes)
+        distinct = self._extract_format_fields(pd.Series(np.asarray(fmts, dtype=object)[pairs // width]),
+                                               pd.Series(np.asarray(samples, dtype=object)[pairs % width]), keys)
+        return codes, distinct
+
+    def _update_qc(self, qc: VariantQC, chunk: pd.DataFrame):
+        """Light QC path for raw VCF records: the filters of _filter_variants without its full parse.
+
+        FORMAT values and zygosity are resolved once per distinct genotype string, only
+        multi-allelic records are split, and only multi-base alleles are normalised.
+        """
+        if self.regions is not None:
+            chunk = chunk.loc[self.regions.contains(chunk["CHROM"], chunk["POS"])]
+        qual = pd.to_numeric(chunk["QUAL"], errors='coerce')
+        passed = (qual >= float(self.cut_off_qual)).to_numpy()
+        chunk = chunk.loc[passed].assign(QUAL=qual[passed])
+        if self.info_filters:
+            info = self._extract_info_fields(chunk["INFO"], list(self.info_filters))
+            keep = np.ones(len(chunk), dtype=bool)
+            for key, minimum in self.info_filters.items():
+                keep &= (info[f"INFO_{key}"] >= float(minimum)).to_numpy()
+            chunk = chunk.loc[keep]
+        if chunk.empty:
+            return
+
+        format_fields = ["GQ", "DP"] if self.min_gq is not None else ["DP"]
+        codes, distinct = self._format_values(chunk["FORMAT"], chunk["SAMPLE"], ["GT"] + format_fields)
+        values = {f"FMT_{k}": pd.to_numeric(distinct[k], errors='coerce').to_numpy(dtype=float)[codes]
+                  for k in format_fields}
+        chunk = chunk.drop(columns=["FORMAT", "SAMPLE"]).assign(**values)
+        alt = chunk["ALT"] if isinstance(chunk["ALT"].dtype, pd.CategoricalDtype) else chunk["ALT"].astype(str)
+        multi = alt.str.contains(',', regex=False).to_numpy(dtype=bool, na_value=False)
+
+        # Biallelic records: zygosity of allele 1, classified per distinct GT
+        zyg_codes, zyg_values = pd.factorize(self._zygosity(distinct["GT"], allele=np.ones(len(distinct))))
+        single = chunk.loc[~multi].assign(
+            ZYGOSITY=pd.Categorical.from_codes(zyg_codes[codes[~multi]], zyg_values))
+        self._update_qc_alleles(qc, single.loc[~single["ALT"].isin(["*", "."])])
+
+        if multi.any():
+            # Het/hom are counted once per record from its GT, not once per split allele
+            records = chunk.loc[multi].assign(GT=distinct["GT"].to_numpy()[codes[multi]],
+                                              RECORD=np.arange(int(multi.sum())))
+            split = self._split_alleles(records)
+            split["ZYGOSITY"] = self._zygosity(split["GT"], allele=split["ALT_INDEX"]).to_numpy()
+            self._update_qc_alleles(qc, split.drop(columns="ALT_INDEX"))
+
+    def _update_qc_alleles(self, qc: VariantQC, alleles: pd.DataFrame):
+        keep = np.ones(len(alleles), dtype=bool)
+        if self.carriers_only:
+            keep &= alleles["ZYGOSITY"].isin(["het", "hom-alt", "unknown"]).to_numpy()
+        if self.min_gq is not None:
+            keep &= (alleles["FMT_GQ"] >= float(self.min_gq)).to_numpy()
+        alleles = alleles.loc[keep]
+        if alleles.empty:
+            return
+
+        ref, alt = alleles["REF"], alleles["ALT"]
+        if self.reference is not None:
+            # Trimming can change an allele's type; SNVs are never touched
+            multi_base = (self._lengths(ref) > 1) | (self._lengths(alt) > 1)
+            if multi_base.any():
+                _, new_ref, new_alt, changed, _ = self.reference.normalize(
+                    alleles["CHROM"][multi_base], alleles["POS"][multi_base], ref[multi_base], alt[multi_base])
+                rows = alleles.index[np.flatnonzero(multi_base)[changed]]
+                alleles = alleles.astype({"REF": object, "ALT": object})
+                alleles.loc[rows, "REF"] = new_ref[changed]
+                alleles.loc[rows, "ALT"] = new_alt[changed]
+                ref, alt = alleles["REF"], alleles["ALT"]
+        alleles = alleles.assign(TYPE=pd.Categorical.from_codes(self._type_codes(ref, alt), VARIANT_TYPES))
+        genotypes = None
+        if "RECORD" in alleles.columns:
+            genotypes = alleles["GT"].loc[~alleles["RECORD"].duplicated()]
+            alleles = alleles.drop(columns=["GT", "RECORD"])
+        qc.update(alleles, genotypes)
+
+    def _read_catalog(self) -> pd.DataFrame:
+        with self.metrics.stage("catalog_read") as st:
+            if self.gwas_df is not None:
+                gwas_df = self.gwas_df
+            else:
+                gwas_df = load_gwas_catalog(self.gwas_file, extra_columns=self.gwas_columns)
+            if self.regions is not None:
+                gwas_df = gwas_df.loc[self.regions.contains(gwas_df["CHR_ID"], gwas_df["CHR_POS"])]
+            st.rows(rows_out=len(gwas_df))
+        # load_gwas_catalog already reads the keys as strings; convert (on a new frame) only if needed
+        keys = {c: gwas_df[c].astype(str) for c in ["CHR_ID", "CHR_POS"]
+                if not pd.api.types.is_string_dtype(gwas_df[c])}
+        if keys:
+            gwas_df = gwas_df.assign(**keys)
+        return gwas_df
+
+    def _load_catalog(self, positions: Future = None):
+        """Catalog, LD proxy pairs and (via `positions`) the prefilter's position set; run off the main thread."""
+        try:
+            gwas_df = self._read_catalog()
+            proxy_pairs = None
+            if self.proxies is not None:
+                with self.metrics.stage("proxy_lookup", rows_in=len(gwas_df)) as st:
+                    proxy_pairs = self._catalog_proxies(gwas_df)
+                    st.rows(rows_out=len(proxy_pairs))
+            if positions is not None:
+                found = self.catalog_positions or CatalogPositions.from_catalog(gwas_df)
+                if proxy_pairs is not None:
+                    # Never extend the shared set in place
+                    found = CatalogPositions(found.positions).add(proxy_pairs["CHR_ID"], proxy_pairs["PROXY_POS"])
+                positions.set_result(found)
+        except BaseException as exc:
+            if positions is not None and not positions.done():
+                positions.set_exception(exc)
+            raise
+        return gwas_df, proxy_pairs
+
+    # ---------- pipeline ----------
+    def map_snps(self, write_csv: bool = True):
+        # The catalog is read and normalised on a background thread while the VCF is streamed;
+        # the prefilter takes the catalog positions as soon as they are known
+        self._log("Step 1: Reading GWAS catalog (in the background)...")
+        positions = Future() if self.prefilter else None
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="mapgwas-catalog") as pool:
+            catalog = pool.submit(self._load_catalog, positions)
+
+            self._log("Step 2: Reading VCF file...")
+            # QC statistics are reduced chunk by chunk into fixed-size counters, so no copy of the
+            # filtered VCF is kept for the report
+            qc = VariantQC()
+            update_qc = lambda chunk: self._update_qc(qc, chunk)
+            # INFO is only tokenised for INFO filters, or as the depth source when FORMAT has no DP
+            stats_columns = list(STATS_COLUMNS)
+            if self.info_filters or "DP" not in declared_format_keys(self.vcf_file):
+                stats_columns.append("INFO")
+            if self.prefilter:
+                # Only records on a catalog position are fully parsed and go on to the join
+                with self.metrics.stage("vcf_read") as st:
+                    vcf_df = prefilter_vcf(self.vcf_file, positions, on_chunk=update_qc,
+                                           stats_columns=stats_columns, keep_non_snv=self.reference is not None)
+                    st.rows(rows_out=len(vcf_df))
+                    st.extra["catalog_positions"] = len(positions.result())
+            else:
+                # One pass: each chunk the reader yields feeds the QC and is kept for the join
+                with self.metrics.stage("vcf_read") as st:
+                    chunks = []
+                    with read_vcf(self.vcf_file, chunk_lines=CHUNK_LINES) as reader:
+                        for chunk in reader:
+                            update_qc(chunk[stats_columns])
+                            chunks.append(chunk)
+                    vcf_df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=VCF_COLUMNS)
+                    st.rows(rows_out=len(vcf_df))
+            vcf_df = self._filter_variants(vcf_df)
+            self.qc = qc
+            self._log("VCF file FILTER=='PASS' count (after QUAL filter):", qc.passed)
+
+            self._log("Step 3: Waiting for the GWAS catalog...")
+            with self.metrics.stage("catalog_wait") as st:
+                gwas_df, proxy_pairs = catalog.result()
+                st.rows(rows_out=len(gwas_df))
+        self._log("GWAS catalog shape:", gwas_df.shape)
+
+        self._log("Step 4: Merge on chromosome/position...")
+        if "DISEASE/TRAIT" not in gwas_df.columns:
+            raise KeyError("Column 'DISEASE/TRAIT' not found in GWAS file.")
+        with self.metrics.stage("merge", rows_in=len(vcf_df)) as st:
+            if self.join_workers > 1:
+                annotated_df = self._partitioned_join(vcf_df, gwas_df)
+                st.extra["workers"] = self.join_workers
+            else:
+                annotated_df = self._join_partition(vcf_df, gwas_df, self.filt_nr_disease)
+            st.rows(rows_out=len(annotated_df))
+        self._log("Merge PASS; rows:", annotated_df.shape[0])
+
+        if proxy_pairs is not None:
+            with self.metrics.stage("proxy_merge", rows_in=len(proxy_pairs)) as st:
+                proxy_df = self._proxy_join(vcf_df, gwas_df, proxy_pairs)
+                columns = list(annotated_df.columns) + ["MATCH", "PROXY_POS", "PROXY_R2"]
+                annotated_df = pd.concat([annotated_df.assign(MATCH="direct"), proxy_df.assign(MATCH="proxy")],
+                                         ignore_index=True)[columns]
+                st.rows(rows_out=len(proxy_df))
+            self._log(f"LD proxy matches (r2 >= {self.proxy_min_r2}): {len(proxy_df):,} rows")
+
+        if self.pop_af is not None:
+            # Binary search of the called alleles in the memory-mapped index; the sites file is never read
+            with self.metrics.stage("pop_af", rows_in=len(annotated_df)) as st:
+                freqs = self.pop_af.lookup(annotated_df["CHROM"], annotated_df["POS"],
+                                           annotated_df["REF"], annotated_df["ALT"])
+                annotated_df = pd.concat([annotated_df.reset_index(drop=True), freqs], axis=1)
+                st.rows(rows_out=int(freqs.notna().any(axis=1).sum()))
+            self._log(f"Population allele frequencies found for {st.rows_out:,} rows")
 
         # Persist CSV
-        out_csv = os.path.join(self.report_data_path, 'in-house_report.csv')
-        print("Saving annotated data to CSV...")
-        annotated_df.to_csv(out_csv, index=False)
-        print(f"Annotated data saved to {out_csv}")
+        if write_csv:
+            out_csv = self._output_file('data', 'in-house_report.csv' + ('.gz' if self.csv_bgzf else ''))
+            self._log("Saving annotated data to CSV...")
+            with self.metrics.stage("csv_write", rows_in=len(annotated_df)) as st:
+                bgzf.write_csv(annotated_df, out_csv)
+                st.rows(rows_out=len(annotated_df))
+            self.annotated_csv = out_csv
+            self._log(f"Annotated data saved to {out_csv}")
+
+        if self.results_db:
+            from .results import ResultsDB
+
+            with self.metrics.stage("results_db", rows_in=len(annotated_df)) as st:
+                with ResultsDB(self.results_db) as db:
+                    st.rows(rows_out=db.load(self.sample, annotated_df, source=self.vcf_file))
+            self._log(f"Annotated rows loaded into {self.results_db} as sample {self.sample!r}")
 
         self.annotated_df = annotated_df
         return annotated_df
 
-    def prepare_report_data(self):
+    def prepare_report_data(self, top_k: int = None, write_csv: bool = True):
         if self.annotated_df is None:
             raise RuntimeError("annotated_df is empty. Run map_snps() first.")
 
-        df = self.annotated_df.copy()
+        with self.metrics.stage("prepare", rows_in=len(self.annotated_df)) as st:
+            rep = self._select_report_rows(self.top_k if top_k is None else top_k)
+            st.rows(rows_out=len(rep))
+
+        # Aggregates over every hit, not just the representative rows
+        df = self.annotated_df
+        with self.metrics.stage("trait_summary", rows_in=len(df)) as st:
+            summary = trait_summary(df, p_value=self._numeric_column(df, "P-VALUE"),
+                                    raf=self._numeric_column(df, "RISK ALLELE FREQUENCY"))
+            st.rows(rows_out=len(summary))
 
-        # Build an order key to pick "representative" rows per trait (lowest p-value, then highest RAF)
-        df["P_SORT"] = self._to_numeric_safe(df["P-VALUE"]) if "P-VALUE" in df.columns else np.nan
-        df["RAF_SORT"] = self._to_numeric_safe(df["RISK ALLELE FREQUENCY"]) if "RISK ALLELE FREQUENCY" in df.columns else np.nan
-        df.sort_values(by=["P_SORT", "RAF_SORT"], ascending=[True, False], inplace=True)
+        # Save
+        if write_csv:
+            out_csv = self._output_file('data', 'report_data.csv')
+            self._log("Saving report data to CSV...")
+            with self.metrics.stage("report_csv_write", rows_in=len(rep)):
+                rep.to_csv(out_csv, index=False)
+                summary.to_csv(self._output_file('data', 'trait_summary.csv'), index=False)
 
-        # For each trait, take the first row after sorting
+        self.report_data = rep
+        self.trait_summary = summary
+        return rep
+
+    def _numeric_column(self, df: pd.DataFrame, col: str) -> np.ndarray:
+        """Float array for `col`, reusing map_snps' cleaning when the column is already numeric."""
+        if col not in df.columns:
+            return np.full(len(df), np.nan)
+        s = df[col]
+        if not pd.api.types.is_numeric_dtype(s):
+            s = self._to_numeric_safe(s)
+        return s.to_numpy(dtype=float, na_value=np.nan)
+
+    def _select_report_rows(self, top_k: int = 1):
+        df = self.annotated_df
         keep_cols = [
-            'DISEASE/TRAIT', 'CHR_ID', 'CHR_POS', 'TYPE',
+            'DISEASE/TRAIT', 'CHR_ID', 'CHR_POS', 'TYPE', 'ZYGOSITY',
             'RISK ALLELE FREQUENCY', 'P-VALUE',
             'REGION', 'SNPS', 'MAPPED_GENE',
             'Groups of Disease/Trait', 'MAPPED_TRAIT_URI', 'MAPPED_TRAIT_DESCRIPTION'
         ]
+        keep_cols += ['MATCH', 'PROXY_POS', 'PROXY_R2']
+        keep_cols += [c for c in df.columns if c.startswith(POP_PREFIX)]
         keep_cols = [c for c in keep_cols if c in df.columns]
-        rep = df[keep_cols].drop_duplicates(subset=['DISEASE/TRAIT']).copy()
+
+        # Representative rows per trait: lowest p-value, then highest RAF (missing values rank last)
+        p_val = self._numeric_column(df, "P-VALUE")
+        raf = self._numeric_column(df, "RISK ALLELE FREQUENCY")
+        p_key = np.where(np.isnan(p_val), np.inf, p_val)
+        raf_key = np.where(np.isnan(raf), np.inf, -raf)
+        trait_codes, _ = pd.factorize(df['DISEASE/TRAIT'])
+
+        # One stable lexicographic sort over the keys; rank within each trait block picks the top k
+        order = np.lexsort((raf_key, p_key, trait_codes))
+        sorted_codes = trait_codes[order]
+        block_start = np.ones(len(order), dtype=bool)
+        block_start[1:] = sorted_codes[1:] != sorted_codes[:-1]
+        positions = np.arange(len(order))
+        rank = positions - np.maximum.accumulate(np.where(block_start, positions, 0))
+        picked = np.sort(order[rank < max(int(top_k), 1)])
+        picked = picked[np.lexsort((raf_key[picked], p_key[picked]))]
+
+        rep = df[keep_cols].take(picked)
 
         # Compute standardized percentage column
-        rep['RAF (%)'] = self._to_numeric_safe(rep['RISK ALLELE FREQUENCY']) * 100.0
-        rep['RAF (%)'] = np.where(rep['RAF (%)'] > 100, 100, rep['RAF (%)'])
-        rep['RAF (%)'] = np.where(rep['RAF (%)'] < 0, 0, rep['RAF (%)'])  # optional lower bound
+        rep['RAF (%)'] = np.clip(raf[picked] * 100.0, 0, 100)
         rep.dropna(subset=['RAF (%)'], inplace=True)
-        rep.sort_values(by='RAF (%)', ascending=False, inplace=True)
-
-        # Save
-        out_csv = os.path.join(self.report_data_path, 'report_data.csv')
-        print("Saving report data to CSV...")
-        rep.to_csv(out_csv, index=False)
-
-        self.report_data = rep
+        rep.sort_values(by='RAF (%)', ascending=False, inplace=True, kind='mergesort')
         return rep
 
-    def generate_html_report(self):
+    def generate_html_report(self, write_html: bool = True) -> str:
         if self.report_data is None:
             raise RuntimeError("report_data is empty. Run prepare_report_data() first.")
 
         data = self.report_data
-        output_path = os.path.join(self.report_path, 'GWAS_report.html')
 
-        # ---------- Sunburst (built once) ----------
+        with self.metrics.stage("render_sunburst", rows_in=len(data)):
+            df_sun, sun_plot_json = self._render_sunburst(data)
+
+        with self.metrics.stage("render_gauges", rows_in=len(data)) as st:
+            details, embedded_svgs, icons = self._render_gauges(data)
+            st.rows(rows_out=len(embedded_svgs))
+
+        with self.metrics.stage("render_donuts"):
+            total_variant, donut_svgs = self._render_donuts()
+
+        with self.metrics.stage("render_qc"):
+            qc_plot_json = self.qc.figure_json(height=420, margin=dict(t=30, b=80, l=60, r=20),
+                                               plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
+
+        # Summary text
+        if 'Groups of Disease/Trait' in df_sun.columns:
+            df_sun_summary = (df_sun['Groups of Disease/Trait']
+                              .value_counts(normalize=True)
+                              .mul(100).round(2)
+                              .to_dict())
+            total_disease_trait = int(df_sun['Groups of Disease/Trait'].value_counts().sum())
+        else:
+            df_sun_summary, total_disease_trait = {}, 0
+
+        # Logo (optional)
+        logo_svg = ""
+        logo_path = os.path.join('data', 'logo', 'KKUNPhI-01.svg')
+        if os.path.exists(logo_path):
+            try:
+                with open(logo_path, 'r', encoding='utf-8') as f:
+                    logo_svg = f.read()
+            except Exception:
+                logo_svg = ""
+
+
+        # Shared assets are referenced relative to the report, so they only apply to written reports
+        assets_url, plotly_src = None, PLOTLY_CDN
+        if self.assets_dir and write_html and self.report_path:
+            with self.metrics.stage("assets_write"):
+                write_shared_assets(self.assets_dir, REPORT_CSS, REPORT_JS,
+                                    vendor_plotly=self.vendor_plotly, encodings=self.precompress)
+            assets_url = os.path.relpath(self.assets_dir, self.report_path).replace(os.sep, '/')
+            if self.vendor_plotly:
+                plotly_src = f"{assets_url}/{PLOTLY_NAME}"
+
+        # Render
+        with self.metrics.stage("render_template"):
+            template = _report_template()
+            rendered_html = template.render(
+                data_source=zip(details, embedded_svgs, icons),
+                count_variant=f'{total_variant:,.0f}',
+                variant_1=donut_svgs[0], variant_2=donut_svgs[1],
+                variant_3=donut_svgs[2], variant_4=donut_svgs[3],
+                logo_=logo_svg,
+                sun_plot_=sun_plot_json,
+                disease_trait_summary=df_sun_summary,
+                total_disease_trait_=total_disease_trait,
+                qc_metrics=self.qc.metrics(),
+                qc_plot_=qc_plot_json,
+                assets_url=assets_url,
+                report_css=REPORT_CSS,
+                report_js=REPORT_JS,
+                plotly_src=plotly_src
+            )
+
+        if write_html:
+            output_path = self._output_file('GWAS_report.html')
+            with self.metrics.stage("html_write") as st:
+                st.extra["bytes"] = write_precompressed(output_path, rendered_html.encode('utf-8'),
+                                                        self.precompress)
+            self._log(f"Report saved to {output_path}")
+        return rendered_html
+
+    def _render_sunburst(self, data: pd.DataFrame):
+        from .sunburst import build_sunburst_hierarchy, sunburst_figure_json
+
+        # ---------- Sunburst (pre-aggregated ids/parents/values) ----------
         sun_cols_all = ["TYPE", "Groups of Disease/Trait", "CHR_ID", "REGION", "SNPS", "DISEASE/TRAIT"]
         sun_cols = [c for c in sun_cols_all if c in data.columns]
         df_sun = data.copy()
@@ -193,20 +814,15 @@ class MapGWASSNPs:
         else:
             df_sun[color_col] = np.nan
 
-        if df_sun.empty or not sun_cols:
-            fig_sun = px.sunburst(pd.DataFrame({c: [] for c in sun_cols_all if c in data.columns}),
-                                  path=[c for c in sun_cols_all if c in data.columns])
-        else:
-            fig_sun = px.sunburst(
-                df_sun,
-                path=sun_cols,
-                color=color_col,
-                color_continuous_scale='Ice'
-            )
-        fig_sun.update_layout(title="", showlegend=True, height=800, width=800,
-                              plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
-        fig_sun.update_coloraxes(showscale=False)
-        sun_plot_json = fig_sun.to_json()
+        nodes = build_sunburst_hierarchy(df_sun, sun_cols, color_col=color_col,
+                                         max_depth=self.sunburst_depth,
+                                         max_children=self.sunburst_max_children)
+        sun_plot_json = sunburst_figure_json(nodes, title="", showlegend=True, height=800, width=800,
+                                             plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
+        return df_sun, sun_plot_json
+
+    def _render_gauges(self, data: pd.DataFrame):
+        import plotly.graph_objects as go
 
         # ---------- Per-trait mini gauge (SVG) ----------
         try:
@@ -218,6 +834,8 @@ class MapGWASSNPs:
         embedded_svgs = []
         details = []
         icons = []
+        summaries = {} if self.trait_summary is None else \
+            {r['DISEASE/TRAIT']: r for r in self.trait_summary.to_dict('records')}
 
         for _, row in data.iterrows():
             # single horizontal heat "gauge" with pointer at RAF%
@@ -271,27 +889,36 @@ class MapGWASSNPs:
                 row.get('SNPS', ''),
                 row.get('MAPPED_GENE', ''),
                 row.get('Groups of Disease/Trait', ''),
-                row.get('MAPPED_TRAIT_DESCRIPTION', '')
+                row.get('MAPPED_TRAIT_DESCRIPTION', ''),
+                row.get('ZYGOSITY', ''),
+                self._match_label(row),
+                summary_label(summaries.get(row.get('DISEASE/TRAIT'))),
+                self._pop_af_label(row)
             ))
+        return details, embedded_svgs, icons
 
-        # ---------- Variants donut cards (SNP/INS/DEL/COMPLEX) ----------
-        type_counts = self.vcf_report['TYPE'].value_counts()
-        total_variant = int(self.vcf_report.shape[0])
-        type_pct = (type_counts / max(total_variant, 1) * 100).round(2)
+    @staticmethod
+    def _match_label(row) -> str:
+        if row.get('MATCH') != 'proxy':
+            return ''
+        return f"LD proxy {row.get('CHR_ID', '')}:{row.get('PROXY_POS', '')} (r² = {float(row.get('PROXY_R2')):.2f})"
+
+    @staticmethod
+    def _pop_af_label(row) -> str:
+        freqs = [(name[len(POP_PREFIX):], row[name]) for name in row.index if name.startswith(POP_PREFIX)]
+        return " · ".join(f"{pop} {float(af) * 100:.1f}%" for pop, af in freqs if not pd.isna(af))
 
-        # Ensure all four keys exist
-        for k in ["SNPs", "INS", "DEL", "COMPLEX"]:
-            if k not in type_pct.index:
-                type_pct.loc[k] = 0.0
-                type_counts.loc[k] = 0
+    def _render_donuts(self):
+        import plotly.graph_objects as go
 
-        # Order
-        type_pct = type_pct[["SNPs", "INS", "DEL", "COMPLEX"]]
-        type_counts = type_counts[["SNPs", "INS", "DEL", "COMPLEX"]]
+        # ---------- Variants donut cards (SNP/INS/DEL/COMPLEX) ----------
+        type_counts = pd.Series(self.qc.types).reindex(VARIANT_TYPES, fill_value=0)
+        total_variant = int(self.qc.variants)
+        type_pct = (type_counts / max(total_variant, 1) * 100).round(2)
 
         donut_svgs = []
         try:
-            import plotly.io as pio  # already imported above, but keep local for clarity
+            import plotly.io as pio
         except Exception:
             pio = None
 
@@ -318,37 +945,14 @@ class MapGWASSNPs:
                     donut_svgs.append("<div>Install kaleido to render donut charts (pip install -U kaleido)</div>")
             else:
                 donut_svgs.append("<div>Install kaleido to render donut charts (pip install -U kaleido)</div>")
+        return total_variant, donut_svgs
 
-        # Summary text
-        if 'Groups of Disease/Trait' in df_sun.columns:
-            df_sun_summary = (df_sun['Groups of Disease/Trait']
-                              .value_counts(normalize=True)
-                              .mul(100).round(2)
-                              .to_dict())
-            total_disease_trait = int(df_sun['Groups of Disease/Trait'].value_counts().sum())
-        else:
-            df_sun_summary, total_disease_trait = {}, 0
-
-        # Logo (optional)
-        logo_svg = ""
-        logo_path = os.path.join('data', 'logo', 'KKUNPhI-01.svg')
-        if os.path.exists(logo_path):
-            try:
-                with open(logo_path, 'r', encoding='utf-8') as f:
-                    logo_svg = f.read()
-            except Exception:
-                logo_svg = ""
+    def generate_report(self):
+        self.prepare_report_data()
+        self.generate_html_report()
 
-        # HTML Template (original, unchanged)
-        html_template = r"""
-            <!DOCTYPE html>
-            <html lang="en">
-            <head>
-                <meta charset="UTF-8">
-                <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                <title>GWAS Report</title>
-                <link href="https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600&display=swap" rel="stylesheet">
-                <style>
+# Report stylesheet and scripts; inlined into each report, or written once as shared assets
+REPORT_CSS = r"""
                     body {
                         font-family: 'Poppins', sans-serif;
                         background: #f7f9fc;
@@ -521,6 +1125,25 @@ class MapGWASSNPs:
                         flex-wrap: wrap;
                         width: clamp(20rem, 28vw, 30rem);
                         }
+                    .qc-metrics {
+                        display: flex;
+                        justify-content: space-evenly;
+                        flex-wrap: wrap;
+                        gap: 20px;
+                        margin: 20px;
+                        }
+                    .qc-metric {
+                        text-align: center;
+                        min-width: 10rem;
+                        }
+                    .qc-value {
+                        font-size: clamp(2rem, 4vw, 3.5rem);
+                        font-weight: bold;
+                        color: #2D3B71;
+                        }
+                    .qc-label {
+                        color: rgb(103, 103, 103);
+                        }
                     .position_infomation {
                         display: flex;
                         align-items: center;
@@ -796,8 +1419,9 @@ class MapGWASSNPs:
                             }
                     }
 
-                </style>
-                <script>
+"""
+
+REPORT_JS = r"""
 
                     function resizePlot() {
                         let plotContainer = document.getElementById('plot-container');
@@ -827,7 +1451,67 @@ class MapGWASSNPs:
                     function printReport() {
                         window.print();
                     }
+
+                    function downloadChart(chartId, title) {
+                        let svgElement = document.querySelector("#chart_" + chartId + " svg");
+                        if (!svgElement) {
+                            alert("SVG not found!");
+                            return;
+                        }
+
+                        let serializer = new XMLSerializer();
+                        let svgString = serializer.serializeToString(svgElement);
+
+                        let canvas = document.createElement("canvas");
+                        let ctx = canvas.getContext("2d");
+                        let img = new Image();
+                        let svgBlob = new Blob([svgString], { type: "image/svg+xml;charset=utf-8" });
+                        let url = URL.createObjectURL(svgBlob);
+
+                        img.onload = function () {
+                            canvas.width = img.width;
+                            canvas.height = img.height;
+                            ctx.drawImage(img, 0, 0);
+                            URL.revokeObjectURL(url);
+
+                            let pngUrl = canvas.toDataURL("image/png");
+
+                            let downloadLink = document.createElement("a");
+                            downloadLink.href = pngUrl;
+                            downloadLink.download = title.replace(/\s+/g, "_") + ".png";
+                            document.body.appendChild(downloadLink);
+                            downloadLink.click();
+                            document.body.removeChild(downloadLink);
+                        };
+
+                        img.onerror = function () {
+                            alert("Failed to load the SVG. Please check for unsupported elements.");
+                        };
+
+                        img.src = url;
+                    }
+"""
+
+# HTML Template
+REPORT_TEMPLATE = r"""
+            <!DOCTYPE html>
+            <html lang="en">
+            <head>
+                <meta charset="UTF-8">
+                <meta name="viewport" content="width=device-width, initial-scale=1.0">
+                <title>GWAS Report</title>
+                <link href="https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600&display=swap" rel="stylesheet">
+                {% if assets_url %}
+                <link rel="stylesheet" href="{{ assets_url }}/mapgwas-report.css">
+                <script src="{{ assets_url }}/mapgwas-report.js"></script>
+                {% else %}
+                <style>
+{{ report_css | safe }}
+                </style>
+                <script>
+{{ report_js | safe }}
                 </script>
+                {% endif %}
 
             </head>
 
@@ -887,7 +1571,7 @@ class MapGWASSNPs:
                 <h5>Overview of Disease/Trait in Genome</h5>
                 </div>
                 <div class="chart_overview" id="sun_plot"></div>
-            <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+            <script src="{{ plotly_src }}"></script>
             <script id="sunburst-data" type="application/json">
                 {{ sun_plot_ | safe }}
             </script>
@@ -911,6 +1595,27 @@ class MapGWASSNPs:
 
             </script>
             </section>
+            <section>
+                <div>
+                    <h2>Sample quality control</h2>
+                    <div class="qc-metrics">
+                        {% for label_, value_ in qc_metrics %}
+                        <div class="qc-metric">
+                            <div class="qc-value">{{ value_ }}</div>
+                            <div class="qc-label">{{ label_ }}</div>
+                        </div>
+                        {% endfor %}
+                    </div>
+                </div>
+                <div class="chart_qc" id="qc_plot"></div>
+            <script id="qc-data" type="application/json">
+                {{ qc_plot_ | safe }}
+            </script>
+            <script>
+                var qcData = JSON.parse(document.getElementById("qc-data").textContent);
+                Plotly.newPlot('qc_plot', qcData.data, qcData.layout, {responsive: true});
+            </script>
+            </section>
             <section>
                     <div>
                         <h2>Termonology</h2>
@@ -931,13 +1636,16 @@ class MapGWASSNPs:
                             <p><b>Alleles:</b> An allele is a variant form of a gene found at a specific position (locus)
                                 on a chromosome. Each allele is inherited, one from each parent.
                             </p>
+                            <p><b>Genotype:</b> het (heterozygous) means one copy of the alternate allele was found;
+                                hom-alt (homozygous alternate) means both copies carry it.
+                            </p>
                             <p><b>Mapped Gene:</b> Genes mapped near or overlapping the SNPs.</p>
                             <p><b>Chromosomal region:</b> The genomic region associated with the trait or disease.</p>
                             <p><b>Risk Allele Frequency (%):</b> The frequency of the risk allele in the population.</p>
                 </div>
             </section>
                 <hr>
-                {% for (title_, region_, snps_, mapped_gene_, group_trait_, description_trait_), svg_, icon_ in data_source %}
+                {% for (title_, region_, snps_, mapped_gene_, group_trait_, description_trait_, zygosity_, match_, summary_, pop_af_), svg_, icon_ in data_source %}
                 <section>
                     <div class="chart-container">
                         <h2>{{ title_ }}</h2>
@@ -953,6 +1661,9 @@ class MapGWASSNPs:
                                         <p><b>SNPs ID:</b> {{ snps_ }}</p>
                                         <p><b>Mapped Gene:</b> {{ mapped_gene_ }}</p>
                                         <p><b>Group of disease/trait:</b> {{ group_trait_ }}</p>
+                                        {% if zygosity_ %}<p><b>Genotype:</b> {{ zygosity_ }}</p>{% endif %}{% if match_ %}<p><b>Matched via:</b> {{ match_ }}</p>{% endif %}
+                                        {% if summary_ %}<p><b>All hits:</b> {{ summary_ }}</p>{% endif %}
+                                        {% if pop_af_ %}<p><b>Population allele frequency:</b> {{ pop_af_ }}</p>{% endif %}
                                     </div>
                                 </div>
                             </div>
@@ -968,46 +1679,6 @@ class MapGWASSNPs:
                     <hr>
                 </section>
                 {% endfor %}
-                <script>
-                    function downloadChart(chartId, title) {
-                        let svgElement = document.querySelector("#chart_" + chartId + " svg");
-                        if (!svgElement) {
-                            alert("SVG not found!");
-                            return;
-                        }
-
-                        let serializer = new XMLSerializer();
-                        let svgString = serializer.serializeToString(svgElement);
-
-                        let canvas = document.createElement("canvas");
-                        let ctx = canvas.getContext("2d");
-                        let img = new Image();
-                        let svgBlob = new Blob([svgString], { type: "image/svg+xml;charset=utf-8" });
-                        let url = URL.createObjectURL(svgBlob);
-
-                        img.onload = function () {
-                            canvas.width = img.width;
-                            canvas.height = img.height;
-                            ctx.drawImage(img, 0, 0);
-                            URL.revokeObjectURL(url);
-
-                            let pngUrl = canvas.toDataURL("image/png");
-
-                            let downloadLink = document.createElement("a");
-                            downloadLink.href = pngUrl;
-                            downloadLink.download = title.replace(/\s+/g, "_") + ".png";
-                            document.body.appendChild(downloadLink);
-                            downloadLink.click();
-                            document.body.removeChild(downloadLink);
-                        };
-
-                        img.onerror = function () {
-                            alert("Failed to load the SVG. Please check for unsupported elements.");
-                        };
-
-                        img.src = url;
-                    }
-                </script>
 
 
                 <div>
@@ -1015,30 +1686,15 @@ class MapGWASSNPs:
                 </div>
             </body>
             </html>
-        """
-
-        # Render
-        template = Template(html_template)
-        rendered_html = template.render(
-            data_source=zip(details, embedded_svgs, icons),
-            count_variant=f'{total_variant:,.0f}',
-            variant_1=donut_svgs[0], variant_2=donut_svgs[1],
-            variant_3=donut_svgs[2], variant_4=donut_svgs[3],
-            logo_=logo_svg,
-            sun_plot_=sun_plot_json,
-            disease_trait_summary=df_sun_summary,
-            total_disease_trait_=total_disease_trait
-        )
+"""
 
-        os.makedirs(self.report_path, exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(rendered_html)
 
-        print(f"Report saved to {output_path}")
+@lru_cache(maxsize=None)
+def _report_template():
+    """Compile the report template once per process."""
+    from jinja2 import Template
+    return Template(REPORT_TEMPLATE)
 
-    def generate_report(self):
-        self.prepare_report_data()
-        self.generate_html_report()
 
 if __name__ == '__main__':
     barcode = 'bc02'
@@ -0,0 +1,178 @@
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+VARIANT_TYPES = ["SNPs", "INS", "DEL", "COMPLEX"]
+
+# Fixed histogram bins: [0, width), [width, 2*width), ... with the last bin open-ended
+QUAL_BIN_WIDTH, QUAL_BINS = 10, 21
+DEPTH_BIN_WIDTH, DEPTH_BINS = 5, 21
+
+_TRANSITIONS = {"AG", "GA", "CT", "TC"}
+
+_INFO_DP = r'(?:^|;)DP=([^;,]*)'
+
+
+def _histogram(values, width: int, bins: int) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    idx = np.minimum(np.maximum(values, 0) // width, bins - 1).astype(np.int64)
+    return np.bincount(idx, minlength=bins)
+
+
+def _bin_labels(width: int, bins: int) -> list:
+    return [f"{i * width}-{(i + 1) * width}" for i in range(bins - 1)] + [f"{(bins - 1) * width}+"]
+
+
+def genotype_states(gt) -> np.ndarray:
+    """Per-record 'het' or 'hom-alt' from GT strings ('' for hom-ref, no-call or a missing GT).
+
+    A genotype is hom-alt when every copy is called as the same ALT allele, and het when it
+    carries any other mix that includes an ALT allele, so 0/1, 1/2 and 1/. are all het. Each
+    distinct GT string is classified once.
+    """
+    codes, values = pd.factorize(pd.Series(gt, dtype=object), use_na_sentinel=False)
+    alleles = pd.Series(np.asarray(values, dtype=object)).astype(str).str.replace('|', '/', regex=False)
+    alleles = alleles.str.split('/', expand=True)
+    ploidy = alleles.notna().sum(axis=1).to_numpy()
+    nums = alleles.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    called = ~np.isnan(nums)
+    any_alt = (np.where(called, nums, 0) > 0).any(axis=1)
+    same = np.where(called, nums, np.inf).min(axis=1) == np.where(called, nums, -np.inf).max(axis=1)
+    hom_alt = any_alt & same & (called.sum(axis=1) == ploidy)
+    states = np.select([hom_alt, any_alt], ["hom-alt", "het"], default="")
+    return states[codes]
+
+
+def _chrom_key(chrom: str):
+    name = re.sub(r'^chr', '', chrom, flags=re.IGNORECASE)
+    return (0, int(name), "") if name.isdigit() else (1, 0, name)
+
+
+class VariantQC:
+    """Sample QC statistics accumulated chunk by chunk in fixed-size counters.
+
+    `update()` takes filtered, allele-split, classified VCF rows (CHROM, REF, ALT, QUAL, FILTER,
+    ZYGOSITY, TYPE and optionally FMT_DP and INFO) and keeps only counts, so the memory used does
+    not grow with the VCF. Counts are per ALT allele, like the annotated output, except het and
+    hom-alt, which are per record when the records' `genotypes` (GT strings) are given, so a 1/2
+    call is one het. Depth is FORMAT DP, or INFO DP for records without it.
+    """
+
+    def __init__(self):
+        self.variants = 0
+        self.passed = 0
+        self.types = dict.fromkeys(VARIANT_TYPES, 0)
+        self.transitions = 0
+        self.transversions = 0
+        self.het = 0
+        self.hom_alt = 0
+        self.chromosomes = {}
+        self.qual_hist = np.zeros(QUAL_BINS, dtype=np.int64)
+        self.depth_hist = np.zeros(DEPTH_BINS, dtype=np.int64)
+
+    def update(self, df: pd.DataFrame, genotypes=None):
+        if df.empty:
+            return
+        self.variants += len(df)
+        self.passed += int((df["FILTER"] == "PASS").sum())
+        for typ, n in df["TYPE"].value_counts().items():
+            self.types[typ] = self.types.get(typ, 0) + int(n)
+
+        snv = df.loc[df["TYPE"] == "SNPs"]
+        # isin works per category on the categorical columns of the light VCF pass
+        ti = 0
+        for ref, alt in _TRANSITIONS:
+            ti += int((snv["REF"].isin([ref, ref.lower()]) & snv["ALT"].isin([alt, alt.lower()])).sum())
+        self.transitions += ti
+        self.transversions += len(snv) - ti
+
+        if genotypes is not None:
+            states = genotype_states(genotypes)
+            self.het += int((states == "het").sum())
+            self.hom_alt += int((states == "hom-alt").sum())
+        else:
+            zygosity = df["ZYGOSITY"].value_counts()
+            self.het += int(zygosity.get("het", 0))
+            self.hom_alt += int(zygosity.get("hom-alt", 0))
+
+        for chrom, n in df["CHROM"].value_counts(sort=False).items():
+            if n:  # a categorical also lists its unused categories
+                self.chromosomes[str(chrom)] = self.chromosomes.get(str(chrom), 0) + int(n)
+
+        self.qual_hist += _histogram(pd.to_numeric(df["QUAL"], errors="coerce"), QUAL_BIN_WIDTH, QUAL_BINS)
+        if "FMT_DP" in df.columns:
+            depth = pd.to_numeric(df["FMT_DP"], errors="coerce")
+        else:
+            depth = pd.Series(np.nan, index=df.index)
+        missing = depth.isna().to_numpy()
+        if missing.any() and "INFO" in df.columns:
+            # Only records without FORMAT DP pay for the INFO scan
+            info = df["INFO"].to_numpy()[missing]
+            depth[missing] = pd.to_numeric(pd.Series(info, dtype=object).astype(str).str.extract(_INFO_DP)[0],
+                                           errors="coerce").to_numpy()
+        self.depth_hist += _histogram(depth, DEPTH_BIN_WIDTH, DEPTH_BINS)
+
+    # ---------- summaries ----------
+    @property
+    def ti_tv(self):
+        return self.transitions / self.transversions if self.transversions else None
+
+    @property
+    def het_hom(self):
+        return self.het / self.hom_alt if self.hom_alt else None
+
+    @property
+    def pass_fraction(self):
+        return self.passed / self.variants if self.variants else None
+
+    def to_dict(self) -> dict:
+        chroms = sorted(self.chromosomes, key=_chrom_key)
+        return {
+            "variants": self.variants,
+            "types": dict(self.types),
+            "pass": self.passed,
+            "pass_fraction": self.pass_fraction,
+            "transitions": self.transitions,
+            "transversions": self.transversions,
+            "ti_tv": self.ti_tv,
+            "het": self.het,
+            "hom_alt": self.hom_alt,
+            "het_hom": self.het_hom,
+            "chromosomes": {c: self.chromosomes[c] for c in chroms},
+            "qual_hist": {"bins": _bin_labels(QUAL_BIN_WIDTH, QUAL_BINS), "counts": self.qual_hist.tolist()},
+            "depth_hist": {"bins": _bin_labels(DEPTH_BIN_WIDTH, DEPTH_BINS), "counts": self.depth_hist.tolist()},
+        }
+
+    def metrics(self) -> list:
+        """(label, formatted value) pairs for the report's QC summary."""
+        def fmt(value, pattern):
+            return "n/a" if value is None else pattern.format(value)
+        return [
+            ("Ti/Tv ratio", fmt(self.ti_tv, "{:.2f}")),
+            ("Het/Hom ratio", fmt(self.het_hom, "{:.2f}")),
+            ("FILTER = PASS", fmt(self.pass_fraction, "{:.1%}")),
+            ("Chromosomes", f"{len(self.chromosomes):,}"),
+        ]
+
+    def figure_json(self, **layout) -> str:
+        """Compact Plotly figure JSON with per-chromosome counts and QUAL/depth histograms side by side."""
+        summary = self.to_dict()
+        panels = [
+            ("Variants per chromosome", list(summary["chromosomes"]), list(summary["chromosomes"].values())),
+            ("QUAL", summary["qual_hist"]["bins"], summary["qual_hist"]["counts"]),
+            ("Depth (DP)", summary["depth_hist"]["bins"], summary["depth_hist"]["counts"]),
+        ]
+        data, layout = [], dict(layout, showlegend=False, bargap=0.05)
+        for i, (title, x, y) in enumerate(panels, start=1):
+            suffix = "" if i == 1 else str(i)
+            data.append({"type": "bar", "x": x, "y": y, "name": title, "marker": {"color": "#3D527D"},
+                         "xaxis": f"x{suffix}", "yaxis": f"y{suffix}"})
+            lo = (i - 1) / len(panels)
+            layout[f"xaxis{suffix}"] = {"domain": [lo + 0.04, lo + 1 / len(panels) - 0.04],
+                                        "anchor": f"y{suffix}", "title": {"text": title},
+                                        "type": "category"}
+            layout[f"yaxis{suffix}"] = {"anchor": f"x{suffix}", "rangemode": "tozero"}
+        return json.dumps({"data": data, "layout": layout}, separators=(",", ":"))
@@ -0,0 +1,154 @@
+import mmap
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# Upstream bases fetched at a time while shifting an indel left
+WINDOW = 64
+
+_PLAIN_ALLELE = re.compile(r'^[ACGTNacgtn]+$')
+
+
+def index_fasta(path: str) -> str:
+    """Write a samtools-compatible `.fai` index next to a plain-text FASTA and return its path."""
+    fai = path + ".fai"
+    entries = []
+    with open(path, "rb") as f:
+        name, length, offset, line_bases, line_width = None, 0, 0, 0, 0
+        pos = 0
+        for line in f:
+            if line.startswith(b">"):
+                if name is not None:
+                    entries.append((name, length, offset, line_bases, line_width))
+                name = line[1:].split()[0].decode()
+                length, offset, line_bases, line_width = 0, pos + len(line), 0, 0
+            elif name is not None:
+                bases = len(line.rstrip(b"\r\n"))
+                if line_bases == 0:
+                    line_bases, line_width = bases, len(line)
+                length += bases
+            pos += len(line)
+        if name is not None:
+            entries.append((name, length, offset, line_bases, line_width))
+    with open(fai, "w") as out:
+        for entry in entries:
+            out.write("\t".join(map(str, entry)) + "\n")
+    return fai
+
+
+class FastaReference:
+    """Random access to a plain-text FASTA through its `.fai` index, reading from a memory map.
+
+    The index is built on first use when `<fasta>.fai` does not exist.
+    """
+
+    def __init__(self, path: str):
+        if path.endswith(".gz"):
+            raise ValueError(f"Compressed FASTA is not supported, please decompress it first: {path}")
+        self.path = path
+        fai = path + ".fai"
+        if not os.path.exists(fai):
+            fai = index_fasta(path)
+        self.index = {}
+        with open(fai) as f:
+            for line in f:
+                name, length, offset, line_bases, line_width = line.split("\t")[:5]
+                self.index[name] = (int(length), int(offset), int(line_bases), int(line_width))
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def _lookup(self, chrom: str):
+        if chrom in self.index:
+            return self.index[chrom]
+        # Tolerate 'chr1' vs '1' naming differences between the FASTA and the VCF
+        alt = chrom[3:] if chrom.startswith('chr') else 'chr' + chrom
+        return self.index.get(alt)
+
+    def _fetcher(self, entry):
+        length, offset, line_bases, line_width = entry
+
+        def fetch(start: int, end: int) -> str:
+            """Bases [start, end) (0-based) of one sequence, upper-cased; clipped to the sequence."""
+            start, end = max(start, 0), min(end, length)
+            if start >= end:
+                return ""
+            first = offset + (start // line_bases) * line_width + start % line_bases
+            last = offset + ((end - 1) // line_bases) * line_width + (end - 1) % line_bases
+            return self._map[first:last + 1].replace(b"\n", b"").replace(b"\r", b"").decode().upper()
+        return fetch
+
+    def fetch(self, chrom: str, start: int, end: int) -> str:
+        entry = self._lookup(str(chrom))
+        if entry is None:
+            raise KeyError(f"Sequence {chrom!r} not found in {self.path}")
+        return self._fetcher(entry)(start, end)
+
+    def normalize(self, chrom: pd.Series, pos: pd.Series, ref: pd.Series, alt: pd.Series):
+        """Left-align and trim REF/ALT against the reference.
+
+        Returns (pos, ref, alt, changed, mismatched) aligned with the inputs. Only rows with one
+        plain-base ALT and REF != ALT length or multi-base alleles are touched; rows whose REF
+        does not match the reference (or whose sequence is missing) are left as they are and
+        flagged in `mismatched`.
+        """
+        chrom = pd.Series(chrom).astype(str).reset_index(drop=True)
+        pos_out = pd.to_numeric(pd.Series(pos).reset_index(drop=True), errors='coerce').to_numpy(dtype=float)
+        ref_out = pd.Series(ref).astype(str).reset_index(drop=True).to_numpy(dtype=object)
+        alt_out = pd.Series(alt).astype(str).reset_index(drop=True).to_numpy(dtype=object)
+        changed = np.zeros(len(chrom), dtype=bool)
+        mismatched = np.zeros(len(chrom), dtype=bool)
+
+        ref_s, alt_s = pd.Series(ref_out), pd.Series(alt_out)
+        candidate = ((ref_s.str.len() > 1) | (alt_s.str.len() > 1)) \
+            & ref_s.str.match(_PLAIN_ALLELE) & alt_s.str.match(_PLAIN_ALLELE) & ~np.isnan(pos_out)
+        todo = chrom[candidate.to_numpy()]
+
+        # One index lookup per chromosome; the per-variant work then only slices the memory map
+        for c, idx in todo.groupby(todo, sort=False).groups.items():
+            entry = self._lookup(c)
+            if entry is None:
+                mismatched[np.asarray(idx)] = True
+                continue
+            fetch = self._fetcher(entry)
+            for i in idx:
+                p, r, a = int(pos_out[i]), ref_out[i].upper(), alt_out[i].upper()
+                if fetch(p - 1, p - 1 + len(r)) != r:
+                    mismatched[i] = True
+                    continue
+                np_, nr, na = _left_align(p, r, a, fetch)
+                if (np_, nr, na) != (p, r, a):
+                    pos_out[i], ref_out[i], alt_out[i] = np_, nr, na
+                    changed[i] = True
+        return pos_out, ref_out, alt_out, changed, mismatched
+
+
+def _left_align(pos: int, ref: str, alt: str, fetch):
+    """Left-align and trim one variant (1-based `pos`), in the manner of `vt normalize`."""
+    original = (pos, ref, alt)
+    buf, buf_start = "", pos - 1  # reference bases [buf_start, pos - 1), fetched WINDOW at a time
+    while True:
+        # Drop the shared last base; when an allele empties, extend both by the preceding base
+        if ref and alt and ref[-1] == alt[-1]:
+            ref, alt = ref[:-1], alt[:-1]
+            continue
+        if ref and alt:
+            break
+        if pos <= 1:
+            break
+        if pos - 2 < buf_start:
+            new_start = max(buf_start - WINDOW, 0)
+            buf, buf_start = fetch(new_start, buf_start) + buf, new_start
+        base = buf[pos - 2 - buf_start]
+        ref, alt, pos = base + ref, base + alt, pos - 1
+    if not ref or not alt:
+        return original  # ran into the start of the sequence
+    # Trim the shared leading bases, keeping one anchor base
+    while len(ref) > 1 and len(alt) > 1 and ref[0] == alt[0]:
+        ref, alt, pos = ref[1:], alt[1:], pos + 1
+    return pos, ref, alt
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+
+class RegionIndex:
+    """Per-chromosome index of sorted, merged BED intervals (0-based, half-open)."""
+
+    def __init__(self, intervals: dict):
+        # chrom -> (starts, ends) as sorted, non-overlapping int64 arrays
+        self.intervals = {}
+        for chrom, (starts, ends) in intervals.items():
+            self.intervals[str(chrom)] = self._merge(np.asarray(starts, dtype=np.int64),
+                                                     np.asarray(ends, dtype=np.int64))
+
+    @classmethod
+    def from_bed(cls, path: str) -> "RegionIndex":
+        compression = 'gzip' if path.endswith('.gz') else None
+        bed = pd.read_csv(path, sep='\t', header=None, comment='#', usecols=[0, 1, 2],
+                          names=["chrom", "start", "end"], dtype={"chrom": str},
+                          compression=compression)
+        bed = bed[~bed["chrom"].str.startswith(("track", "browser"))]
+        bed["start"] = pd.to_numeric(bed["start"], errors='coerce')
+        bed["end"] = pd.to_numeric(bed["end"], errors='coerce')
+        bed = bed.dropna(subset=["start", "end"])
+        intervals = {chrom: (grp["start"].to_numpy(), grp["end"].to_numpy())
+                     for chrom, grp in bed.groupby("chrom", sort=False)}
+        return cls(intervals)
+
+    @staticmethod
+    def _merge(starts: np.ndarray, ends: np.ndarray):
+        """Sort intervals and collapse overlapping/adjacent ones."""
+        if starts.size == 0:
+            return starts, ends
+        order = np.argsort(starts, kind='mergesort')
+        starts, ends = starts[order], ends[order]
+        reach = np.maximum.accumulate(ends)
+        # A new block starts wherever an interval begins after everything before it has ended
+        new_block = np.ones(starts.size, dtype=bool)
+        new_block[1:] = starts[1:] > reach[:-1]
+        block_id = np.cumsum(new_block) - 1
+        merged_starts = starts[new_block]
+        merged_ends = np.zeros(merged_starts.size, dtype=np.int64)
+        np.maximum.at(merged_ends, block_id, ends)
+        return merged_starts, merged_ends
+
+    def _lookup(self, chrom: str):
+        if chrom in self.intervals:
+            return self.intervals[chrom]
+        # Tolerate 'chr1' vs '1' naming differences between the BED and the VCF/catalog
+        alt = chrom[3:] if chrom.startswith('chr') else 'chr' + chrom
+        return self.intervals.get(alt)
+
+    def contains(self, chrom: pd.Series, pos) -> np.ndarray:
+        """Boolean mask of 1-based positions `pos` on `chrom` that fall inside a target interval."""
+        chrom = pd.Series(chrom).astype(str).reset_index(drop=True)
+        pos = pd.to_numeric(pd.Series(pos).reset_index(drop=True), errors='coerce').to_numpy(dtype=float)
+        mask = np.zeros(len(chrom), dtype=bool)
+        for c, idx in chrom.groupby(chrom, sort=False).groups.items():
+            found = self._lookup(c)
+            if found is None:
+                continue
+            starts, ends = found
+            if starts.size == 0:
+                continue
+            idx = np.asarray(idx)
+            p0 = pos[idx] - 1  # VCF POS is 1-based, BED starts are 0-based
+            slot = np.searchsorted(starts, p0, side='right') - 1
+            inside = (slot >= 0) & (p0 < ends[np.clip(slot, 0, None)])
+            mask[idx] = inside & ~np.isnan(p0)
+        return mask
+
+    def __len__(self):
+        return int(sum(starts.size for starts, _ in self.intervals.values()))
@@ -0,0 +1,220 @@
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+from .lookup import split_terms
+
+# Annotated-output column -> results table column; missing columns are stored as NULL
+HIT_COLUMNS = {
+    "CHROM": "chrom",
+    "POS": "pos",
+    "REF": "ref",
+    "ALT": "alt",
+    "ZYGOSITY": "zygosity",
+    "TYPE": "type",
+    "QUAL": "qual",
+    "SNPS": "snps",
+    "MAPPED_GENE": "mapped_gene",
+    "DISEASE/TRAIT": "trait",
+    "Groups of Disease/Trait": "trait_group",
+    "REGION": "region",
+    "P-VALUE": "p_value",
+    "RISK ALLELE FREQUENCY": "raf",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    sample TEXT PRIMARY KEY,
+    source TEXT,
+    loaded_at REAL,
+    n_hits INTEGER
+);
+CREATE TABLE IF NOT EXISTS hits (
+    id INTEGER PRIMARY KEY,
+    sample TEXT NOT NULL REFERENCES samples(sample),
+    {columns}
+);
+CREATE TABLE IF NOT EXISTS hit_terms (
+    hit_id INTEGER NOT NULL REFERENCES hits(id),
+    kind TEXT NOT NULL,
+    term TEXT NOT NULL COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS hits_sample ON hits(sample);
+CREATE INDEX IF NOT EXISTS hits_trait ON hits(trait COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS hits_position ON hits(chrom, pos);
+CREATE INDEX IF NOT EXISTS hit_terms_term ON hit_terms(kind, term);
+CREATE INDEX IF NOT EXISTS hit_terms_hit ON hit_terms(hit_id);
+""".format(columns=",\n    ".join(
+    f"{col} {'REAL' if col in ('qual', 'p_value', 'raf') else 'INTEGER' if col == 'pos' else 'TEXT'}"
+    for col in HIT_COLUMNS.values()))
+
+
+def _cell(value):
+    """Plain Python value for sqlite3 (None/NaN/pd.NA -> NULL, numpy scalars -> Python)."""
+    import pandas as pd
+
+    if pd.isna(value):
+        return None
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+class ResultsDB:
+    """SQLite database of annotated hits from many samples, indexed by rsID, gene, trait and sample.
+
+    Each sample's rows are replaced as a whole in one transaction, so re-running a sample never
+    leaves duplicates or a half-loaded sample behind.
+    """
+
+    def __init__(self, path: str, timeout: float = 60.0):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=timeout)
+        # WAL lets readers query while another process or service worker is loading
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # ---------- loading ----------
+    def load(self, sample: str, annotated, source: str = None) -> int:
+        """Replace `sample`'s hits with the rows of an annotated DataFrame; returns rows loaded."""
+        present = [c for c in HIT_COLUMNS if c in annotated.columns]
+        columns = ["sample"] + [HIT_COLUMNS[c] for c in present]
+        placeholders = ", ".join("?" * len(columns))
+        rows = [(sample,) + tuple(_cell(v) for v in row)
+                for row in annotated[present].itertuples(index=False, name=None)]
+        snps = annotated["SNPS"].tolist() if "SNPS" in annotated.columns else [None] * len(rows)
+        genes = annotated["MAPPED_GENE"].tolist() if "MAPPED_GENE" in annotated.columns else [None] * len(rows)
+
+        with self.conn:  # one transaction: commit on success, roll back on error
+            self._delete(sample)
+            self.conn.execute("INSERT INTO samples (sample, source, loaded_at, n_hits) VALUES (?, ?, ?, ?)",
+                              (sample, source, time.time(), len(rows)))
+            first = self.conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM hits").fetchone()[0]
+            self.conn.executemany(
+                f"INSERT INTO hits (id, {', '.join(columns)}) VALUES (?, {placeholders})",
+                ((first + i,) + row for i, row in enumerate(rows)))
+            self.conn.executemany(
+                "INSERT INTO hit_terms (hit_id, kind, term) VALUES (?, ?, ?)",
+                ((first + i, kind, term)
+                 for i, (snp, gene) in enumerate(zip(snps, genes))
+                 for kind, value in (("snp", snp), ("gene", gene))
+                 for term in split_terms(value)))
+        return len(rows)
+
+    def _delete(self, sample: str):
+        self.conn.execute("DELETE FROM hit_terms WHERE hit_id IN (SELECT id FROM hits WHERE sample = ?)", (sample,))
+        self.conn.execute("DELETE FROM hits WHERE sample = ?", (sample,))
+        self.conn.execute("DELETE FROM samples WHERE sample = ?", (sample,))
+
+    def remove(self, sample: str):
+        with self.conn:
+            self._delete(sample)
+
+    # ---------- queries ----------
+    def query(self, snp: str = None, gene: str = None, trait: str = None, sample: str = None,
+              limit: int = None):
+        """Hits matching every given filter; rsID, gene and trait match whole values, ignoring case.
+
+        Multi-SNP and multi-gene catalog entries match any of their listed rsIDs or genes.
+        """
+        import pandas as pd
+
+        where, params = [], []
+        for kind, value in (("snp", snp), ("gene", gene)):
+            if value:
+                where.append("h.id IN (SELECT hit_id FROM hit_terms WHERE kind = ? AND term = ?)")
+                params += [kind, value]
+        if trait:
+            where.append("h.trait = ? COLLATE NOCASE")
+            params.append(trait)
+        if sample:
+            where.append("h.sample = ?")
+            params.append(sample)
+        sql = "SELECT h.* FROM hits h"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY h.sample, h.chrom, h.pos"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return pd.read_sql_query(sql, self.conn, params=params).drop(columns="id")
+
+    def samples(self):
+        import pandas as pd
+        return pd.read_sql_query("SELECT * FROM samples ORDER BY sample", self.conn)
+
+
+def load_reports(db_path: str, paths, quiet: bool = False) -> int:
+    """Load existing per-sample in-house_report.csv outputs (see cohort.find_sample_reports)."""
+    import pandas as pd
+
+    from .cohort import find_sample_reports
+
+    total = 0
+    with ResultsDB(db_path) as db:
+        for sample, csv in find_sample_reports(paths):
+            n = db.load(sample, pd.read_csv(csv, dtype={"CHROM": str, "CHR_ID": str}), source=csv)
+            total += n
+            if not quiet:
+                print(f"{sample}: {n:,} hits")
+    return total
+
+
+def build_parser():
+    p = argparse.ArgumentParser(
+        prog="mapgwas results",
+        description="Load annotated outputs into a local SQLite results database and query it across samples"
+    )
+    sub = p.add_subparsers(dest="action", required=True)
+
+    load = sub.add_parser("load", help="Load in-house_report.csv outputs (re-loading a sample replaces it)")
+    load.add_argument("db", help="SQLite database file (created if missing)")
+    load.add_argument("paths", nargs="+", help="Sample output roots, directories containing them, or CSV files")
+    load.add_argument("--quiet", action="store_true", help="Suppress progress messages")
+
+    query = sub.add_parser("query", help="Print hits matching all given filters")
+    query.add_argument("db", help="SQLite database file")
+    query.add_argument("--snp", default=None, help="rsID, e.g. rs429358")
+    query.add_argument("--gene", default=None, help="Mapped gene symbol, e.g. APOE")
+    query.add_argument("--trait", default=None, help="DISEASE/TRAIT, e.g. \"Type 2 diabetes\" (case-insensitive)")
+    query.add_argument("--sample", default=None, help="Restrict to one sample")
+    query.add_argument("--limit", type=int, default=None, help="Maximum rows printed")
+    query.add_argument("--csv", action="store_true", help="Print CSV instead of a table")
+
+    samples = sub.add_parser("samples", help="List loaded samples")
+    samples.add_argument("db", help="SQLite database file")
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.action == "load":
+        total = load_reports(args.db, args.paths, quiet=args.quiet)
+        if not args.quiet:
+            print(f"Loaded {total:,} hits into {args.db}")
+        return 0
+
+    if not os.path.exists(args.db):
+        raise SystemExit(f"Results database not found: {args.db}")
+    with ResultsDB(args.db) as db:
+        if args.action == "samples":
+            out = db.samples()
+        else:
+            out = db.query(snp=args.snp, gene=args.gene, trait=args.trait, sample=args.sample, limit=args.limit)
+    if args.action == "query" and args.csv:
+        out.to_csv(sys.stdout, index=False)
+    else:
+        print(out.to_string(index=False) if len(out) else "No matching rows")
+    return 0
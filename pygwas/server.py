@@ -0,0 +1,293 @@
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .cli import add_mapping_arguments, mapper_options
+
+# Per-job overrides accepted in a JSON job request, mapped to MapGWASSNPs keyword arguments
+JOB_OPTIONS = {
+    "qual_cutoff": "cut_off_qual",
+    "top_k": "top_k",
+    "min_gq": "min_gq",
+    "keep_nr": "filt_nr_disease",
+}
+
+
+class QueueFull(RuntimeError):
+    """Raised when the bounded job queue cannot accept another job."""
+
+
+class SampleBusy(RuntimeError):
+    """Raised when a sample already has a queued or running job writing to its output directory."""
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', os.path.basename(str(name))) or "sample"
+
+
+class MapGWASService:
+    """Keeps the GWAS catalog and compiled report template resident and runs jobs on a bounded pool."""
+
+    def __init__(self, gwas_file: str, output_root: str, workers: int = 2, max_queue: int = 16,
+                 verbose: bool = False, **options):
+        self.gwas_file = gwas_file
+        self.output_root = output_root.replace('\\', '/').rstrip('/')
+        os.makedirs(self.output_root, exist_ok=True)
+
+        from .catalog import load_gwas_catalog
+        from .popaf import AlleleFrequencyIndex
+        from .proxies import ProxyIndex
+        from .pygwas import _report_template
+        from .reference import FastaReference
+        from .regions import RegionIndex
+        from .vcf import CatalogPositions
+
+        t0 = time.perf_counter()
+        self.gwas_df = load_gwas_catalog(gwas_file, extra_columns=options.get("gwas_columns"))
+        self.catalog_load_s = round(time.perf_counter() - t0, 6)
+        _report_template()
+        # Regions, the reference and the memory-mapped indexes are opened once and shared read-only by every job
+        openers = {"regions": RegionIndex.from_bed, "reference": FastaReference,
+                   "ld_proxies": ProxyIndex.open, "pop_af": AlleleFrequencyIndex.open}
+        for key, opener in openers.items():
+            if isinstance(options.get(key), str):
+                options[key] = opener(options[key])
+        # The prefilter's position set is built once per catalog, not once per job
+        catalog = self.gwas_df
+        if options.get("regions") is not None:
+            catalog = catalog.loc[options["regions"].contains(catalog["CHR_ID"], catalog["CHR_POS"])]
+        self.catalog_positions = CatalogPositions.from_catalog(catalog)
+        options["quiet"] = True
+        # Jobs already run on worker threads; partitioned joins share the process instead of forking it
+        options["join_executor"] = "thread"
+        self.options = options
+        self.verbose = verbose
+
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mapgwas-job")
+        # One slot per running or waiting job; submit() fails fast once they are all taken
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self.jobs = {}
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self.started = time.time()
+
+    # ---------- jobs ----------
+    def submit(self, vcf_path: str, sample: str = None, options: dict = None, cleanup: bool = False) -> dict:
+        overrides = {}
+        for key, value in (options or {}).items():
+            if key not in JOB_OPTIONS:
+                raise ValueError(f"Unknown job option {key!r}; expected one of {sorted(JOB_OPTIONS)}")
+            overrides[JOB_OPTIONS[key]] = (not value) if key == "keep_nr" else value
+        if not os.path.exists(vcf_path):
+            raise FileNotFoundError(f"VCF not found: {vcf_path}")
+
+        job_id = uuid.uuid4().hex[:12]
+        sample = _safe_name(sample or job_id)
+        job = {
+            "id": job_id,
+            "sample": sample,
+            "vcf": vcf_path,
+            "output": os.path.join(self.output_root, sample),
+            "status": "queued",
+            "submitted": time.time(),
+        }
+        with self._lock:
+            # Jobs of one sample share its output directory, so they must not overlap
+            if any(j["sample"] == sample and j["status"] in ("queued", "running") for j in self.jobs.values()):
+                self.counters["rejected"] += 1
+                raise SampleBusy(f"Sample {sample!r} already has a queued or running job")
+            if not self._slots.acquire(blocking=False):
+                self.counters["rejected"] += 1
+                raise QueueFull(f"Job queue is full ({self.workers} running + {self.max_queue} queued)")
+            self.jobs[job_id] = job
+            self.counters["submitted"] += 1
+        self._executor.submit(self._run, job, overrides, cleanup)
+        return dict(job)
+
+    def _run(self, job: dict, overrides: dict, cleanup: bool):
+        with self._lock:
+            job.update(status="running", started=time.time())
+        from .pygwas import MapGWASSNPs
+
+        try:
+            mapper = MapGWASSNPs(job["vcf"], self.gwas_file, job["output"], sample=job["sample"],
+                                 gwas_df=self.gwas_df,
+                                 catalog_positions=self.catalog_positions, **{**self.options, **overrides})
+            mapper.map_snps()
+            mapper.generate_report()
+            result = dict(
+                status="done",
+                rows=int(len(mapper.annotated_df)),
+                annotated_csv=mapper.annotated_csv,
+                report_data_csv=os.path.join(mapper.report_data_path, 'report_data.csv'),
+                report_html=os.path.join(mapper.report_path, 'GWAS_report.html'),
+                metrics=mapper.metrics.to_dict(),
+            )
+            counter = "completed"
+        except Exception as exc:
+            result = dict(status="failed", error=f"{type(exc).__name__}: {exc}")
+            counter = "failed"
+        finally:
+            if cleanup and os.path.exists(job["vcf"]):
+                os.remove(job["vcf"])
+            self._slots.release()
+        with self._lock:
+            job.update(result, finished=time.time())
+            self.counters[counter] += 1
+
+    def job(self, job_id: str) -> dict:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    # ---------- status ----------
+    def health(self) -> dict:
+        return {"status": "ok", "catalog_rows": int(len(self.gwas_df)), "workers": self.workers}
+
+    def metrics(self) -> dict:
+        with self._lock:
+            states = [j["status"] for j in self.jobs.values()]
+            runtimes = [j["finished"] - j["started"] for j in self.jobs.values()
+                        if j["status"] == "done"]
+            counters = dict(self.counters)
+        return {
+            "uptime_s": round(time.time() - self.started, 3),
+            "catalog_load_s": self.catalog_load_s,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+            **counters,
+            "mean_job_s": round(sum(runtimes) / len(runtimes), 6) if runtimes else None,
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None
+    server_version = "mapgwas"
+
+    def log_message(self, format, *args):
+        if self.service.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body, content_type: str = "application/json"):
+        if content_type == "application/json":
+            body = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_file(self, path: str, content_type: str):
+        if not path or not os.path.exists(path):
+            return self._send(404, {"error": "output not available"})
+        with open(path, "rb") as f:
+            self._send(200, f.read(), content_type)
+
+    def do_GET(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        if parts == ["health"]:
+            return self._send(200, self.service.health())
+        if parts == ["metrics"]:
+            return self._send(200, self.service.metrics())
+        if parts == ["jobs"]:
+            with self.service._lock:
+                ids = list(self.service.jobs)
+            return self._send(200, [self.service.job(i) for i in ids])
+        if len(parts) >= 2 and parts[0] == "jobs":
+            job = self.service.job(parts[1])
+            if job is None:
+                return self._send(404, {"error": f"unknown job {parts[1]}"})
+            if len(parts) == 2:
+                return self._send(200, job)
+            if parts[2:] == ["report"]:
+                return self._send_file(job.get("report_html"), "text/html; charset=utf-8")
+            if parts[2:] == ["annotated"]:
+                return self._send_file(job.get("annotated_csv"), "text/csv; charset=utf-8")
+            if parts[2:] == ["report-data"]:
+                return self._send_file(job.get("report_data_csv"), "text/csv; charset=utf-8")
+        return self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if [p for p in url.path.split("/") if p] != ["jobs"]:
+            return self._send(404, {"error": "not found"})
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                request = json.loads(body or b"{}")
+                job = self.service.submit(request["vcf"], sample=request.get("sample"),
+                                          options=request.get("options"))
+            else:
+                # Raw VCF upload (plain or gzip); stored until the job finishes
+                upload_dir = os.path.join(self.service.output_root, "_uploads")
+                os.makedirs(upload_dir, exist_ok=True)
+                suffix = ".vcf.gz" if body[:2] == b"\x1f\x8b" else ".vcf"
+                path = os.path.join(upload_dir, uuid.uuid4().hex + suffix)
+                with open(path, "wb") as f:
+                    f.write(body)
+                options = {k: json.loads(v) for k, v in query.items() if k in JOB_OPTIONS}
+                try:
+                    job = self.service.submit(path, sample=query.get("sample"), options=options, cleanup=True)
+                except Exception:
+                    os.remove(path)
+                    raise
+        except QueueFull as exc:
+            return self._send(503, {"error": str(exc)})
+        except SampleBusy as exc:
+            return self._send(409, {"error": str(exc)})
+        except (KeyError, ValueError, FileNotFoundError) as exc:
+            return self._send(400, {"error": str(exc)})
+        return self._send(202, job)
+
+
+def make_server(service: MapGWASService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    handler = type("MapGWASHandler", (_Handler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def build_parser():
+    p = argparse.ArgumentParser(
+        prog="mapgwas serve",
+        description="Local HTTP service that maps VCFs against a resident GWAS catalog"
+    )
+    p.add_argument("--gwas", required=True, help="GWAS CSV file (CSV or CSV.GZ)")
+    p.add_argument("--out", required=True, help="Output root; each job writes to <out>/<sample>")
+    p.add_argument("--host", default="127.0.0.1", help="Bind address (default=127.0.0.1)")
+    p.add_argument("--port", type=int, default=8765, help="Port (default=8765)")
+    p.add_argument("--workers", type=int, default=2, help="Concurrent jobs (default=2)")
+    p.add_argument("--max-queue", type=int, default=16, help="Jobs allowed to wait for a worker (default=16)")
+    add_mapping_arguments(p)
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    service = MapGWASService(args.gwas, args.out, workers=args.workers, max_queue=args.max_queue,
+                             verbose=not args.quiet, **mapper_options(args))
+    httpd = make_server(service, args.host, args.port)
+    print(f"mapgwas serving on http://{args.host}:{httpd.server_address[1]} "
+          f"(catalog rows: {len(service.gwas_df):,}, workers: {args.workers})")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.shutdown()
+    return 0
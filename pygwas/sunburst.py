@@ -0,0 +1,103 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+# Plotly's sequential "ice" scale, inlined so the trace can be built without importing plotly
+ICE_COLORSCALE = [
+    "rgb(3, 5, 18)", "rgb(25, 25, 51)", "rgb(44, 42, 87)", "rgb(58, 60, 125)",
+    "rgb(62, 83, 160)", "rgb(62, 109, 178)", "rgb(72, 134, 187)", "rgb(89, 159, 196)",
+    "rgb(114, 184, 205)", "rgb(149, 207, 216)", "rgb(192, 229, 232)", "rgb(234, 252, 253)",
+]
+
+# Node ids join escaped labels with "/": a backslash in a label becomes "\\" and a slash "\/",
+# so no two label paths share an id, and no escaped label can contain "\o" as OTHER_ID does
+OTHER_ID = r"\other"
+
+
+def _id_part(labels: pd.Series) -> pd.Series:
+    return labels.str.replace("\\", "\\\\", regex=False).str.replace("/", "\\/", regex=False)
+
+
+def build_sunburst_hierarchy(df: pd.DataFrame, levels, color_col: str = None, max_depth: int = None,
+                             max_children: int = None, other_label: str = "Other") -> pd.DataFrame:
+    """Sunburst nodes (id, label, parent, value, color) aggregated level by level from `df` rows.
+
+    `value` is the number of rows under a node and `color` the mean of `color_col` over them.
+    A row whose value is missing at some level stops at the parent node. With `max_children`,
+    only the largest children of each node are kept and the rest are merged into one
+    "Other" node that is not expanded further. `max_depth` limits the number of levels.
+    """
+    levels = list(levels)[:max_depth] if max_depth else list(levels)
+    color = (pd.to_numeric(df[color_col], errors="coerce") if color_col in df.columns
+             else pd.Series(np.nan, index=df.index)).to_numpy(dtype=float)
+    parent = pd.Series("", index=df.index, dtype=object)
+    active = np.ones(len(df), dtype=bool)
+    frames = []
+
+    for col in levels:
+        values = df[col]
+        rows = active & values.notna().to_numpy()
+        if not rows.any():
+            break
+        sub = pd.DataFrame({
+            "parent": parent.to_numpy()[rows],
+            "label": values[rows].astype(str).to_numpy(),
+            "color": color[rows],
+        })
+        part = _id_part(sub["label"])
+        sub["id"] = np.where(sub["parent"].eq(""), part, sub["parent"] + "/" + part)
+        nodes = (sub.groupby(["parent", "label", "id"], sort=False)
+                 .agg(value=("color", "size"), csum=("color", "sum"), cn=("color", "count"))
+                 .reset_index())
+
+        collapsed = np.zeros(len(sub), dtype=bool)
+        if max_children:
+            nodes = nodes.sort_values(["parent", "value", "label"], ascending=[True, False, True],
+                                      kind="mergesort")
+            over = nodes.groupby("parent", sort=False).cumcount().to_numpy() >= max_children
+            if over.any():
+                other = (nodes[over].groupby("parent", sort=False)
+                         .agg(value=("value", "sum"), csum=("csum", "sum"), cn=("cn", "sum"),
+                              n=("label", "size"))
+                         .reset_index())
+                other["id"] = np.where(other["parent"].eq(""), OTHER_ID, other["parent"] + "/" + OTHER_ID)
+                other["label"] = other_label + " (" + other["n"].astype(str) + ")"
+                collapsed = sub["id"].isin(nodes.loc[over, "id"]).to_numpy()
+                nodes = pd.concat([nodes[~over], other.drop(columns="n")], ignore_index=True)
+        frames.append(nodes)
+
+        # Rows merged into "Other" stop here; the rest descend under their node
+        ids = sub["id"].to_numpy(dtype=object)
+        idx = np.flatnonzero(rows)
+        parent.iloc[idx] = ids
+        active[:] = False
+        active[idx[~collapsed]] = True
+
+    if not frames:
+        return pd.DataFrame({"id": [], "label": [], "parent": [], "value": [], "color": []})
+    out = pd.concat(frames, ignore_index=True)
+    out["color"] = np.divide(out["csum"], out["cn"], out=np.full(len(out), np.nan),
+                             where=out["cn"].to_numpy() > 0)
+    return out[["id", "label", "parent", "value", "color"]]
+
+
+def sunburst_figure_json(nodes: pd.DataFrame, colorscale=ICE_COLORSCALE, hover_name: str = "RAF (%)",
+                         **layout) -> str:
+    """Compact Plotly figure JSON holding a single sunburst trace for `nodes`."""
+    colors = nodes["color"].round(2)
+    trace = {
+        "type": "sunburst",
+        "ids": nodes["id"].tolist(),
+        "labels": nodes["label"].tolist(),
+        "parents": nodes["parent"].tolist(),
+        "values": nodes["value"].astype(int).tolist(),
+        "branchvalues": "total",
+        "marker": {
+            "colors": [None if pd.isna(c) else float(c) for c in colors],
+            "colorscale": colorscale,
+            "showscale": False,
+        },
+        "hovertemplate": "%{label}<br>hits=%{value}<br>" + hover_name + "=%{color}<extra></extra>",
+    }
+    return json.dumps({"data": [trace], "layout": layout}, separators=(",", ":"))
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+# Optional catalog column naming the risk allele as "rsID-ALLELE" (read with --gwas-columns)
+RISK_ALLELE_COLUMN = "STRONGEST SNP-RISK ALLELE"
+
+# Copies of the ALT allele per zygosity call
+ALT_COPIES = {"het": 1, "hom-alt": 2}
+
+SUMMARY_COLUMNS = ["DISEASE/TRAIT", "HITS", "LOCI", "MIN_P", "MEAN_RAF", "WEIGHTED_RAF", "RISK_ALLELES"]
+
+
+def _numeric(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    s = df[col]
+    if not pd.api.types.is_numeric_dtype(s):
+        s = pd.to_numeric(s.astype(str).str.strip(), errors="coerce")
+    return s.to_numpy(dtype=float, na_value=np.nan)
+
+
+def _carries_risk_allele(df: pd.DataFrame) -> np.ndarray:
+    """Whether each row's ALT is the catalog risk allele; rows with an unknown risk allele count as carried."""
+    if RISK_ALLELE_COLUMN not in df.columns or "ALT" not in df.columns:
+        return np.ones(len(df), dtype=bool)
+    risk = df[RISK_ALLELE_COLUMN].astype(str).str.rsplit("-", n=1).str[-1].str.upper()
+    known = risk.str.fullmatch(r"[ACGT]+").fillna(False).to_numpy(dtype=bool)
+    alt = df["ALT"].astype(str).str.upper().to_numpy(dtype=object)
+    return ~known | (risk.to_numpy(dtype=object) == alt)
+
+
+def trait_summary(df: pd.DataFrame, p_value: np.ndarray = None, raf: np.ndarray = None) -> pd.DataFrame:
+    """Per-trait aggregates over every annotated row, in one grouped pass over column arrays.
+
+    HITS counts rows and LOCI distinct catalog positions. MIN_P is the smallest P-VALUE.
+    MEAN_RAF is the mean RISK ALLELE FREQUENCY, and WEIGHTED_RAF weights each row by -log10(p),
+    so that strong associations dominate. RISK_ALLELES counts the risk-allele copies the sample
+    carries (het 1, hom-alt 2), skipping rows whose catalog risk allele is not the called ALT.
+    `p_value` and `raf` are the already cleaned numeric columns, when the caller has them.
+    """
+    if df.empty:
+        return pd.DataFrame({c: pd.Series(dtype=object if c == "DISEASE/TRAIT" else float)
+                             for c in SUMMARY_COLUMNS})
+    codes, traits = pd.factorize(df["DISEASE/TRAIT"])
+    n = len(traits)
+    valid = codes >= 0
+    codes = np.where(valid, codes, 0)
+
+    def per_trait(weights=None, mask=valid):
+        w = mask.astype(float) if weights is None else np.where(mask, weights, 0.0)
+        return np.bincount(codes, weights=w, minlength=n)
+
+    hits = per_trait()
+
+    # Distinct (trait, chrom, pos) triples from integer codes, without building key strings
+    chrom, chroms = pd.factorize(df["CHR_ID"], use_na_sentinel=False)
+    pos, positions = pd.factorize(df["CHR_POS"], use_na_sentinel=False)
+    locus = chrom.astype(np.int64) * len(positions) + pos
+    width = len(chroms) * len(positions)
+    pairs = pd.unique(codes[valid].astype(np.int64) * width + locus[valid])
+    loci = np.bincount(pairs // width, minlength=n)
+
+    p_val = _numeric(df, "P-VALUE") if p_value is None else np.asarray(p_value, dtype=float)
+    min_p = np.full(n, np.inf)
+    np.minimum.at(min_p, codes[valid], np.where(np.isnan(p_val), np.inf, p_val)[valid])
+
+    raf = _numeric(df, "RISK ALLELE FREQUENCY") if raf is None else np.asarray(raf, dtype=float)
+    has_raf = valid & ~np.isnan(raf)
+    raf_n = per_trait(mask=has_raf)
+    weight = -np.log10(np.clip(p_val, 1e-300, 1.0))
+    has_weight = has_raf & ~np.isnan(weight) & (weight > 0)
+    weight_sum = per_trait(weight, has_weight)
+
+    copies = np.zeros(len(df))
+    if "ZYGOSITY" in df.columns:
+        zyg, calls = pd.factorize(df["ZYGOSITY"])
+        per_call = np.array([ALT_COPIES.get(c, 0) for c in calls] + [0], dtype=float)
+        copies = per_call[zyg]  # -1 (missing) picks the trailing 0
+    risk_alleles = per_trait(copies, valid & _carries_risk_allele(df))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        summary = pd.DataFrame({
+            "DISEASE/TRAIT": np.asarray(traits, dtype=object),
+            "HITS": hits.astype(np.int64),
+            "LOCI": loci.astype(np.int64),
+            "MIN_P": np.where(np.isinf(min_p), np.nan, min_p),
+            "MEAN_RAF": np.where(raf_n > 0, per_trait(raf, has_raf) / raf_n, np.nan),
+            "WEIGHTED_RAF": np.where(weight_sum > 0, per_trait(weight * raf, has_weight) / weight_sum, np.nan),
+            "RISK_ALLELES": risk_alleles.astype(np.int64),
+        })
+    return summary.sort_values(["HITS", "MIN_P"], ascending=[False, True], kind="mergesort", ignore_index=True)
+
+
+def summary_label(row) -> str:
+    """One line for a trait card, e.g. '12 hits at 9 loci · min p = 3.0e-12 · mean RAF 34.5% (weighted 41.2%)'."""
+    if row is None:
+        return ""
+    parts = [f"{int(row['HITS']):,} hit{'s' if row['HITS'] != 1 else ''} at "
+             f"{int(row['LOCI']):,} loc{'i' if row['LOCI'] != 1 else 'us'}"]
+    if not pd.isna(row["MIN_P"]):
+        parts.append(f"min p = {row['MIN_P']:.1e}")
+    if not pd.isna(row["MEAN_RAF"]):
+        raf = f"mean RAF {row['MEAN_RAF'] * 100:.1f}%"
+        if not pd.isna(row["WEIGHTED_RAF"]):
+            raf += f" (weighted {row['WEIGHTED_RAF'] * 100:.1f}%)"
+        parts.append(raf)
+    parts.append(f"{int(row['RISK_ALLELES']):,} risk allele cop{'ies' if row['RISK_ALLELES'] != 1 else 'y'} carried")
+    return " · ".join(parts)
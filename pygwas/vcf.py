@@ -0,0 +1,168 @@
+import gzip
+import io
+import itertools
+import re
+
+import numpy as np
+import pandas as pd
+
+VCF_COLUMNS = ["CHROM", "POS", "ID", "REF", "ALT", "QUAL", "FILTER", "INFO", "FORMAT", "SAMPLE"]
+
+# Columns the variant statistics need from every record
+STATS_COLUMNS = ["CHROM", "POS", "REF", "ALT", "QUAL", "FILTER", "FORMAT", "SAMPLE"]
+
+# Low-cardinality columns of the light pass, read as categoricals so that string work runs once per distinct value
+CATEGORY_COLUMNS = ["CHROM", "REF", "ALT", "FILTER", "FORMAT", "SAMPLE"]
+
+_FORMAT_ID = re.compile(r'^##FORMAT=<ID=([^,>]+)')
+
+# Records tokenised per chunk by the prefiltering reader
+CHUNK_LINES = 200_000
+
+# Chunks the prefiltering reader may hold while the catalog positions are still loading
+MAX_PENDING_CHUNKS = 8
+
+
+class CatalogPositions:
+    """Exact set of catalog positions per chromosome, keyed by the strings the join compares."""
+
+    def __init__(self, positions: dict):
+        self.positions = {str(c): set(p) for c, p in positions.items()}
+        self._sorted = None
+
+    @classmethod
+    def from_catalog(cls, gwas_df: pd.DataFrame) -> "CatalogPositions":
+        keys = gwas_df[["CHR_ID", "CHR_POS"]].dropna().astype(str).drop_duplicates()
+        return cls({chrom: grp["CHR_POS"].tolist() for chrom, grp in keys.groupby("CHR_ID", sort=False)})
+
+    def add(self, chrom, pos):
+        """Also keep records at these positions (e.g. LD proxies of catalog positions)."""
+        keys = pd.DataFrame({"CHROM": pd.Series(chrom).astype(str).to_numpy(),
+                             "POS": pd.Series(pos).astype(str).to_numpy()})
+        for c, grp in keys.groupby("CHROM", sort=False):
+            self.positions.setdefault(c, set()).update(grp["POS"].tolist())
+        self._sorted = None
+        return self
+
+    def _arrays(self) -> dict:
+        # Sorted int64 positions per chromosome. A VCF POS is written as a plain integer, so a catalog
+        # position spelled any other way ('0100', '1;2') can never match and is left out.
+        if self._sorted is None:
+            self._sorted = {c: np.unique(np.array([int(p) for p in ps if p.isdigit() and str(int(p)) == p],
+                                                  dtype=np.int64))
+                            for c, ps in self.positions.items()}
+        return self._sorted
+
+    def mask(self, chrom: pd.Series, pos: pd.Series) -> np.ndarray:
+        """Boolean mask of rows whose (chrom, pos) is a catalog position; integer lookups per chromosome."""
+        arrays = self._arrays()
+        codes, chroms = pd.factorize(pd.Series(chrom), use_na_sentinel=False)
+        pos = pd.to_numeric(pd.Series(pos), errors='coerce').to_numpy(dtype=float)
+        mask = np.zeros(len(codes), dtype=bool)
+        for code, c in enumerate(chroms):
+            found = arrays.get(str(c))
+            if found is not None and len(found):
+                idx = np.flatnonzero(codes == code)
+                mask[idx] = np.isin(pos[idx], found)
+        return mask
+
+    def __len__(self):
+        return sum(len(p) for p in self.positions.values())
+
+
+def _open_text(path: str):
+    return gzip.open(path, "rt") if path.endswith(".gz") else open(path)
+
+
+def declared_format_keys(path: str) -> set:
+    """FORMAT IDs declared in the VCF header (##FORMAT=<ID=...>)."""
+    keys = set()
+    with _open_text(path) as f:
+        for line in f:
+            if not line.startswith("##"):
+                break
+            match = _FORMAT_ID.match(line)
+            if match:
+                keys.add(match.group(1))
+    return keys
+
+
+def read_vcf(path: str, chunk_lines: int = None):
+    """Whole VCF as a ten-column frame (an iterator of frames with `chunk_lines`)."""
+    compression = 'gzip' if path.endswith('.gz') else None
+    return pd.read_csv(path, compression=compression, sep='\t', comment="#", names=VCF_COLUMNS,
+                       chunksize=chunk_lines)
+
+
+def _read_lines(lines, usecols=None, dtype=None) -> pd.DataFrame:
+    """Parse raw record lines; columns a sites-only VCF lacks (FORMAT, SAMPLE) come back empty."""
+    names = VCF_COLUMNS[:lines[0].count("\t") + 1]
+    wanted = usecols or VCF_COLUMNS
+    df = pd.read_csv(io.StringIO("".join(lines)), sep='\t', header=None, names=names,
+                     usecols=[c for c in wanted if c in names],
+                     dtype={c: t for c, t in (dtype or {}).items() if c in names})
+    missing = [c for c in wanted if c not in names]
+    return df.assign(**{c: np.nan for c in missing})[wanted] if missing else df
+
+
+def _line_blocks(path: str, chunk_lines: int):
+    """Lists of up to `chunk_lines` raw record lines; the header is skipped."""
+    with _open_text(path) as f:
+        first = next((line for line in f if not line.startswith("#")), None)
+        if first is None:
+            return
+        block = [first] + list(itertools.islice(f, chunk_lines - 1))
+        while block:
+            yield block
+            block = list(itertools.islice(f, chunk_lines))
+
+
+def prefilter_vcf(path: str, positions, on_chunk, stats_columns=None, keep_non_snv: bool = False,
+                  chunk_lines: int = CHUNK_LINES, max_pending: int = MAX_PENDING_CHUNKS) -> pd.DataFrame:
+    """Return only the VCF records on a catalog position, reading the file in fixed-size chunks.
+
+    Each chunk of raw lines is tokenised once into CHROM/POS and the `stats_columns` only (ID and,
+    unless asked for, INFO are skipped; repetitive columns become categoricals); its CHROM/POS are
+    checked against `positions`, and only the matching lines are parsed again with all ten columns
+    for INFO/FORMAT parsing and the join. The light frame of every chunk is passed to `on_chunk(frame)` for the variant
+    statistics, so the whole VCF is never held in memory. With `keep_non_snv` every record whose
+    REF or ALT is longer than one base is kept too, since normalisation may move it onto a
+    catalog position.
+
+    `positions` may also be a `concurrent.futures.Future` of a CatalogPositions, so that reading
+    starts while the catalog is still loading. Chunks read before it resolves are held (at most
+    `max_pending`, after which the reader waits for it) and filtered once it has.
+    """
+    stats_columns = list(stats_columns or STATS_COLUMNS)
+    light = ["CHROM", "POS"] + (["REF", "ALT"] if keep_non_snv else [])
+    light = [c for c in VCF_COLUMNS if c in set(light + stats_columns)]
+    kept, pending = [], []
+
+    def keep(lines, chunk):
+        hit = positions.mask(chunk["CHROM"], chunk["POS"])
+        if keep_non_snv:
+            hit |= ((chunk["REF"].str.len() > 1) | (chunk["ALT"].str.len() > 1)).to_numpy()
+        rows = np.flatnonzero(hit)
+        if len(rows):
+            kept.append(_read_lines([lines[i] for i in rows], dtype={"CHROM": str}))
+
+    for lines in _line_blocks(path, chunk_lines):
+        chunk = _read_lines(lines, usecols=light, dtype=dict.fromkeys(CATEGORY_COLUMNS, "category"))
+        on_chunk(chunk[stats_columns])
+        if not isinstance(positions, CatalogPositions):
+            pending.append((lines, chunk))
+            if not positions.done() and len(pending) < max_pending:
+                continue
+            positions = positions.result()
+            for held in pending:
+                keep(*held)
+            pending.clear()
+        else:
+            keep(lines, chunk)
+    if pending:
+        positions = positions.result()
+        for held in pending:
+            keep(*held)
+    if not kept:
+        return pd.DataFrame({c: pd.Series(dtype=object) for c in VCF_COLUMNS})
+    return pd.concat(kept, ignore_index=True)
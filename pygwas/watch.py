@@ -0,0 +1,204 @@
+import argparse
+import fnmatch
+import json
+import os
+import re
+import time
+
+from .cli import add_mapping_arguments, mapper_options
+
+# VCF names picked up under the watched directory (medaka writes sort-medaka-{barcode}/medaka.sorted.vcf)
+DEFAULT_PATTERNS = ["*.vcf", "*.vcf.gz"]
+
+STATE_NAME = ".mapgwas-watch.json"
+
+_MEDAKA_DIR = re.compile(r'^(?:sort-)?medaka-(.+)$')
+_GENERIC_STEMS = {"medaka.sorted", "medaka", "calls", "variants"}
+
+
+def sample_name(vcf_path: str) -> str:
+    """Sample for a VCF: the barcode of a medaka output directory, otherwise the file name stem."""
+    stem = re.sub(r'\.vcf(\.gz)?$', '', os.path.basename(vcf_path))
+    parent = os.path.basename(os.path.dirname(os.path.abspath(vcf_path)))
+    match = _MEDAKA_DIR.match(parent)
+    if match:
+        return match.group(1)
+    return parent if stem in _GENERIC_STEMS and parent else stem
+
+
+class DirectoryWatcher:
+    """Feeds fully written VCFs under a directory to a MapGWASService, one job per file.
+
+    A VCF counts as complete once its `sentinel` file exists next to it or, without a sentinel,
+    once its size and mtime have not changed for `settle` seconds. Finished files are recorded
+    in a JSON state file with their size and mtime, so a restarted watcher skips them unless
+    they are rewritten. When the service queue is full, remaining files wait for the next scan, as
+    does a file that vanished before its job was submitted or whose sample is still busy.
+    """
+
+    def __init__(self, service, directory: str, patterns=None, settle: float = 30.0, sentinel: str = None,
+                 state_file: str = None, log=print):
+        self.service = service
+        self.directory = directory
+        self.patterns = list(patterns or DEFAULT_PATTERNS)
+        self.settle = settle
+        self.sentinel = sentinel
+        self.state_file = state_file or os.path.join(service.output_root, STATE_NAME)
+        self.log = log or (lambda *args: None)
+        self.state = self._load_state()
+        self._signatures = {}  # path -> ((size, mtime_ns), first time seen with that signature)
+        self._running = {}     # path -> (job id, signature)
+
+    # ---------- state ----------
+    def _load_state(self) -> dict:
+        if not os.path.exists(self.state_file):
+            return {}
+        with open(self.state_file) as f:
+            return json.load(f)
+
+    def _save_state(self):
+        tmp = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.state_file)
+
+    # ---------- discovery ----------
+    def _candidates(self):
+        for root, dirs, files in os.walk(self.directory):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for name in files:
+                if any(fnmatch.fnmatch(name, p) for p in self.patterns):
+                    yield os.path.abspath(os.path.join(root, name))
+
+    def _complete(self, path: str, signature, now: float) -> bool:
+        if self.sentinel:
+            name = self.sentinel.replace("{vcf}", os.path.basename(path))
+            return os.path.exists(os.path.join(os.path.dirname(path), name))
+        previous = self._signatures.get(path)
+        if previous is None or previous[0] != signature:
+            self._signatures[path] = (signature, now)
+            return self.settle <= 0
+        return now - previous[1] >= self.settle
+
+    def scan(self, now: float = None):
+        """(ready, waiting): complete VCFs not yet processed, and how many are still being written."""
+        now = time.time() if now is None else now
+        ready, waiting = [], 0
+        for path in self._candidates():
+            if path in self._running:
+                continue
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signature = [st.st_size, st.st_mtime_ns]
+            record = self.state.get(path)
+            if record is not None and record.get("signature") == signature:
+                continue
+            if st.st_size > 0 and self._complete(path, signature, now):
+                ready.append((path, signature))
+            else:
+                waiting += 1
+        return ready, waiting
+
+    def _sample_for(self, path: str) -> str:
+        taken = {r["sample"] for p, r in self.state.items() if p != path}
+        taken |= {self.service.job(job_id)["sample"] for job_id, _ in self._running.values()}
+        base = name = sample_name(path)
+        n = 2
+        while name in taken:
+            name, n = f"{base}-{n}", n + 1
+        return name
+
+    # ---------- jobs ----------
+    def _collect(self):
+        for path, (job_id, signature) in list(self._running.items()):
+            job = self.service.job(job_id)
+            if job["status"] not in ("done", "failed"):
+                continue
+            del self._running[path]
+            self.state[path] = {
+                "sample": job["sample"], "signature": signature, "status": job["status"],
+                "finished": job.get("finished"), "report": job.get("report_html"), "error": job.get("error"),
+            }
+            self._save_state()
+            if job["status"] == "done":
+                self.log(f"{job['sample']}: report written to {job['report_html']}")
+            else:
+                self.log(f"{job['sample']}: failed: {job['error']}")
+
+    def step(self) -> int:
+        """Record finished jobs and queue newly completed VCFs; returns files still pending."""
+        from .server import QueueFull, SampleBusy
+
+        self._collect()
+        ready, waiting = self.scan()
+        for i, (path, signature) in enumerate(ready):
+            try:
+                job = self.service.submit(path, sample=self._sample_for(path))
+            except QueueFull:
+                waiting += len(ready) - i
+                break
+            except (SampleBusy, OSError) as exc:
+                # Removed or renamed since the scan, or its sample is still busy: retried on a later scan
+                self.log(f"{path}: skipped for now: {exc}")
+                waiting += 1
+                continue
+            self._running[path] = (job["id"], signature)
+            self.log(f"{job['sample']}: queued {path}")
+        return waiting + len(self._running)
+
+    def run(self, interval: float = 5.0, once: bool = False):
+        """Poll every `interval` seconds; with `once`, return when nothing is pending or running."""
+        while True:
+            pending = self.step()
+            if once and not pending:
+                return
+            time.sleep(interval)
+
+
+def build_parser():
+    p = argparse.ArgumentParser(
+        prog="mapgwas watch",
+        description="Watch a sequencer output directory and map each fully written VCF as it appears"
+    )
+    p.add_argument("directory", help="Directory to watch (searched recursively)")
+    p.add_argument("--gwas", required=True, help="GWAS CSV file (CSV or CSV.GZ); loaded once")
+    p.add_argument("--out", required=True, help="Output root; each VCF writes to <out>/<sample>")
+    p.add_argument("--workers", type=int, default=2, help="Concurrent jobs (default=2)")
+    p.add_argument("--max-queue", type=int, default=16, help="Jobs allowed to wait for a worker (default=16)")
+    p.add_argument("--pattern", nargs="+", default=None, metavar="GLOB",
+                   help=f"VCF file name patterns (default: {' '.join(DEFAULT_PATTERNS)})")
+    p.add_argument("--settle", type=float, default=30.0,
+                   help="Seconds a VCF's size must stay unchanged before it is processed (default=30)")
+    p.add_argument("--sentinel", default=None,
+                   help="Process a VCF only once this file exists next to it; '{vcf}' stands for the VCF "
+                        "file name, e.g. '{vcf}.done' (overrides --settle)")
+    p.add_argument("--state", default=None, help=f"State file of processed VCFs (default: <out>/{STATE_NAME})")
+    p.add_argument("--interval", type=float, default=5.0, help="Seconds between directory scans (default=5)")
+    p.add_argument("--once", action="store_true", help="Exit once every VCF found has been processed")
+    add_mapping_arguments(p)
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not os.path.isdir(args.directory):
+        raise SystemExit(f"Not a directory: {args.directory}")
+    from .server import MapGWASService
+
+    service = MapGWASService(args.gwas, args.out, workers=args.workers, max_queue=args.max_queue,
+                             **mapper_options(args))
+    watcher = DirectoryWatcher(service, args.directory, patterns=args.pattern, settle=args.settle,
+                               sentinel=args.sentinel, state_file=args.state,
+                               log=None if args.quiet else print)
+    if not args.quiet:
+        print(f"mapgwas watching {args.directory} (catalog rows: {len(service.gwas_df):,}, "
+              f"workers: {args.workers})")
+    try:
+        watcher.run(interval=args.interval, once=args.once)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.shutdown()
+    return 0
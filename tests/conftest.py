@@ -0,0 +1,46 @@
+import gzip
+
+import pandas as pd
+import pytest
+
+VCF_HEADER = "##fileformat=VCFv4.2\n#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tSAMPLE\n"
+
+VCF_RECORDS = [
+    "chr1\t100\t.\tA\tG\t60\tPASS\tDP=30;AF=0.5\tGT:GQ\t0/1:50",
+    "chr1\t200\t.\tC\tCTT\t45\tPASS\tDP=12\tGT:GQ\t1/1:40",
+    "chr1\t300\t.\tGAA\tG\t5\tLowQual\tDP=2\tGT:GQ\t0/1:10",
+    "chr1\t400\t.\tT\tC\t70\tPASS\tDP=40\tGT:GQ\t0/0:60",
+    "chr2\t500\t.\tA\tT,AT\t80\tPASS\tDP=25\tGT:GQ\t1/2:70",
+    "chr2\t600\t.\tAC\tGT\t50\tPASS\tDP=22\tGT:GQ\t0|1:55",
+]
+
+CATALOG_ROWS = [
+    # CHR_ID, CHR_POS, DISEASE/TRAIT, P-VALUE, RAF, REGION, SNPS, MAPPED_GENE, group
+    ("chr1", "100", "Height", "1E-8", "0.30", "1p36", "rs100", "GENE1", "Body measurement"),
+    ("chr1", "100", "Type 2 diabetes", "2 x 10-6", "0.45", "1p36", "rs100", "GENE1", "Metabolic disease"),
+    ("chr1", "200", "Height", "5e-12", "0.10", "1p35", "rs200", "GENE2 - GENE3", "Body measurement"),
+    ("chr1", "300", "Asthma", "1E-9", "0.20", "1p34", "rs300", "GENE4", "Immune system disease"),
+    ("chr1", "400", "Asthma", "1E-7", "0.60", "1p33", "rs400", "GENE5", "Immune system disease"),
+    ("chr2", "500", "LDL cholesterol", "3E-20", "NR", "2q11", "rs500", "GENE6, GENE7", "Lipid or lipoprotein measurement"),
+    ("chr2", "600", "LDL cholesterol", "1E-10", "0.80", "2q12", "rs600", "GENE7", "Lipid or lipoprotein measurement"),
+    ("chr2", "900", "NR", "1E-10", "0.50", "2q13", "rs900", "GENE8", "Other trait"),
+]
+
+
+@pytest.fixture
+def small_inputs(tmp_path):
+    """A six-record VCF and an eight-row GWAS catalog (gzip) covering the main filter paths."""
+    vcf = tmp_path / "sample.vcf"
+    vcf.write_text(VCF_HEADER + "\n".join(VCF_RECORDS) + "\n")
+
+    catalog = pd.DataFrame(CATALOG_ROWS, columns=[
+        "CHR_ID", "CHR_POS", "DISEASE/TRAIT", "P-VALUE", "RISK ALLELE FREQUENCY",
+        "REGION", "SNPS", "MAPPED_GENE", "Groups of Disease/Trait",
+    ])
+    catalog["MAPPED_TRAIT_URI"] = "http://www.ebi.ac.uk/efo/EFO_0000001"
+    catalog["MAPPED_TRAIT_DESCRIPTION"] = "A trait."
+    catalog["STUDY"] = "study"
+    gwas = tmp_path / "gwas.csv.gz"
+    with gzip.open(gwas, "wt", newline="") as f:
+        catalog.to_csv(f, index=False)
+    return str(vcf), str(gwas)
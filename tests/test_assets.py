@@ -0,0 +1,27 @@
+import gzip
+import os
+
+from pygwas import Pipeline
+from pygwas.assets import CSS_NAME, JS_NAME, write_precompressed
+
+
+def test_precompressed_copy_matches_original(tmp_path):
+    path = str(tmp_path / "page.html")
+    sizes = write_precompressed(path, b"<html>" + b"x" * 1000 + b"</html>", ["gzip"])
+    with gzip.open(path + ".gz", "rb") as f:
+        assert f.read() == open(path, "rb").read()
+    assert sizes["gzip"] < sizes["identity"]
+
+
+def test_reports_share_one_copy_of_css_and_js(small_inputs, tmp_path):
+    vcf, gwas = small_inputs
+    assets = tmp_path / "cohort" / "_assets"
+    for sample in ["s1", "s2"]:
+        Pipeline(vcf, gwas, str(tmp_path / "cohort" / sample), outputs=["html"], quiet=True,
+                 assets_dir=str(assets), precompress=["gzip"]).run()
+
+    assert sorted(os.listdir(assets)) == sorted([CSS_NAME, CSS_NAME + ".gz", JS_NAME, JS_NAME + ".gz"])
+    html = (tmp_path / "cohort" / "s1" / "report" / "GWAS_report.html").read_text(encoding="utf-8")
+    assert f'href="../../_assets/{CSS_NAME}"' in html
+    assert "<style>" not in html
+    assert os.path.exists(tmp_path / "cohort" / "s2" / "report" / "GWAS_report.html.gz")
@@ -0,0 +1,43 @@
+import gzip
+import struct
+
+import pandas as pd
+
+from pygwas.bgzf import BLOCK_SIZE, EOF_BLOCK, open_bgzf, read_index, read_range
+from pygwas.cohort import find_sample_reports
+from pygwas.pygwas import MapGWASSNPs
+
+
+def test_bgzf_is_gzip_with_index(tmp_path):
+    path = str(tmp_path / "out.txt.gz")
+    data = b"".join(f"{i}\tchr1\t{i * 7}\n".encode() for i in range(60000))
+    with open_bgzf(path, "wb", threads=3) as f:
+        f.write(data[:10])
+        f.write(data[10:])
+
+    raw = open(path, "rb").read()
+    assert gzip.decompress(raw) == data
+    assert raw.endswith(EOF_BLOCK)
+    # Every block is a gzip member whose BC field holds its size
+    offset, blocks = 0, 0
+    while offset < len(raw):
+        assert raw[offset + 12:offset + 14] == b"BC"
+        size = struct.unpack("<H", raw[offset + 16:offset + 18])[0] + 1
+        offset, blocks = offset + size, blocks + 1
+    assert offset == len(raw)
+
+    index = read_index(path + ".gzi")
+    assert len(index) == blocks  # (0, 0) plus one entry per data block
+    assert index[1][1] == BLOCK_SIZE and index[-1][1] == len(data)
+    for start, size in [(0, 5), (BLOCK_SIZE - 3, 10), (200000, 100000), (len(data) - 4, 10)]:
+        assert read_range(path, start, size, index) == data[start:start + size]
+
+
+def test_annotated_csv_as_bgzf(small_inputs, tmp_path):
+    vcf, gwas = small_inputs
+    mapper = MapGWASSNPs(vcf, gwas, str(tmp_path / "s1"), quiet=True, csv_bgzf=True)
+    annotated = mapper.map_snps()
+    assert mapper.annotated_csv.endswith("in-house_report.csv.gz")
+    written = pd.read_csv(mapper.annotated_csv, dtype={"CHROM": str, "POS": str, "CHR_ID": str, "CHR_POS": str})
+    assert len(written) == len(annotated)
+    assert [s for s, _ in find_sample_reports([str(tmp_path)])] == ["s1"]
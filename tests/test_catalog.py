@@ -0,0 +1,29 @@
+import pandas as pd
+
+from pygwas.catalog import load_gwas_catalog
+
+
+def _write_catalog(path):
+    pd.DataFrame({
+        "PUBMEDID": ["1", "2"],
+        "CHR_ID": ["chr1", "chr2"],
+        "CHR_POS": ["100", "200"],
+        "DISEASE/TRAIT": ["Height", "Height"],
+        "P-VALUE": ["1E-8", "2 x 10-6"],
+        "RISK ALLELE FREQUENCY": ["0.3", "NR"],
+        "SNPS": ["rs1", "rs2"],
+        "STUDY": ["a", "b"],
+    }).to_csv(path, index=False, compression="gzip")
+
+
+def test_load_gwas_catalog_projects_and_types_columns(tmp_path):
+    path = str(tmp_path / "catalog.csv.gz")
+    _write_catalog(path)
+
+    df = load_gwas_catalog(path, extra_columns=["STUDY"])
+    assert "PUBMEDID" not in df.columns
+    assert list(df.columns) == ["CHR_ID", "CHR_POS", "DISEASE/TRAIT", "P-VALUE",
+                                "RISK ALLELE FREQUENCY", "SNPS", "STUDY"]
+    assert isinstance(df["DISEASE/TRAIT"].dtype, pd.CategoricalDtype)
+    assert df["CHR_POS"].tolist() == ["100", "200"]
+    assert df["P-VALUE"].tolist() == ["1E-8", "2 x 10-6"]
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("scipy")
+
+from pygwas.cohort import Cohort
+
+
+def _write_sample(root, rows):
+    path = root / "report" / "data"
+    path.mkdir(parents=True)
+    pd.DataFrame(rows, columns=["CHR_ID", "CHR_POS", "SNPS", "DISEASE/TRAIT", "ZYGOSITY"]).to_csv(
+        path / "in-house_report.csv", index=False)
+
+
+def test_cohort_carrier_counts_and_trait_summary(tmp_path):
+    _write_sample(tmp_path / "bc01", [
+        ("chr1", "100", "rs1", "Height", "het"),
+        ("chr1", "100", "rs1", "BMI", "het"),
+        ("chr2", "200", "rs2", "Height", "hom-alt"),
+    ])
+    _write_sample(tmp_path / "bc02", [
+        ("chr2", "200", "rs2", "Height", "het"),
+    ])
+    _write_sample(tmp_path / "bc03", [
+        ("chr3", "300", "rs3", "Asthma", "hom-alt"),
+    ])
+    cohort = Cohort.from_reports([str(tmp_path)], quiet=True)
+    assert cohort.samples == ["bc01", "bc02", "bc03"]
+    assert cohort.matrix.shape == (3, 3)
+
+    variants = cohort.carrier_counts().set_index("SNPS")
+    assert variants.loc["rs2", "carriers"] == 2
+    assert variants.loc["rs2", "hom_alt"] == 1
+    assert variants.loc["rs2", "allele_freq"] == pytest.approx(3 / 6)
+    assert variants.loc["rs1", "n_traits"] == 2
+
+    traits = cohort.trait_summary().set_index("DISEASE/TRAIT")
+    assert traits.loc["Height", "carriers"] == 2
+    assert traits.loc["Height", "n_variants"] == 2
+    assert traits.loc["Height", "mean_hits_per_carrier"] == pytest.approx(1.5)
+
+    enriched = cohort.enrichment(np.array([True, True, False])).set_index("DISEASE/TRAIT")
+    assert enriched.loc["Height", "carriers_in_group"] == 2
+    assert enriched.loc["Asthma", "freq_in_rest"] == 1.0
+
+
+def test_cohort_skips_non_carrier_rows(tmp_path):
+    _write_sample(tmp_path / "bc01", [
+        ("chr1", "100", "rs1", "Height", "hom-ref"),
+        ("chr2", "200", "rs2", "Height", "het"),
+    ])
+    _write_sample(tmp_path / "bc02", [
+        ("chr1", "100", "rs1", "Height", "unknown"),
+        ("chr2", "200", "rs2", "Height", "no-call"),
+    ])
+    cohort = Cohort.from_reports([str(tmp_path)], quiet=True)
+    assert cohort.matrix.nnz == 2 and cohort.matrix.sum() == 2
+
+    variants = cohort.carrier_counts().set_index("SNPS")
+    assert variants["carriers"].to_dict() == {"rs1": 1, "rs2": 1}
+    assert cohort.trait_summary().set_index("DISEASE/TRAIT").loc["Height", "carriers"] == 2
@@ -0,0 +1,15 @@
+import pandas as pd
+
+from pygwas.pygwas import MapGWASSNPs
+
+
+def _annotated(vcf, gwas, **options):
+    return MapGWASSNPs(vcf, gwas, None, quiet=True, **options).map_snps(write_csv=False)
+
+
+def test_partitioned_join_matches_single_join(small_inputs):
+    vcf, gwas = small_inputs
+    single = _annotated(vcf, gwas).reset_index(drop=True)
+    for executor in ["thread", "process"]:
+        parallel = _annotated(vcf, gwas, join_workers=2, join_executor=executor)
+        pd.testing.assert_frame_equal(parallel, single)
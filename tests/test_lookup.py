@@ -0,0 +1,50 @@
+import os
+
+from pygwas.lookup import CatalogIndex, index_path, split_terms, trait_words
+
+
+def test_split_terms():
+    assert split_terms("GENE2 - GENE3") == ["GENE2", "GENE3"]
+    assert split_terms("GENE6, GENE7") == ["GENE6", "GENE7"]
+    assert split_terms("rs1 x rs2") == ["rs1", "rs2"]
+    assert split_terms(float("nan")) == []
+    assert trait_words("Type 2 diabetes") == ["2", "diabetes", "type"]
+
+
+def test_catalog_index_lookups(small_inputs):
+    _, gwas = small_inputs
+    with CatalogIndex.open(gwas) as index:
+        assert os.path.exists(index_path(gwas))
+        assert [r["DISEASE/TRAIT"] for r in index.lookup(snp="rs100")] == ["Height", "Type 2 diabetes"]
+        # Multi-gene entries are found by each of their genes, ignoring case
+        assert [r["SNPS"] for r in index.lookup(gene="gene3")] == ["rs200"]
+        assert [r["SNPS"] for r in index.lookup(gene="GENE7")] == ["rs500", "rs600"]
+        assert [r["CHR_POS"] for r in index.lookup(trait="diabetes")] == ["100"]
+        assert index.lookup(gene="GENE1", trait="asthma") == []
+        assert index.traits(gene="GENE1") == [("Height", 1), ("Type 2 diabetes", 1)]
+        assert index.traits(trait="height") == [("Height", 2)]
+
+
+def test_catalog_index_rebuilds_when_catalog_changes(small_inputs):
+    _, gwas = small_inputs
+    CatalogIndex.open(gwas).close()
+    built = os.stat(index_path(gwas)).st_ino
+    CatalogIndex.open(gwas).close()
+    assert os.stat(index_path(gwas)).st_ino == built
+
+    stat = os.stat(gwas)
+    os.utime(gwas, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    with CatalogIndex.open(gwas) as index:
+        assert os.stat(index.path).st_ino != built
+        assert [r["SNPS"] for r in index.lookup(snp="rs900")] == ["rs900"]
+
+
+def test_catalog_index_rebuilds_for_other_extra_columns(small_inputs):
+    _, gwas = small_inputs
+    with CatalogIndex.open(gwas) as index:
+        assert "STUDY" not in index.columns
+    with CatalogIndex.open(gwas, extra_columns=["STUDY"]) as index:
+        assert index.lookup(snp="rs100")[0]["STUDY"] == "study"
+    built = os.stat(index_path(gwas)).st_ino
+    CatalogIndex.open(gwas, extra_columns=["STUDY"]).close()
+    assert os.stat(index_path(gwas)).st_ino == built
@@ -0,0 +1,48 @@
+import json
+import threading
+import time
+
+from pygwas.metrics import RunMetrics
+
+
+def test_run_metrics_json_record(tmp_path):
+    metrics = RunMetrics(sample="bc01", vcf="x.vcf")
+    with metrics.stage("vcf_read") as st:
+        st.rows(rows_out=10)
+    with metrics.stage("qual_filter", rows_in=10) as st:
+        st.rows(rows_out=4)
+
+    out = tmp_path / "metrics.jsonl"
+    metrics.write_json(str(out))
+    metrics.write_json(str(out))
+
+    lines = out.read_text().splitlines()
+    assert len(lines) == 2
+    record = json.loads(lines[0])
+    assert record["sample"] == "bc01"
+    assert [s["stage"] for s in record["stages"]] == ["vcf_read", "qual_filter"]
+    assert record["stages"][1]["rows_in"] == 10
+    assert record["stages"][1]["rows_out"] == 4
+    assert record["stages"][0]["wall_s"] >= 0
+
+
+def test_stage_off_the_main_thread_records_its_own_cpu_time():
+    metrics = RunMetrics()
+
+    def idle():
+        with metrics.stage("catalog_read"):
+            time.sleep(0.2)
+
+    worker = threading.Thread(target=idle)
+    worker.start()
+    with metrics.stage("vcf_read") as st:
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+    worker.join()
+
+    stages = {s.name: s.to_dict() for s in metrics.stages}
+    assert stages["vcf_read"]["cpu_clock"] == "process"
+    assert stages["catalog_read"]["cpu_clock"] == "thread"
+    # The main thread's busy loop overlaps the catalog stage but is not charged to it
+    assert stages["catalog_read"]["cpu_s"] < 0.05
@@ -0,0 +1,27 @@
+import os
+
+from pygwas import Pipeline
+
+
+def test_in_memory_pipeline_writes_nothing(small_inputs, tmp_path):
+    vcf, gwas = small_inputs
+    before = set(os.listdir(tmp_path))
+    pipe = Pipeline(vcf, gwas, outputs=["report_data"], write=False, quiet=True)
+    assert pipe.plan() == ["map", "prepare"]
+
+    result = pipe.run()
+    assert result.annotated is None and result.html is None
+    assert set(result.report_data["DISEASE/TRAIT"]) == {"Height", "Type 2 diabetes"}
+    assert set(os.listdir(tmp_path)) == before
+    assert "render_sunburst" not in [s["stage"] for s in result.metrics["stages"]]
+
+
+def test_pipeline_writes_only_requested_outputs(small_inputs, tmp_path):
+    vcf, gwas = small_inputs
+    out = tmp_path / "out"
+    result = Pipeline(vcf, gwas, str(out), outputs=["annotated"], quiet=True).run()
+
+    assert os.path.exists(result.paths["annotated"])
+    assert not os.path.exists(out / "report" / "data" / "report_data.csv")
+    assert not os.path.exists(out / "report" / "GWAS_report.html")
+    assert len(result.annotated) > 0
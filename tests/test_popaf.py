@@ -0,0 +1,74 @@
+import numpy as np
+
+from pygwas.cli import main
+from pygwas.popaf import AlleleFrequencyIndex, build_af_index
+from pygwas.pygwas import MapGWASSNPs
+
+SITES_VCF = """##fileformat=VCFv4.2
+#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO
+1\t100\trs100\tA\tG\t.\tPASS\tAC=10;AF=0.25;AF_eas=0.4
+1\t200\trs200\tC\tCTT\t.\tPASS\tAF=0.05
+2\t500\trs500\tA\tT,AT\t.\tPASS\tAF=0.1,0.02;AF_eas=0.3,0.01
+2\t600\trs600\tAC\tGT\t.\tPASS\tAF=0.5;AF_eas=0.6
+"""
+
+
+def _sites(tmp_path):
+    path = tmp_path / "sites.vcf"
+    path.write_text(SITES_VCF)
+    return str(path)
+
+
+def test_af_index_from_sites_vcf(tmp_path):
+    index = AlleleFrequencyIndex(build_af_index(_sites(tmp_path), populations=["AF", "AF_eas"]))
+    assert isinstance(index.af, np.memmap)
+    assert len(index) == 5  # the multi-allelic site gives one entry per ALT allele
+    assert index.columns == ["POP_AF", "POP_AF_eas"]
+
+    found = index.lookup(["chr2", "chr2", "chr1", "chr1", "chrX"], ["500", 500, "100", "100", "1"],
+                         ["A", "A", "a", "A", "A"], ["AT", "T", "g", "C", "G"])
+    assert np.allclose(found["POP_AF"], [0.02, 0.1, 0.25, np.nan, np.nan], equal_nan=True)
+    assert np.allclose(found["POP_AF_eas"], [0.01, 0.3, 0.4, np.nan, np.nan], equal_nan=True)
+
+
+def test_af_index_from_table_reused_until_changed(tmp_path):
+    table = tmp_path / "thai.csv"
+    table.write_text("CHROM,POS,REF,ALT,THAI,OTHER\nchr1,100,A,G,0.3,0.1\nchr1,100,A,G,0.9,0.9\n")
+    index = AlleleFrequencyIndex.open(str(table), populations=["THAI"])
+    assert index.populations == ["THAI"]
+    assert index.lookup(["1"], [100], ["A"], ["G"])["POP_THAI"].tolist() == [np.float32(0.3)]
+    mtime = (tmp_path / "thai.csv.afidx" / "meta.json").stat().st_mtime_ns
+    assert AlleleFrequencyIndex.open(str(table)).populations == ["THAI"]
+    assert (tmp_path / "thai.csv.afidx" / "meta.json").stat().st_mtime_ns == mtime
+
+
+def test_mapping_adds_population_frequencies(small_inputs, tmp_path, capsys):
+    vcf, gwas = small_inputs
+    out = tmp_path / "sites.afidx"
+    assert main(["af-index", _sites(tmp_path), "--out", str(out), "--populations", "AF", "AF_eas"]) == 0
+    assert "Indexed 5 alleles" in capsys.readouterr().out
+
+    mapper = MapGWASSNPs(vcf, gwas, None, quiet=True, pop_af=str(out))
+    annotated = mapper.map_snps(write_csv=False)
+    freqs = annotated.assign(POS=annotated["POS"].astype(str)).drop_duplicates(["POS", "ALT"]).set_index("POS")
+    assert freqs.loc["100", "POP_AF_eas"] == np.float32(0.4)
+    assert freqs.loc["200", "POP_AF"] == np.float32(0.05)
+    assert np.isnan(freqs.loc["200", "POP_AF_eas"])
+
+    mapper.prepare_report_data(write_csv=False)
+    row = mapper.report_data.loc[mapper.report_data["SNPS"] == "rs100"].iloc[0]
+    assert mapper._pop_af_label(row) == "AF 25.0% · AF_eas 40.0%"
+
+
+def test_af_index_reads_each_records_own_value_count(tmp_path):
+    path = tmp_path / "mixed.vcf"
+    path.write_text("##fileformat=VCFv4.2\n#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n"
+                    "1\t100\t.\tA\tG,T\t.\tPASS\tAF=0.3\n"
+                    "1\t200\t.\tC\tA,G\t.\tPASS\tAF=0.1,0.2\n"
+                    "1\t300\t.\tG\tA,C,T\t.\tPASS\tAF=0.4,0.5\n"
+                    "1\t400\t.\tT\tC\t.\tPASS\tDP=3\n")
+    index = AlleleFrequencyIndex(build_af_index(str(path)))
+    found = index.lookup(["1"] * 7, [100, 100, 200, 200, 300, 300, 400],
+                         ["A", "A", "C", "C", "G", "G", "T"], ["G", "T", "A", "G", "A", "T", "C"])
+    # Only a record with one value per ALT allele gets frequencies
+    assert np.allclose(found["POP_AF"], [np.nan, np.nan, 0.1, 0.2, np.nan, np.nan, np.nan], equal_nan=True)
@@ -0,0 +1,97 @@
+import threading
+from concurrent.futures import Future
+
+import pandas as pd
+import pytest
+
+from pygwas.pygwas import MapGWASSNPs
+from pygwas.vcf import CatalogPositions, prefilter_vcf
+
+
+def test_prefilter_keeps_catalog_records_and_streams_the_rest(small_inputs):
+    vcf, _ = small_inputs
+    positions = CatalogPositions({"chr1": ["100", "300"], "chr2": ["600"]})
+    assert positions.mask(["chr1", "chr1", "chr2", "chr3"], [100, 200, 600, 100]).tolist() == [True, False, True, False]
+    # POS may arrive as strings; a catalog position not spelled as a plain integer never matches
+    assert positions.mask(pd.Categorical(["chr1", "chr2"]), ["300", "600"]).tolist() == [True, True]
+    assert not CatalogPositions({"chr1": ["0100", "1;2"]}).mask(["chr1"], [100]).any()
+
+    chunks = []
+    kept = prefilter_vcf(vcf, positions, on_chunk=chunks.append, chunk_lines=4)
+    assert kept["POS"].tolist() == [100, 300, 600]
+    assert kept["INFO"].notna().all()
+    assert [len(c) for c in chunks] == [4, 2]
+    assert "INFO" not in chunks[0].columns
+
+
+def test_prefilter_holds_chunks_until_positions_resolve(small_inputs):
+    vcf, _ = small_inputs
+    positions = Future()
+    seen = []
+
+    def on_chunk(chunk):
+        seen.append(len(chunk))
+        if len(seen) == 2:  # the catalog finishes loading while the reader is on its second chunk
+            positions.set_result(CatalogPositions({"chr1": ["100", "300"], "chr2": ["600"]}))
+
+    kept = prefilter_vcf(vcf, positions, on_chunk=on_chunk, chunk_lines=2)
+    assert kept["POS"].tolist() == [100, 300, 600]
+    assert seen == [2, 2, 2]
+
+
+def test_prefilter_waits_for_positions_when_the_buffer_is_full(small_inputs):
+    vcf, _ = small_inputs
+    positions = Future()
+    timer = threading.Timer(0.05, positions.set_result, [CatalogPositions({"chr2": ["500"]})])
+    timer.start()
+    kept = prefilter_vcf(vcf, positions, on_chunk=lambda chunk: None, chunk_lines=1, max_pending=1)
+    assert kept["POS"].tolist() == [500]
+
+    failed = Future()
+    failed.set_exception(KeyError("CHR_POS"))
+    with pytest.raises(KeyError):
+        prefilter_vcf(vcf, failed, on_chunk=lambda chunk: None)
+
+
+def test_prefiltered_mapping_matches_full_parse(small_inputs):
+    vcf, gwas = small_inputs
+    runs = [MapGWASSNPs(vcf, gwas, None, quiet=True, prefilter=p, info_fields=["DP"]) for p in (True, False)]
+    annotated = [m.map_snps(write_csv=False).reset_index(drop=True) for m in runs]
+    pd.testing.assert_frame_equal(annotated[0], annotated[1])
+    assert runs[0].qc.to_dict() == runs[1].qc.to_dict()
+
+
+def test_catalog_loads_alongside_the_vcf(small_inputs):
+    vcf, gwas = small_inputs
+    mapper = MapGWASSNPs(vcf, gwas, None, quiet=True)
+    mapper.map_snps(write_csv=False)
+    stages = [s.name for s in mapper.metrics.stages]
+    # The catalog is only waited for once the VCF has been read
+    assert "catalog_read" in stages
+    assert stages.index("vcf_read") < stages.index("catalog_wait")
+
+
+def test_prefilter_uses_shared_catalog_positions(small_inputs):
+    vcf, gwas = small_inputs
+    shared = CatalogPositions({"chr1": ["100"]})
+    mapper = MapGWASSNPs(vcf, gwas, None, quiet=True, catalog_positions=shared)
+    annotated = mapper.map_snps(write_csv=False)
+    assert annotated["POS"].astype(str).unique().tolist() == ["100"]
+    # QC still covers every record, and the shared set is left as it was
+    full = MapGWASSNPs(vcf, gwas, None, quiet=True)
+    full.map_snps(write_csv=False)
+    assert mapper.qc.to_dict() == full.qc.to_dict()
+    assert shared.positions == {"chr1": {"100"}}
+
+
+def test_prefilter_reads_sites_only_vcf(small_inputs, tmp_path):
+    vcf, gwas = small_inputs
+    sites = tmp_path / "sites.vcf"
+    lines = open(vcf).read().splitlines()
+    sites.write_text("\n".join(line.rsplit("\t", 2)[0] if not line.startswith("##") else line for line in lines) + "\n")
+
+    runs = [MapGWASSNPs(str(sites), gwas, None, quiet=True, prefilter=p) for p in (True, False)]
+    annotated = [m.map_snps(write_csv=False).reset_index(drop=True) for m in runs]
+    assert len(annotated[0]) > 0
+    pd.testing.assert_frame_equal(annotated[0], annotated[1])
+    assert runs[0].qc.to_dict() == runs[1].qc.to_dict()
@@ -0,0 +1,54 @@
+import numpy as np
+
+from pygwas.positions import assign_codes, encode_positions, key_positions
+from pygwas.proxies import ProxyIndex
+from pygwas.pygwas import MapGWASSNPs
+
+# plink --r2 layout; chromosome names without the 'chr' prefix the VCF uses
+LD_TABLE = """CHR_A BP_A SNP_A CHR_B BP_B SNP_B R2
+1 300 rs300 1 100 rs100 0.90
+1 200 rs200 1 300 rs300 0.95
+1 400 rs400 1 100 rs100 0.50
+1 400 rs400 2 600 rs600 0.99
+"""
+
+
+def _ld_table(tmp_path):
+    path = tmp_path / "proxies.ld"
+    path.write_text(LD_TABLE)
+    return str(path)
+
+
+def test_position_keys_round_trip():
+    codes = assign_codes(["chr1", "1", "chrX", "M"])
+    assert codes == {"1": 0, "X": 1, "MT": 2}
+    keys = encode_positions(codes, ["chr1", "X", "chrM", "chr7", "chr1"], ["100", 5, "16569", "1", "."])
+    assert (keys[3], keys[4]) == (-1, -1)
+    assert key_positions(keys[:3]).tolist() == [100, 5, 16569]
+
+
+def test_proxy_index_lookup(tmp_path):
+    index = ProxyIndex.open(_ld_table(tmp_path))
+    assert isinstance(index.leads, np.memmap)
+    assert len(index) == 6  # both directions of the three same-chromosome pairs
+    found = index.lookup(["chr1", "chr1", "chr9"], ["300", "400", "300"], min_r2=0.8)
+    assert found["QUERY"].tolist() == [0, 0]
+    assert found["PROXY_POS"].tolist() == [200, 100]  # strongest proxy first
+    assert found["PROXY_R2"].round(2).tolist() == [0.95, 0.9]
+
+
+def test_uncalled_catalog_snp_matched_through_proxy(small_inputs, tmp_path):
+    vcf, gwas = small_inputs
+    mapper = MapGWASSNPs(vcf, gwas, None, quiet=True, ld_proxies=_ld_table(tmp_path))
+    annotated = mapper.map_snps(write_csv=False)
+
+    direct = MapGWASSNPs(vcf, gwas, None, quiet=True).map_snps(write_csv=False)
+    assert (annotated["MATCH"] == "direct").sum() == len(direct)
+    # chr1:300 failed QUAL; its best called proxy is chr1:200. chr1:400's only proxy is below r2 0.8
+    proxy = annotated.loc[annotated["MATCH"] == "proxy"]
+    assert proxy[["SNPS", "CHR_POS", "POS", "PROXY_POS"]].values.tolist() == [["rs300", "300", "200", "200"]]
+    assert proxy["PROXY_R2"].round(2).tolist() == [0.95]
+
+    report = mapper._select_report_rows(top_k=1)
+    row = report.loc[report["SNPS"] == "rs300"].iloc[0]
+    assert mapper._match_label(row) == "LD proxy chr1:200 (r² = 0.95)"
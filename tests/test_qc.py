@@ -0,0 +1,66 @@
+import json
+
+import pandas as pd
+
+from pygwas.pygwas import MapGWASSNPs
+from pygwas.qc import VariantQC, genotype_states
+
+
+def test_variant_qc_accumulates_chunks():
+    rows = pd.DataFrame({
+        "CHROM": ["chr2", "chr1", "chr1", "chr10", "chr1"],
+        "REF": ["A", "C", "A", "G", "A"],
+        "ALT": ["G", "T", "T", "GTT", "C"],
+        "QUAL": [5.0, 35.0, 250.0, None, 12.0],
+        "FILTER": ["PASS", "PASS", "LowQual", "PASS", "PASS"],
+        "ZYGOSITY": ["het", "hom-alt", "het", "het", "hom-ref"],
+        "TYPE": ["SNPs", "SNPs", "SNPs", "INS", "SNPs"],
+        "FMT_DP": [None, 12, 150, 3, None],
+        "INFO": ["DP=7;AF=0.5", "DP=99", "DP=1", "AF=1", "."],
+    })
+    qc = VariantQC()
+    qc.update(rows.iloc[:2])
+    qc.update(rows.iloc[2:])
+    qc.update(rows.iloc[:0])
+
+    summary = qc.to_dict()
+    assert summary["variants"] == 5
+    assert summary["types"] == {"SNPs": 4, "INS": 1, "DEL": 0, "COMPLEX": 0}
+    assert (qc.transitions, qc.transversions) == (2, 2)
+    assert qc.ti_tv == 1.0
+    assert qc.het_hom == 3.0
+    assert qc.pass_fraction == 0.8
+    assert list(summary["chromosomes"].items()) == [("chr1", 3), ("chr2", 1), ("chr10", 1)]
+    # QUAL bins of 10 with an open last bin; FORMAT DP first, INFO DP where FORMAT is missing
+    assert summary["qual_hist"]["counts"][0] == 1 and summary["qual_hist"]["counts"][-1] == 1
+    assert sum(summary["qual_hist"]["counts"]) == 4
+    assert summary["depth_hist"]["counts"][0] == 1 and summary["depth_hist"]["counts"][1] == 1
+    assert summary["depth_hist"]["counts"][2] == 1 and summary["depth_hist"]["counts"][-1] == 1
+    assert len(json.loads(qc.figure_json())["data"]) == 3
+
+
+def test_mapping_fills_qc_from_every_record(small_inputs):
+    vcf, gwas = small_inputs
+    mapper = MapGWASSNPs(vcf, gwas, None, quiet=True)
+    mapper.map_snps(write_csv=False)
+    # QUAL >= 20 keeps 5 records; the multi-allelic one splits into two alleles, the 0/0 record is dropped
+    assert mapper.qc.variants == 5
+    assert mapper.qc.types == {"SNPs": 2, "INS": 2, "DEL": 0, "COMPLEX": 1}
+    assert mapper.qc.chromosomes == {"chr1": 2, "chr2": 3}
+    assert mapper.qc.depth_hist.sum() == 5
+    # The 1/2 record is one het call, not one per ALT allele
+    assert (mapper.qc.het, mapper.qc.hom_alt) == (3, 1)
+
+
+def test_genotype_state_is_counted_once_per_record():
+    assert genotype_states(["0/1", "1/2", "2|2", "0/0", "./.", None, "1/.", "1"]).tolist() == \
+        ["het", "het", "hom-alt", "", "", "", "het", "hom-alt"]
+
+    # A 1/2 record split into its two ALT alleles
+    rows = pd.DataFrame({
+        "CHROM": ["chr1", "chr1"], "REF": ["A", "A"], "ALT": ["T", "C"], "QUAL": [50.0, 50.0],
+        "FILTER": ["PASS", "PASS"], "ZYGOSITY": ["het", "het"], "TYPE": ["SNPs", "SNPs"],
+    })
+    qc = VariantQC()
+    qc.update(rows, genotypes=["1/2"])
+    assert (qc.variants, qc.het, qc.hom_alt) == (2, 1, 0)
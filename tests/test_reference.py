@@ -0,0 +1,27 @@
+import pandas as pd
+
+from pygwas.reference import FastaReference
+
+# CA repeat at bases 5-12 (1-based), wrapped at 10 bases per line
+SEQUENCE = "TTGGCACACACATTTTAAAACCCGGGT"
+
+
+def test_fasta_index_and_left_alignment(tmp_path):
+    fasta = tmp_path / "ref.fa"
+    fasta.write_text(">chr1 test\n" + "\n".join(SEQUENCE[i:i + 10] for i in range(0, len(SEQUENCE), 10)) + "\n")
+    ref = FastaReference(str(fasta))
+    assert (tmp_path / "ref.fa.fai").exists()
+    assert ref.fetch("1", 5, 15) == SEQUENCE[5:15]
+
+    pos, refs, alts, changed, mismatched = ref.normalize(
+        pd.Series(["chr1", "chr1", "chr1", "chr9"]),
+        pd.Series(["10", "1", "13", "5"]),
+        pd.Series(["ACA", "TT", "T", "AC"]),
+        pd.Series(["A", "TC", "G", "A"]),
+    )
+    # Deleting the last CA of the repeat shifts to the base before the repeat; MNPs lose shared bases
+    assert (int(pos[0]), refs[0], alts[0]) == (4, "GCA", "G")
+    assert (int(pos[1]), refs[1], alts[1]) == (2, "T", "C")
+    assert changed.tolist() == [True, True, False, False]
+    assert mismatched.tolist() == [False, False, False, True]
+    ref.close()
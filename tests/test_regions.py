@@ -0,0 +1,16 @@
+from pygwas.regions import RegionIndex
+
+
+def test_region_index_merges_and_matches_bed_coordinates(tmp_path):
+    bed = tmp_path / "targets.bed"
+    bed.write_text("track name=panel\nchr1\t10\t20\nchr1\t0\t12\nchr1\t100\t200\n2\t50\t60\n")
+    index = RegionIndex.from_bed(str(bed))
+
+    starts, ends = index.intervals["chr1"]
+    assert starts.tolist() == [0, 100]
+    assert ends.tolist() == [20, 200]
+
+    # VCF positions are 1-based: POS 100 is BED base 99, outside [100, 200)
+    mask = index.contains(["chr1", "chr1", "chr1", "chr1", "chr2", "chr3"],
+                          [1, 20, 100, 101, 51, 5])
+    assert mask.tolist() == [True, True, False, True, True, False]
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from pygwas.pygwas import MapGWASSNPs
+
+
+def _mapper(tmp_path, annotated):
+    mapper = MapGWASSNPs("x.vcf", "x.csv", str(tmp_path / "out"), quiet=True)
+    mapper.annotated_df = annotated
+    return mapper
+
+
+def test_select_report_rows_top_k(tmp_path):
+    annotated = pd.DataFrame({
+        "DISEASE/TRAIT": ["A", "A", "B", "A", "B", "C"],
+        "SNPS": ["rs1", "rs2", "rs3", "rs4", "rs5", "rs6"],
+        "P-VALUE": [1e-5, 1e-8, 1e-3, 1e-8, np.nan, 1e-2],
+        "RISK ALLELE FREQUENCY": [0.9, 0.2, 0.5, 0.4, 0.8, np.nan],
+    })
+    mapper = _mapper(tmp_path, annotated)
+
+    rep = mapper._select_report_rows(top_k=1)
+    assert dict(zip(rep["DISEASE/TRAIT"], rep["SNPS"])) == {"A": "rs4", "B": "rs3"}
+    assert rep["RAF (%)"].tolist() == [50.0, 40.0]
+
+    rep = mapper._select_report_rows(top_k=2)
+    assert sorted(rep.loc[rep["DISEASE/TRAIT"] == "A", "SNPS"]) == ["rs2", "rs4"]
+    assert sorted(rep.loc[rep["DISEASE/TRAIT"] == "B", "SNPS"]) == ["rs3", "rs5"]
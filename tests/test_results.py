@@ -0,0 +1,53 @@
+import pandas as pd
+
+from pygwas.pygwas import MapGWASSNPs
+from pygwas.results import ResultsDB
+
+
+def _annotated(vcf, gwas):
+    return MapGWASSNPs(vcf, gwas, None, quiet=True, cut_off_qual=0).map_snps(write_csv=False)
+
+
+def test_load_and_query_across_samples(small_inputs, tmp_path):
+    vcf, gwas = small_inputs
+    annotated = _annotated(vcf, gwas)
+    with ResultsDB(str(tmp_path / "results.db")) as db:
+        assert db.load("s1", annotated, source=vcf) == len(annotated)
+        db.load("s2", annotated.iloc[:2])
+
+        assert set(db.query(snp="rs100")["sample"]) == {"s1", "s2"}
+        # Multi-gene catalog entries match each listed gene, ignoring case
+        assert set(db.query(gene="gene3")["snps"]) == {"rs200"}
+        assert set(db.query(gene="GENE7", sample="s1")["snps"]) == {"rs500", "rs600"}
+        assert set(db.query(trait="type 2 diabetes")["pos"]) == {100}
+        assert db.query(snp="rs999").empty
+
+        # Re-loading a sample replaces its rows and terms instead of adding to them
+        db.load("s1", annotated.iloc[:1])
+        assert len(db.query(sample="s1")) == 1
+        assert db.query(gene="GENE7", sample="s1").empty
+        assert db.samples().set_index("sample")["n_hits"].to_dict() == {"s1": 1, "s2": 2}
+        assert db.conn.execute("SELECT COUNT(*) FROM hit_terms").fetchone()[0] == 2 * 2 + 2
+
+
+def test_pipeline_loads_results_db(small_inputs, tmp_path):
+    vcf, gwas = small_inputs
+    db_path = str(tmp_path / "results.db")
+    mapper = MapGWASSNPs(vcf, gwas, str(tmp_path / "out"), quiet=True, cut_off_qual=0, results_db=db_path)
+    annotated = mapper.map_snps()
+    with ResultsDB(db_path) as db:
+        assert len(db.query(sample=mapper.sample)) == len(annotated)
+
+
+def test_load_hits_with_missing_gene_and_rsid(small_inputs, tmp_path):
+    vcf, gwas = small_inputs
+    annotated = _annotated(vcf, gwas)
+    # Arrow-backed catalog strings hold pd.NA for blank cells
+    for col in ("MAPPED_GENE", "SNPS"):
+        annotated[col] = annotated[col].astype("string[pyarrow]")
+        annotated.loc[annotated.index[0], col] = pd.NA
+    with ResultsDB(str(tmp_path / "results.db")) as db:
+        assert db.load("s1", annotated) == len(annotated)
+        stored = db.query(sample="s1")
+        assert stored["snps"].isna().sum() == 1
+        assert stored["mapped_gene"].isna().sum() == 1
@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from pygwas.reference import FastaReference
+from pygwas.server import MapGWASService, QueueFull, SampleBusy, make_server
+
+
+@pytest.fixture
+def service(small_inputs, tmp_path):
+    _, gwas = small_inputs
+    service = MapGWASService(gwas, str(tmp_path / "served"), workers=1, max_queue=1)
+    httpd = make_server(service, "127.0.0.1", 0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield service, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+    service.shutdown()
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=30) as resp:
+        return resp.status, resp.read()
+
+
+def _wait(base, job_id):
+    for _ in range(300):
+        job = json.loads(_get(f"{base}/jobs/{job_id}")[1])
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.1)
+    raise AssertionError("job did not finish")
+
+
+def test_health_and_upload_job(service, small_inputs):
+    svc, base = service
+    status, body = _get(f"{base}/health")
+    assert status == 200
+    assert json.loads(body)["catalog_rows"] == 8
+
+    with open(small_inputs[0], "rb") as f:
+        req = urllib.request.Request(f"{base}/jobs?sample=bc01&qual_cutoff=30", data=f.read(), method="POST")
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        assert resp.status == 202
+        job = json.loads(resp.read())
+
+    job = _wait(base, job["id"])
+    assert job["status"] == "done", job.get("error")
+    assert job["sample"] == "bc01"
+    status, html = _get(f"{base}/jobs/{job['id']}/report")
+    assert status == 200 and b"GWAS Report" in html
+    status, csv = _get(f"{base}/jobs/{job['id']}/annotated")
+    assert b"rs100" in csv
+
+    metrics = json.loads(_get(f"{base}/metrics")[1])
+    assert metrics["completed"] == 1
+
+
+def test_bounded_queue_rejects(service, small_inputs):
+    svc, _ = service
+    svc._slots.acquire()
+    svc._slots.acquire()
+    try:
+        with pytest.raises(QueueFull):
+            svc.submit(small_inputs[0])
+    finally:
+        svc._slots.release()
+        svc._slots.release()
+    assert svc.counters["rejected"] == 1
+
+
+def test_duplicate_running_sample_rejected(service, small_inputs):
+    svc, _ = service
+    svc.jobs["busy"] = {"id": "busy", "sample": "bc01", "status": "running"}
+    with pytest.raises(SampleBusy):
+        svc.submit(small_inputs[0], sample="bc01")
+    assert svc.counters["rejected"] == 1
+    svc.jobs["busy"]["status"] = "done"
+    assert svc.submit(small_inputs[0], sample="bc01")["output"].endswith("bc01")
+
+
+def test_reference_opened_once_for_all_jobs(small_inputs, tmp_path):
+    _, gwas = small_inputs
+    fasta = tmp_path / "ref.fa"
+    fasta.write_text(">chr1\n" + "ACGT" * 200 + "\n>chr2\n" + "TTGCA" * 200 + "\n")
+    svc = MapGWASService(gwas, str(tmp_path / "served"), workers=1, reference=str(fasta))
+    try:
+        assert isinstance(svc.options["reference"], FastaReference)
+        assert len(svc.catalog_positions) == 7
+    finally:
+        svc.shutdown()
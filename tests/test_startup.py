@@ -0,0 +1,55 @@
+"""Startup guard: the CLI must answer --help and argument errors without importing heavy libraries."""
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from pygwas.cli import COMMANDS
+
+HEAVY = ("pandas", "numpy", "plotly", "jinja2", "pyarrow", "scipy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import sys
+from pygwas.cli import main
+try:
+    main({argv!r})
+except SystemExit:
+    pass
+import pygwas
+print("HEAVY=" + ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+# The top-level help, an argument error, and the help of every subcommand
+ARGVS = [["--help"], ["--vcf", "x.vcf"]] + [[command, "--help"] for command in COMMANDS]
+
+
+def _run(code):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, cwd=ROOT)
+
+
+@pytest.mark.parametrize("argv", ARGVS, ids=" ".join)
+def test_cli_help_does_not_import_heavy_modules(argv):
+    proc = _run(PROBE.format(argv=argv, heavy=HEAVY))
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip().splitlines()[-1] == "HEAVY="
+
+
+def _best_of(code, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        _run(code)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def test_cli_help_startup_budget():
+    baseline = _best_of("pass")
+    cli = _best_of("from pygwas.cli import main\ntry:\n    main(['--help'])\nexcept SystemExit:\n    pass")
+    # Parsing arguments should cost a small fraction of importing pandas (~0.3-1 s)
+    assert cli - baseline < 0.25, f"mapgwas --help took {cli - baseline:.3f}s over bare interpreter startup"
@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from pygwas.sunburst import OTHER_ID, build_sunburst_hierarchy, sunburst_figure_json
+
+
+def test_hierarchy_counts_caps_children_and_stops_at_missing_levels():
+    df = pd.DataFrame({
+        "group": ["A", "A", "A", "A", "B"],
+        "gene": ["g1", "g1", "g2", "g3", np.nan],
+        "raf": [10.0, 30.0, 50.0, 70.0, 90.0],
+    })
+    nodes = build_sunburst_hierarchy(df, ["group", "gene"], color_col="raf", max_children=2)
+    by_id = nodes.set_index("id")
+
+    assert by_id.loc["A", "value"] == 4 and by_id.loc["A", "color"] == 40.0
+    assert by_id.loc["B", "value"] == 1 and by_id.loc["B", "parent"] == ""
+    assert by_id.loc["A/g1", "value"] == 2 and by_id.loc["A/g1", "color"] == 20.0
+    # g2 and g3 tie on count; the first by label stays, the other is merged into "Other"
+    assert "A/g2" in by_id.index and "A/g3" not in by_id.index
+    assert by_id.loc["A/" + OTHER_ID, "label"] == "Other (1)"
+    assert by_id.loc["A/" + OTHER_ID, "value"] == 1
+    assert not nodes["parent"].eq("B").any()
+
+    shallow = build_sunburst_hierarchy(df, ["group", "gene"], color_col="raf", max_depth=1)
+    assert shallow["id"].tolist() == ["A", "B"]
+
+
+def test_node_ids_do_not_collide_when_labels_contain_the_separator():
+    df = pd.DataFrame({"group": ["A/B", "A"], "gene": ["C", "B/C"]})
+    nodes = build_sunburst_hierarchy(df, ["group", "gene"])
+    assert nodes["id"].is_unique
+    assert nodes.loc[nodes["label"] == "C", "parent"].item() == nodes.loc[nodes["label"] == "A/B", "id"].item()
+    assert nodes.loc[nodes["label"] == "B/C", "parent"].item() == "A"
+
+    # A label spelled like the "Other" node keeps an id of its own
+    df = pd.DataFrame({"group": ["A", "A", "A"], "gene": [OTHER_ID, OTHER_ID, "z"]})
+    nodes = build_sunburst_hierarchy(df, ["group", "gene"], max_children=1)
+    assert nodes["id"].is_unique
+    assert nodes.loc[nodes["id"] == "A/" + OTHER_ID, "label"].item() == "Other (1)"
+
+
+def test_figure_json_is_a_single_total_branch_trace():
+    df = pd.DataFrame({"group": ["A", "B"], "raf": [np.nan, 5.0]})
+    fig = json.loads(sunburst_figure_json(build_sunburst_hierarchy(df, ["group"], color_col="raf"), height=800))
+    trace, = fig["data"]
+    assert trace["branchvalues"] == "total"
+    assert trace["values"] == [1, 1]
+    assert trace["marker"]["colors"] == [None, 5.0]
+    assert fig["layout"] == {"height": 800}
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from pygwas.pygwas import MapGWASSNPs
+from pygwas.traits import summary_label, trait_summary
+
+
+def test_trait_summary_aggregates_every_hit():
+    annotated = pd.DataFrame({
+        "DISEASE/TRAIT": ["A", "A", "A", "B", "B"],
+        "CHR_ID": ["chr1", "chr1", "chr2", "chr1", "chr1"],
+        "CHR_POS": ["100", "100", "100", "100", "200"],
+        "P-VALUE": [1e-8, 1e-2, 1e-4, np.nan, 1e-6],
+        "RISK ALLELE FREQUENCY": [0.2, 0.8, np.nan, 0.5, np.nan],
+        "ZYGOSITY": ["het", "het", "hom-alt", "hom-alt", "het"],
+        "ALT": ["G", "G", "T", "A", "C"],
+        "STRONGEST SNP-RISK ALLELE": ["rs1-G", "rs1-?", "rs2-C", "rs1-A", "rs3-C"],
+    })
+    summary = trait_summary(annotated).set_index("DISEASE/TRAIT")
+
+    assert summary.loc["A", ["HITS", "LOCI"]].tolist() == [3, 2]
+    assert summary.loc["B", ["HITS", "LOCI"]].tolist() == [2, 2]
+    assert summary.loc["A", "MIN_P"] == 1e-8
+    assert np.isclose(summary.loc["A", "MEAN_RAF"], 0.5)
+    # -log10(p) weights 8 and 2
+    assert np.isclose(summary.loc["A", "WEIGHTED_RAF"], (8 * 0.2 + 2 * 0.8) / 10)
+    assert np.isnan(summary.loc["B", "WEIGHTED_RAF"])  # its only RAF has no p-value
+    # rs2's risk allele C is not the called ALT T; '?' counts as carried
+    assert summary.loc["A", "RISK_ALLELES"] == 2
+    assert summary.loc["B", "RISK_ALLELES"] == 3
+
+    label = summary_label(summary.reset_index().iloc[0])
+    assert label.startswith("3 hits at 2 loci · min p = 1.0e-08 · mean RAF 50.0% (weighted 32.0%)")
+    assert trait_summary(annotated.iloc[:0]).empty
+
+
+def test_report_includes_trait_summary(small_inputs, tmp_path):
+    vcf, gwas = small_inputs
+    mapper = MapGWASSNPs(vcf, gwas, str(tmp_path / "out"), quiet=True)
+    mapper.map_snps(write_csv=False)
+    mapper.prepare_report_data()
+
+    written = pd.read_csv(tmp_path / "out" / "report" / "data" / "trait_summary.csv")
+    assert set(written["DISEASE/TRAIT"]) == set(mapper.annotated_df["DISEASE/TRAIT"])
+    height = written.set_index("DISEASE/TRAIT").loc["Height"]
+    # chr1:100 (het, p 1e-8) and chr1:200 (hom-alt, p 5e-12)
+    assert (height["HITS"], height["LOCI"], height["MIN_P"], height["RISK_ALLELES"]) == (2, 2, 5e-12, 3)
+    assert "All hits:</b> 2 hits at 2 loci" in mapper.generate_html_report(write_html=False)
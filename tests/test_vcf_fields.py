@@ -0,0 +1,40 @@
+import pandas as pd
+
+from pygwas.pygwas import MapGWASSNPs
+
+
+def test_extract_info_fields_one_pass():
+    info = pd.Series(["DP=10;AF=0.5;SR=1,2", "AF=.;DP=3", "END=5", "XDP=7;DP=4"], index=[3, 5, 7, 9])
+    out = MapGWASSNPs._extract_info_fields(info, ["DP", "AF", "SR"])
+    assert list(out.columns) == ["INFO_DP", "INFO_AF", "INFO_SR"]
+    assert list(out.index) == [3, 5, 7, 9]
+    assert out["INFO_DP"].tolist()[:2] == [10.0, 3.0]
+    assert pd.isna(out.loc[7, "INFO_DP"])
+    assert out.loc[9, "INFO_DP"] == 4.0
+    assert out.loc[3, "INFO_SR"] == 1.0
+    assert pd.isna(out.loc[5, "INFO_AF"])
+
+
+def test_genotype_fields_and_zygosity():
+    fmt = pd.Series(["GT:GQ:DP", "GQ:GT", "GT", "GT", "GT", None])
+    sample = pd.Series(["0/1:30:5", "40:1|1", "0/0", "./.", "1", None])
+    fields = MapGWASSNPs._extract_format_fields(fmt, sample, ["GT", "GQ"])
+    assert fields["GT"].tolist()[:5] == ["0/1", "1|1", "0/0", "./.", "1"]
+    assert fields["GQ"].tolist()[:2] == ["30", "40"]
+
+    zyg = MapGWASSNPs._zygosity(fields["GT"])
+    assert zyg.tolist() == ["het", "hom-alt", "hom-ref", "no-call", "hom-alt", "unknown"]
+
+
+def test_multiallelic_split_classifies_each_allele():
+    vcf = pd.DataFrame({
+        "REF": ["A", "GAA", "C"],
+        "ALT": ["T,ATTT", "G", "*,CA"],
+        "GT": ["1/2", "0/1", "2/2"],
+    }, index=[10, 20, 30])
+    out = MapGWASSNPs._split_alleles(vcf)
+    assert out["ALT"].tolist() == ["T", "ATTT", "G", "CA"]
+    assert out["ALT_INDEX"].tolist() == [1, 2, 1, 2]
+    assert MapGWASSNPs._classify_variants(out["REF"], out["ALT"]).tolist() == ["SNPs", "INS", "DEL", "INS"]
+    assert MapGWASSNPs._zygosity(out["GT"], allele=out["ALT_INDEX"]).tolist() == ["het", "het", "het", "hom-alt"]
+    assert MapGWASSNPs._zygosity(pd.Series(["2/2"]), allele=[1]).tolist() == ["other-alt"]
@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from pygwas.server import MapGWASService
+from pygwas.watch import DirectoryWatcher, sample_name
+
+
+@pytest.fixture
+def service(small_inputs, tmp_path):
+    _, gwas = small_inputs
+    service = MapGWASService(gwas, str(tmp_path / "out"), workers=1, max_queue=0)
+    yield service
+    service.shutdown()
+
+
+def _drop_vcf(src, directory, name="medaka.sorted.vcf"):
+    os.makedirs(directory, exist_ok=True)
+    shutil.copy(src, os.path.join(directory, name))
+    return os.path.join(directory, name)
+
+
+def test_sample_name():
+    assert sample_name("runs/sort-medaka-bc02/medaka.sorted.vcf") == "bc02"
+    assert sample_name("runs/bc03/medaka.sorted.vcf.gz") == "bc03"
+    assert sample_name("runs/patient7.vcf") == "patient7"
+
+
+def test_watcher_processes_each_vcf_once(service, small_inputs, tmp_path):
+    vcf, _ = small_inputs
+    watched = tmp_path / "runs"
+    for barcode in ["bc01", "bc02"]:
+        _drop_vcf(vcf, watched / f"sort-medaka-{barcode}")
+
+    # One worker and no queue: the second VCF waits for a later scan instead of failing
+    watcher = DirectoryWatcher(service, str(watched), settle=0, log=None)
+    watcher.run(interval=0.05, once=True)
+    state = json.load(open(watcher.state_file))
+    assert sorted(r["sample"] for r in state.values()) == ["bc01", "bc02"]
+    assert all(r["status"] == "done" and os.path.exists(r["report"]) for r in state.values())
+
+    # A restarted watcher skips completed files until one is rewritten
+    again = DirectoryWatcher(service, str(watched), settle=0, log=None)
+    assert again.scan() == ([], 0)
+    rewritten = _drop_vcf(vcf, watched / "sort-medaka-bc02")
+    os.utime(rewritten, ns=(0, os.stat(rewritten).st_mtime_ns + 10**9))
+    assert [p for p, _ in again.scan()[0]] == [rewritten]
+
+
+def test_watcher_waits_for_settle_or_sentinel(service, small_inputs, tmp_path):
+    vcf, _ = small_inputs
+    path = _drop_vcf(vcf, tmp_path / "runs" / "bc01")
+
+    watcher = DirectoryWatcher(service, str(tmp_path / "runs"), settle=10, log=None)
+    assert watcher.scan(now=100.0) == ([], 1)
+    assert watcher.scan(now=105.0) == ([], 1)
+    assert [p for p, _ in watcher.scan(now=110.0)[0]] == [path]
+
+    watcher = DirectoryWatcher(service, str(tmp_path / "runs"), sentinel="{vcf}.done", log=None)
+    assert watcher.scan() == ([], 1)
+    open(path + ".done", "w").close()
+    assert [p for p, _ in watcher.scan()[0]] == [path]
+
+
+def test_watcher_skips_a_vcf_removed_before_submit(service, small_inputs, tmp_path):
+    vcf, _ = small_inputs
+    gone = _drop_vcf(vcf, tmp_path / "runs" / "bc01")
+    kept = _drop_vcf(vcf, tmp_path / "runs" / "bc02")
+    messages = []
+    watcher = DirectoryWatcher(service, str(tmp_path / "runs"), settle=0, log=messages.append)
+    ready = watcher.scan()[0]
+    # One of the complete files disappears between the scan and its submit
+    os.remove(gone)
+    watcher.scan = lambda: (ready, 0)
+
+    watcher.step()
+    assert any("skipped" in m and gone in m for m in messages)
+    assert gone not in watcher.state and gone not in watcher._running
+    assert kept in watcher._running